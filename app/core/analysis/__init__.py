@@ -0,0 +1,18 @@
+"""Live-view analyses running off the GUI thread."""
+from .worker import AnalysisFrame, AnalysisWorker, frame_from_qimage
+from .auto_trigger import AutoTrigger
+from .code_scan import CodeScanner
+from .exposure import Exposure, measure_exposure
+from .focus import Focus, measure_focus
+
+__all__ = [
+    'AnalysisFrame',
+    'AnalysisWorker',
+    'frame_from_qimage',
+    'AutoTrigger',
+    'CodeScanner',
+    'Exposure',
+    'measure_exposure',
+    'Focus',
+    'measure_focus',
+]
@@ -0,0 +1,103 @@
+# app/core/analysis/auto_trigger.py
+"""Decide when a learner stands still in the frame long enough to shoot."""
+from __future__ import annotations
+
+from collections import deque
+import logging
+import time
+from typing import Deque, Optional
+
+import cv2
+import numpy as np
+
+from ..imaging.face_crop import Detector
+from .worker import AnalysisFrame
+
+# Breite des Vergleichsbilds fuer die Bewegungsmessung
+MOTION_WIDTH = 80
+# Das Gesicht muss in diesem Bereich der Bildbreite bzw. -hoehe liegen
+FRAME_COLS = (0.3, 0.7)
+FRAME_ROWS = (0.15, 0.6)
+# Mindesthoehe des Gesichts relativ zur Bildhoehe
+MIN_FACE_HEIGHT = 0.12
+# Anzahl gemerkter Entscheidungszeiten
+HISTORY_SIZE = 200
+
+
+class AutoTrigger:
+    """Fire once a subject has held still for *hold_s* seconds.
+
+    Stillness is the mean absolute difference of consecutive, strongly
+    downscaled grey frames staying below *motion_threshold* (grey levels),
+    and the largest face found by *detector* must lie inside the framing
+    area of the overlay. After firing, the trigger only re-arms once the
+    picture has changed again, i.e. the next learner stepped in.
+    :attr:`latencies` keeps the time in milliseconds from display of the
+    deciding frame to the decision.
+    """
+
+    def __init__(
+        self,
+        detector: Detector,
+        hold_s: float = 1.5,
+        motion_threshold: float = 3.0,
+    ):
+        self.hold_s = hold_s
+        self.motion_threshold = motion_threshold
+        self.detector = detector
+        self.logger = logging.getLogger(type(self).__name__)
+        self.latencies: Deque[float] = deque(maxlen=HISTORY_SIZE)
+        self._previous: Optional[np.ndarray] = None
+        self._still_since: Optional[float] = None
+        self._armed = True
+
+    def reset(self) -> None:
+        """Forget the current stillness, e.g. after a manual capture."""
+        self._still_since = None
+        self._armed = False
+
+    def motion(self, gray: np.ndarray) -> float:
+        h, w = gray.shape
+        small = cv2.resize(
+            gray, (MOTION_WIDTH, max(1, h * MOTION_WIDTH // w)), interpolation=cv2.INTER_AREA
+        )
+        small = small.astype(np.int16)
+        previous, self._previous = self._previous, small
+        if previous is None or previous.shape != small.shape:
+            return float('inf')
+        return float(np.abs(small - previous).mean())
+
+    def face_in_frame(self, frame: AnalysisFrame) -> bool:
+        faces = self.detector(frame.bgr)
+        if not len(faces):
+            return False
+        h, w = frame.bgr.shape[:2]
+        x, y, fw, fh, _ = max(faces, key=lambda f: f[2] * f[3])
+        cx, cy = (x + fw / 2) / w, (y + fh / 2) / h
+        return (
+            FRAME_COLS[0] <= cx <= FRAME_COLS[1]
+            and FRAME_ROWS[0] <= cy <= FRAME_ROWS[1]
+            and fh / h >= MIN_FACE_HEIGHT
+        )
+
+    def __call__(self, frame: AnalysisFrame) -> Optional[bool]:
+        """Analyse *frame*; return ``True`` when the photo should be taken."""
+        moving = self.motion(frame.gray) > self.motion_threshold
+        if moving:
+            self._armed = True
+            self._still_since = None
+            return None
+        if not self._armed or not self.face_in_frame(frame):
+            self._still_since = None
+            return None
+        if self._still_since is None:
+            self._still_since = frame.timestamp
+            return None
+        if frame.timestamp - self._still_since < self.hold_s:
+            return None
+        self._armed = False
+        self._still_since = None
+        latency = (time.perf_counter() - frame.timestamp) * 1000
+        self.latencies.append(latency)
+        self.logger.info("Automatische Aufnahme, Entscheidung nach %.0f ms", latency)
+        return True
@@ -0,0 +1,57 @@
+# app/core/analysis/code_scan.py
+"""Read QR codes and barcodes of student cards held into the live view."""
+from __future__ import annotations
+
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from .worker import AnalysisFrame
+
+
+def _text(result) -> str:
+    # OpenCV 4.8+ liefert (Text, Punkte, Code), aeltere Barcode-Module
+    # (ok, Texte, Typen, Punkte)
+    for value in result:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (list, tuple)):
+            return next((v for v in value if isinstance(v, str) and v), '')
+    return ''
+
+
+class CodeScanner:
+    """Decode the card code in a frame and report each card once.
+
+    Tries a QR code first and falls back to a 1D barcode if this OpenCV
+    build has a barcode detector. A code is only reported again after it
+    has been out of the picture for *repeat_s* seconds, so a card held into
+    the camera leads to a single jump.
+    """
+
+    def __init__(self, repeat_s: float = 2.0):
+        self.repeat_s = repeat_s
+        self._detectors: List = [cv2.QRCodeDetector()]
+        if hasattr(cv2, 'barcode'):
+            self._detectors.append(cv2.barcode.BarcodeDetector())
+        self._last: Optional[str] = None
+        self._last_seen = 0.0
+
+    def decode(self, gray: np.ndarray) -> Optional[str]:
+        for detector in self._detectors:
+            try:
+                text = _text(detector.detectAndDecode(gray)).strip()
+            except cv2.error:
+                continue
+            if text:
+                return text
+        return None
+
+    def __call__(self, frame: AnalysisFrame) -> Optional[str]:
+        code = self.decode(frame.gray)
+        if code is None:
+            return None
+        repeated = code == self._last and frame.timestamp - self._last_seen < self.repeat_s
+        self._last, self._last_seen = code, frame.timestamp
+        return None if repeated else code
@@ -0,0 +1,37 @@
+# app/core/analysis/exposure.py
+"""Luminance histogram and clipping of live-view frames."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .worker import AnalysisFrame
+
+# Anzahl Balken des Histogramms (Teiler von 256)
+HIST_BINS = 64
+# Grauwerte bis einschliesslich SHADOW_LEVEL bzw. ab HIGHLIGHT_LEVEL gelten
+# als abgeschnitten
+SHADOW_LEVEL = 4
+HIGHLIGHT_LEVEL = 251
+
+
+@dataclass(frozen=True)
+class Exposure:
+    """Histogram scaled to a maximum of 1 and clipped pixels in percent."""
+
+    histogram: np.ndarray
+    shadows: float
+    highlights: float
+
+
+def measure_exposure(frame: AnalysisFrame) -> Exposure:
+    counts = np.bincount(frame.gray.ravel(), minlength=256)
+    total = max(1, int(counts.sum()))
+    hist = counts.reshape(HIST_BINS, -1).sum(axis=1).astype(np.float32)
+    hist /= max(float(hist.max()), 1.0)
+    return Exposure(
+        hist,
+        float(counts[: SHADOW_LEVEL + 1].sum()) * 100 / total,
+        float(counts[HIGHLIGHT_LEVEL:].sum()) * 100 / total,
+    )
@@ -0,0 +1,34 @@
+# app/core/analysis/focus.py
+"""Focus peaking mask and sharpness score of live-view frames."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from ..imaging.sharpness import EYE_COLS, EYE_ROWS
+from .worker import AnalysisFrame
+
+# Betrag des Laplace-Filters, ab dem eine Kante als scharf markiert wird
+PEAK_THRESHOLD = 60
+
+
+@dataclass(frozen=True)
+class Focus:
+    """Edge mask at analysis size and the sharpness of the eye region.
+
+    *score* is the variance of the Laplacian in the eye area of the
+    overlay, comparable between frames of the same scene.
+    """
+
+    mask: np.ndarray
+    score: float
+
+
+def measure_focus(frame: AnalysisFrame) -> Focus:
+    lap = cv2.Laplacian(frame.gray, cv2.CV_16S)
+    mask = np.abs(lap) >= PEAK_THRESHOLD
+    h, w = lap.shape
+    eyes = lap[int(h * EYE_ROWS[0]):int(h * EYE_ROWS[1]), int(w * EYE_COLS[0]):int(w * EYE_COLS[1])]
+    return Focus(mask, float(eyes.astype(np.float32).var()))
@@ -0,0 +1,187 @@
+# app/core/analysis/worker.py
+"""Background analysis of live-view frames."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import cv2
+import numpy as np
+from PySide6 import QtCore, QtGui
+
+# Laengste Seite der ausgeduennten Analysebilder
+ANALYSIS_SIZE = 320
+# Anzahl gemerkter Latenzen pro Analyse
+HISTORY_SIZE = 200
+
+_BGR_FORMATS = {
+    QtGui.QImage.Format_BGR888: 3,
+    QtGui.QImage.Format_RGB32: 4,
+    QtGui.QImage.Format_ARGB32: 4,
+    QtGui.QImage.Format_ARGB32_Premultiplied: 4,
+}
+
+
+@dataclass
+class AnalysisFrame:
+    """Thinned-out copy of a displayed live-view frame.
+
+    ``scale`` converts analysis pixels back to pixels of the displayed
+    frame of ``size`` (width, height). ``timestamp`` is the
+    :func:`time.perf_counter` value when the frame was shown.
+    """
+
+    seq: int
+    timestamp: float
+    bgr: np.ndarray
+    scale: int
+    size: tuple[int, int]
+    _gray: np.ndarray | None = field(default=None, repr=False)
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+
+def frame_from_qimage(img: QtGui.QImage, seq: int = 0, size: int = ANALYSIS_SIZE) -> AnalysisFrame:
+    """Copy every n-th pixel of *img* so the long side is at most *size*.
+
+    Only the thinned-out pixels are copied, so this is cheap enough for the
+    GUI thread and the result stays valid when the camera reuses the
+    buffer behind *img*.
+    """
+    channels = _BGR_FORMATS.get(img.format())
+    if channels is None and img.format() != QtGui.QImage.Format_RGB888:
+        img = img.convertToFormat(QtGui.QImage.Format_RGB888)
+    w, h = img.width(), img.height()
+    step = max(1, -(-max(w, h) // size))
+    bpl = img.bytesPerLine()
+    data = np.frombuffer(img.constBits(), np.uint8, count=bpl * h).reshape(h, bpl)
+    if channels is None:
+        # RGB888: Kanaele beim Ausduennen umdrehen
+        pixels = data[:, : w * 3].reshape(h, w, 3)[::step, ::step, ::-1]
+    else:
+        pixels = data[:, : w * channels].reshape(h, w, channels)[::step, ::step, :3]
+    return AnalysisFrame(seq, time.perf_counter(), np.ascontiguousarray(pixels), step, (w, h))
+
+
+class _Analyzer:
+    def __init__(self, fn: Callable[[AnalysisFrame], Any], interval: float):
+        self.fn = fn
+        self.interval = interval
+        self.due = 0.0
+        self.latencies: Deque[float] = deque(maxlen=HISTORY_SIZE)
+
+
+class AnalysisWorker(QtCore.QObject):
+    """Run live-view analyses on one background thread.
+
+    Analyses are registered with :meth:`add` and get at most *hz* frames
+    per second. :meth:`submit` only keeps the newest frame, so a slow
+    analysis skips frames instead of delaying the preview. Each result that
+    is not ``None`` is delivered through :attr:`result` as ``(name,
+    value)``; :meth:`latencies` reports how long after display a frame was
+    analysed.
+    """
+
+    result = QtCore.Signal(str, object)
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(type(self).__name__)
+        self._analyzers: Dict[str, _Analyzer] = {}
+        self._cond = threading.Condition()
+        self._frame: Optional[AnalysisFrame] = None
+        self._busy = False
+        self._stop = False
+        self._thread: threading.Thread | None = None
+
+    # registration ------------------------------------------------------------
+    def add(self, name: str, fn: Callable[[AnalysisFrame], Any], hz: float | None = None) -> None:
+        with self._cond:
+            self._analyzers[name] = _Analyzer(fn, 1 / hz if hz else 0.0)
+        self._ensure_thread()
+
+    def remove(self, name: str) -> None:
+        with self._cond:
+            self._analyzers.pop(name, None)
+
+    def names(self) -> List[str]:
+        with self._cond:
+            return list(self._analyzers)
+
+    def latencies(self, name: str) -> List[float]:
+        """Milliseconds from display of a frame to the end of its analysis."""
+        with self._cond:
+            analyzer = self._analyzers.get(name)
+            return list(analyzer.latencies) if analyzer else []
+
+    # frames ------------------------------------------------------------------
+    def wants_frame(self) -> bool:
+        """Return ``True`` if a new frame would be analysed right now."""
+        now = time.perf_counter()
+        with self._cond:
+            return not self._busy and any(a.due <= now for a in self._analyzers.values())
+
+    def submit(self, frame: AnalysisFrame) -> None:
+        with self._cond:
+            self._frame = frame
+            self._cond.notify_all()
+
+    # worker ------------------------------------------------------------------
+    def _ensure_thread(self) -> None:
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name='AnalysisWorker', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._frame is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                frame, self._frame = self._frame, None
+                self._busy = True
+                now = time.perf_counter()
+                due = [(n, a) for n, a in self._analyzers.items() if a.due <= now]
+                for _, analyzer in due:
+                    analyzer.due = now + analyzer.interval
+            try:
+                for name, analyzer in due:
+                    try:
+                        value = analyzer.fn(frame)
+                    except Exception:
+                        self.logger.exception("Analyse %s fehlgeschlagen", name)
+                        continue
+                    latency = (time.perf_counter() - frame.timestamp) * 1000
+                    with self._cond:
+                        analyzer.latencies.append(latency)
+                    if value is not None:
+                        self._emit(name, value)
+            finally:
+                with self._cond:
+                    self._busy = False
+
+    def _emit(self, name: str, value: Any) -> None:
+        try:
+            self.result.emit(name, value)
+        except RuntimeError:
+            pass  # Worker bereits geloescht
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._stop = True
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
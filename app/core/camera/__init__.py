@@ -1,14 +1,19 @@
-from .base import BaseCamera, CameraError
+from .base import BaseCamera, CameraError, CameraTimeout
+from .actor import CameraActor
 from .simulator import SimulatorCamera
 from .gphoto2_backend import GPhoto2Camera
 from .opencv_backend import OpenCVCamera
 from .canon_sdk import CanonSDKCamera
+from .manager import CameraManager
 
 __all__ = [
     'BaseCamera',
     'CameraError',
+    'CameraTimeout',
+    'CameraActor',
     'SimulatorCamera',
     'GPhoto2Camera',
     'OpenCVCamera',
     'CanonSDKCamera',
+    'CameraManager',
 ]
@@ -0,0 +1,324 @@
+# app/core/camera/actor.py
+"""Serialise all device access of a camera through one owner thread."""
+from __future__ import annotations
+
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
+import itertools
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Callable
+
+from PySide6 import QtCore, QtGui
+
+from .base import BaseCamera, CameraTimeout
+from .watchdog import Watchdog
+
+# Kleinere Zahl = hoehere Prioritaet
+PRIORITY_RESET = -1
+PRIORITY_CAPTURE = 0
+PRIORITY_CONTROL = 1
+PRIORITY_PREVIEW = 2
+
+
+class _ActorSignals(QtCore.QObject):
+    frame_ready = QtCore.Signal(int)
+
+
+class CameraActor(BaseCamera):
+    """Run every call to *camera* on a single worker thread.
+
+    Commands are queued by priority, so a capture overtakes waiting preview
+    requests. At most one preview request is queued at a time; further
+    requests share its future. ``submit_*`` methods return
+    :class:`concurrent.futures.Future` objects, while the
+    :class:`BaseCamera` methods keep their blocking behaviour, except for
+    :meth:`get_preview_qimage` which returns the newest finished preview and
+    never waits for the device. :attr:`frame_ready` fires whenever a new
+    preview (or a preview error) is available.
+
+    With *timeout_ms* every capture and preview is guarded by a
+    :class:`Watchdog`: a hung call makes the actor abort it, continue on a
+    fresh worker thread and reset the camera there once the hung call has
+    returned or was given up. A camera with its own :attr:`frame_ready`
+    that delivers no frame for *timeout_ms* while live view runs is reset
+    the same way. :meth:`capture_preview` is retried *retries* times;
+    captures never are, since the shutter may already have fired.
+    """
+
+    def __init__(
+        self,
+        camera: BaseCamera,
+        timeout_ms: int | None = None,
+        retries: int = 0,
+        backoff_s: float = 0.5,
+    ):
+        self.camera = camera
+        self.logger = logging.getLogger(type(self).__name__)
+        self.watchdog = Watchdog(timeout_ms, retries, backoff_s, recover=self._recover)
+        self._generation = 0
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._preview_lock = threading.Lock()
+        self._preview_future: Future | None = None
+        self._preview_started: float | None = None
+        self._preview = QtGui.QImage()
+        self._preview_error: Exception | None = None
+        self._preview_seq = 0
+        # LiveView laeuft und wann die Kamera zuletzt ein Bild gemeldet hat
+        self._live = False
+        self._frame_at = 0.0
+        self._signals = _ActorSignals()
+        self.frame_ready = self._signals.frame_ready
+        self._source = getattr(camera, 'frame_ready', None)
+        if self._source is not None:
+            # Neue Bilder der Kamera loesen eine (zusammengefasste) Abfrage
+            # aus, direkt im Thread der Kamera statt ueber die GUI-Eventloop
+            self._source.connect(self._on_source_frame, QtCore.Qt.DirectConnection)
+
+    def __getattr__(self, name: str) -> Any:
+        # Nur fuer Attribute ohne eigene Methode, z.B. ``grabber``; solche
+        # Zugriffe laufen nicht ueber den Actor-Thread.
+        if name == 'camera':
+            raise AttributeError(name)
+        return getattr(self.camera, name)
+
+    # queue -------------------------------------------------------------------
+    def submit(self, fn: Callable, *args, priority: int = PRIORITY_CONTROL) -> Future:
+        """Queue ``fn(*args)`` for the worker thread and return its future."""
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((priority, next(self._counter), future, fn, args))
+        return future
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._generation,),
+                    name='CameraActor',
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self, generation: int) -> None:
+        while True:
+            item = self._queue.get()
+            if generation != self._generation:
+                # Dieser Worker wurde nach einer Zeitueberschreitung ersetzt
+                self._queue.put(item)
+                return
+            _, _, future, fn, args = item
+            if fn is None:
+                future.set_result(None)
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Finish queued commands and end the worker thread."""
+        if self._source is not None:
+            try:
+                self._source.disconnect(self._on_source_frame)
+            except (RuntimeError, TypeError):
+                pass
+            self._source = None
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        done: Future = Future()
+        self._queue.put((PRIORITY_PREVIEW + 1, next(self._counter), done, None, ()))
+        thread.join(timeout)
+
+    def _recover(self, hung: Future | None = None) -> None:
+        """Leave the hung worker behind and queue a reset for its successor."""
+        with self._lock:
+            self._generation += 1
+            self._thread = None
+        self.logger.warning("Kamera reagiert nicht, wird zurueckgesetzt")
+        abort = getattr(self.camera, 'abort', None)
+        if abort is not None:
+            abort()
+        # Vor allen wartenden Befehlen, auch vor einer Wiederholung
+        self.submit(self._reset_after, hung, priority=PRIORITY_RESET)
+
+    def _reset_after(self, hung: Future | None) -> None:
+        # Nicht zuruecksetzen, waehrend der alte Aufruf noch auf dem Geraet
+        # arbeitet (z.B. ``cap.release`` neben einem blockierten ``cap.read``)
+        if hung is not None:
+            try:
+                hung.exception(self.watchdog.timeout)
+            except CancelledError:
+                pass
+            except FutureTimeout:
+                self.logger.warning("Haengender Kameraaufruf wird aufgegeben")
+        self.camera.reset()
+
+    # commands ----------------------------------------------------------------
+    def submit_capture(self, dest: Path) -> Future:
+        return self.submit(self.camera.capture, dest, priority=PRIORITY_CAPTURE)
+
+    def submit_preview(self) -> Future:
+        """Queue a preview fetch unless one is already waiting."""
+        with self._preview_lock:
+            future = self._preview_future
+            if future is not None and not future.running() and not future.done():
+                return future
+            future = self.submit(self._fetch_preview, priority=PRIORITY_PREVIEW)
+            self._preview_future = future
+            return future
+
+    def _fetch_preview(self) -> QtGui.QImage:
+        started = self._preview_started = time.monotonic()
+        try:
+            img = self._read_preview()
+        except Exception as exc:
+            self._preview_error = exc
+            self.watchdog.record('preview', 0, started, exc)
+            self.frame_ready.emit(self._preview_seq)
+            raise
+        finally:
+            if self._preview_started == started:
+                self._preview_started = None
+        self.watchdog.record('preview', 0, started)
+        if img.isNull() or img.cacheKey() == self._preview.cacheKey():
+            return img
+        self._preview = img
+        self._preview_error = None
+        self._preview_seq += 1
+        self.frame_ready.emit(self._preview_seq)
+        return img
+
+    def _read_preview(self) -> QtGui.QImage:
+        if hasattr(self.camera, 'get_preview_qimage'):
+            return self.camera.get_preview_qimage()
+        with NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
+            path = Path(tmp.name)
+        try:
+            self.camera.capture_preview(path)
+            return QtGui.QImage(str(path))
+        finally:
+            path.unlink(missing_ok=True)
+
+    def _on_source_frame(self, _seq: int = 0) -> None:
+        self._frame_at = time.monotonic()
+        self.submit_preview()
+
+    def _watch_live(self, live: bool) -> None:
+        self._live = live
+        self._frame_at = time.monotonic()
+
+    def _check_stalled(self) -> None:
+        """Reset a camera whose live view stopped delivering frames."""
+        frame_at = self._frame_at
+        if self._source is None or not self._live or not self.watchdog.expired(frame_at):
+            return
+        # Bis zum Neustart nicht erneut ausloesen
+        self._frame_at = time.monotonic()
+        error = CameraTimeout(f"Kein LiveView-Bild seit {self.watchdog.timeout_ms} ms")
+        self.watchdog.record('liveview', 0, frame_at, error)
+        threading.Thread(
+            target=self.watchdog.timed_out, name='CameraReset', daemon=True
+        ).start()
+        raise error
+
+    # BaseCamera --------------------------------------------------------------
+    def start_liveview(self):
+        result = self.submit(self.camera.start_liveview).result()
+        self._watch_live(True)
+        return result
+
+    def stop_liveview(self):
+        self._watch_live(False)
+        return self.submit(self.camera.stop_liveview).result()
+
+    def pause_liveview(self):
+        self._watch_live(False)
+        self._forward('pause_liveview')
+
+    def resume_liveview(self):
+        self._watch_live(True)
+        self._forward('resume_liveview')
+
+    def _forward(self, name: str) -> None:
+        method = getattr(self.camera, name, None)
+        if method is not None:
+            # Nicht warten: die Vorschau pausiert auch waehrend einer Aufnahme
+            self.submit(method)
+
+    def start_liveview_async(self) -> Future:
+        """Open the device on the worker thread without waiting for it."""
+        future = self.submit(self.camera.start_liveview)
+        # Erst ab dem fertigen Start auf Bilder warten
+        future.add_done_callback(lambda f: self._watch_live(f.exception() is None))
+        return future
+
+    def capture(self, dest: Path) -> None:
+        return self.watchdog.call('capture', lambda: self.submit_capture(dest), retry=False)
+
+    def capture_frame(self):
+        return self.watchdog.call(
+            'capture_frame',
+            lambda: self.submit(self.camera.capture_frame, priority=PRIORITY_CAPTURE),
+            retry=False,
+        )
+
+    def capture_burst(self, count: int) -> list:
+        """Run the camera's ``capture_burst``; only for backends that have one."""
+        return self.watchdog.call(
+            'capture_burst',
+            lambda: self.submit(self.camera.capture_burst, count, priority=PRIORITY_CAPTURE),
+            retry=False,
+        )
+
+    def capture_preview(self, dest: Path) -> None:
+        return self.watchdog.call(
+            'capture_preview',
+            lambda: self.submit(self.camera.capture_preview, dest, priority=PRIORITY_PREVIEW),
+        )
+
+    def switch_camera(self, camera_id: int):
+        return self.submit(self.camera.switch_camera, camera_id).result()
+
+    def set_preview_size(self, width: int, height: int) -> None:
+        super().set_preview_size(width, height)
+        if hasattr(self.camera, 'set_preview_size'):
+            self.camera.set_preview_size(width, height)
+
+    def get_preview_qimage(self) -> QtGui.QImage:
+        started = self._preview_started
+        if started is not None and self.watchdog.expired(started):
+            self._preview_started = None
+            error = CameraTimeout(
+                f"Keine Vorschau nach {self.watchdog.timeout_ms} ms"
+            )
+            self.watchdog.record('preview', 0, started, error)
+            # Abbrechen kann dauern und gehoert nicht in den GUI-Thread
+            threading.Thread(
+                target=self.watchdog.timed_out,
+                args=(self._preview_future,),
+                name='CameraReset',
+                daemon=True,
+            ).start()
+            raise error
+        self._check_stalled()
+        if self._source is None or self._preview.isNull():
+            # Kamera ohne eigenes Signal (oder noch ohne Bild): jede Abfrage
+            # stoesst die naechste an
+            self.submit_preview()
+        error, self._preview_error = self._preview_error, None
+        if error is not None:
+            raise error
+        return self._preview
@@ -1,11 +1,50 @@
 # app/core/camera/base.py
 from abc import ABC, abstractmethod
 from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# Aufnahme im Speicher: BGR-Array oder kodiertes JPEG
+CapturedFrame = Union[np.ndarray, bytes]
 
 class CameraError(Exception):
     pass
 
+
+class CameraTimeout(CameraError):
+    """A camera operation did not finish within ``KameraSettings.timeoutMs``."""
+
+
+def fit_size(width: int, height: int, bound: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """Return ``width`` x ``height`` shrunk to fit into *bound*.
+
+    The aspect ratio is kept and frames are never enlarged.
+    """
+    if not bound or width <= 0 or height <= 0:
+        return width, height
+    scale = min(bound[0] / width, bound[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def crop_box(
+    width: int, height: int, center: Tuple[float, float], size: Tuple[int, int]
+) -> Tuple[int, int, int, int]:
+    """Return ``(x, y, w, h)`` of a *size* window around *center* in the frame.
+
+    *center* is relative to the frame (``0..1``). At the borders the window
+    is moved inwards instead of being cut off.
+    """
+    w, h = min(size[0], width), min(size[1], height)
+    x = round(center[0] * width - w / 2)
+    y = round(center[1] * height - h / 2)
+    return min(max(0, x), width - w), min(max(0, y), height - h), w, h
+
+
 class BaseCamera(ABC):
+    preview_size: Optional[Tuple[int, int]] = None
+
     @abstractmethod
     def start_liveview(self):
         pass
@@ -18,7 +57,56 @@ class BaseCamera(ABC):
     def capture(self, dest: Path) -> None:
         pass
 
+    def capture_frame(self) -> CapturedFrame:
+        """Take a photo and return it in memory instead of writing a file.
+
+        Returns a BGR array or the encoded JPEG bytes, whichever the device
+        delivers. This default goes through :meth:`capture` and a temporary
+        file; backends override it to skip the disk.
+        """
+        with NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
+            path = Path(tmp.name)
+        try:
+            self.capture(path)
+            return path.read_bytes()
+        finally:
+            path.unlink(missing_ok=True)
+
+    def pause_liveview(self) -> None:
+        """Stop producing live-view frames while nobody looks at them.
+
+        Unlike :meth:`stop_liveview` the device stays open, so captures keep
+        working and :meth:`resume_liveview` is quick.
+        """
+
+    def resume_liveview(self) -> None:
+        """Produce live-view frames again after :meth:`pause_liveview`."""
+
     @abstractmethod
     def capture_preview(self, dest: Path) -> None:
         """Capture a single preview frame to ``dest``."""
         pass
+
+    def abort(self) -> None:
+        """Make a hung operation return, e.g. by killing its subprocess.
+
+        Called by the watchdog from another thread while the operation is
+        still blocked, so it must not touch state the blocked call uses.
+        """
+
+    def reset(self) -> None:
+        """Bring the device back up after a hung operation.
+
+        Called on the camera's worker thread once the hung call has
+        returned after :meth:`abort` or was given up.
+        """
+        self.stop_liveview()
+        self.start_liveview()
+
+    def set_preview_size(self, width: int, height: int) -> None:
+        """Tell the backend how large live-view frames are displayed.
+
+        Backends deliver preview frames already scaled to fit into
+        ``width`` x ``height`` so the GUI thread does not have to.
+        """
+        self.preview_size = (int(width), int(height)) if width > 0 and height > 0 else None
@@ -0,0 +1,264 @@
+# app/core/camera/frame_grabber.py
+"""Background reader that keeps the newest camera frames in a ring buffer."""
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import weakref
+
+import numpy as np
+from PySide6 import QtCore
+
+
+@dataclass
+class Frame:
+    """A single frame as delivered by the device.
+
+    ``preview`` holds the display version of ``image`` if the grabber was
+    given a *process* callable.
+    """
+
+    seq: int
+    timestamp: float
+    image: Any
+    preview: Any = None
+
+
+class BufferPool:
+    """Ring of preallocated ``uint8`` arrays handed out in turn.
+
+    A buffer is only reused after *size* further calls to :meth:`next`, so
+    consumers may keep referencing it until then without copying. A
+    consumer that holds on longer, e.g. the GUI with the shown preview,
+    leases the buffer to an owner object with :meth:`lease`; it is skipped
+    until the owner is garbage collected. If every buffer is leased the pool
+    grows instead of blocking the grabber.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._buffers: List[np.ndarray] = []
+        self._index = 0
+        # id(Puffer) -> Anzahl offener Leihen; das Finalizer-Argument haelt
+        # den Puffer am Leben, die id bleibt also eindeutig
+        self._leased: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def next(self, shape) -> np.ndarray:
+        shape = tuple(shape)
+        with self._lock:
+            if not self._buffers or self._buffers[0].shape != shape:
+                # Verliehene Puffer der alten Groesse gehoeren nur noch ihrem Besitzer
+                self._buffers = [np.empty(shape, np.uint8) for _ in range(self.size)]
+                self._leased.clear()
+                self._index = 0
+            for _ in range(len(self._buffers)):
+                buf = self._buffers[self._index]
+                self._index = (self._index + 1) % len(self._buffers)
+                if id(buf) not in self._leased:
+                    return buf
+            buf = np.empty(shape, np.uint8)
+            self._buffers.append(buf)
+            return buf
+
+    def lease(self, buf: np.ndarray, owner: Any) -> None:
+        """Keep *buf* out of rotation until *owner* is garbage collected."""
+        key = id(buf)
+        with self._lock:
+            self._leased[key] = self._leased.get(key, 0) + 1
+        weakref.finalize(owner, self._release, key, buf)
+
+    def _release(self, key: int, buf: np.ndarray) -> None:
+        with self._lock:
+            count = self._leased.get(key)
+            if count is None:
+                return
+            if count > 1:
+                self._leased[key] = count - 1
+            else:
+                del self._leased[key]
+
+    def leased(self) -> int:
+        with self._lock:
+            return len(self._leased)
+
+    def buffers(self) -> List[np.ndarray]:
+        return list(self._buffers)
+
+
+class FrameGrabber(QtCore.QObject):
+    """Calls *read* in a dedicated thread and buffers the latest frames.
+
+    *read* has the same contract as ``cv2.VideoCapture.read``: it returns a
+    ``(ok, image)`` tuple and may block until the device delivers a frame.
+    Consumers never touch the device themselves; they take the newest entry
+    of the ring buffer and get notified through :attr:`frame_ready`.
+    The optional *process* callable turns each image into its preview
+    version in the same worker thread.
+
+    :meth:`pause` stops reading and processing until :meth:`resume`; the
+    buffered frames are kept but grow old. Devices that must keep being
+    drained (webcams queue frames in the driver) pass *skip*, which is then
+    called instead of *read*, e.g. ``cv2.VideoCapture.grab`` that fetches a
+    frame without decoding it; it returns ``False`` if nothing was read.
+    """
+
+    frame_ready = QtCore.Signal(int)
+
+    def __init__(
+        self,
+        read: Callable[[], Tuple[bool, Any]],
+        size: int = 3,
+        parent: QtCore.QObject | None = None,
+        process: Callable[[Any], Any] | None = None,
+        skip: Callable[[], Any] | None = None,
+    ):
+        super().__init__(parent)
+        self._read = read
+        self._process = process
+        self._skip = skip
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._frames: deque[Frame] = deque(maxlen=max(1, size))
+        self._cond = threading.Condition()
+        # Held while reading from the device; see :meth:`exclusive`.
+        self._device_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._seq = 0
+        self.failures = 0
+        self.error: Exception | None = None
+
+    # lifecycle ---------------------------------------------------------------
+    def start(self) -> None:
+        if self.is_running():
+            return
+        # Jeder Lauf bekommt ein eigenes Stop-Event, damit ein haengender
+        # alter Thread nach einem Neustart nicht weiterliest
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stop,), name='FrameGrabber', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._cond:
+            self._frames.clear()
+            self._cond.notify_all()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def pause(self) -> None:
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Pause reading while the caller talks to the device directly."""
+        with self._device_lock:
+            yield
+
+    # consumers ---------------------------------------------------------------
+    def latest(self) -> Optional[Frame]:
+        with self._cond:
+            return self._frames[-1] if self._frames else None
+
+    def frames(self) -> List[Frame]:
+        """Return the buffered frames, oldest first."""
+        with self._cond:
+            return list(self._frames)
+
+    def wait_for_frame(self, after_seq: int = 0, timeout: float = 2.0) -> Optional[Frame]:
+        """Return the newest frame with ``seq > after_seq``.
+
+        Blocks for at most *timeout* seconds and returns ``None`` if no such
+        frame arrived in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._frames or self._frames[-1].seq <= after_seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return None
+                self._cond.wait(remaining)
+            return self._frames[-1]
+
+    def burst(self, count: int, timeout: float = 2.0) -> List[Frame]:
+        """Return *count* consecutive frames, starting with the buffered ones.
+
+        Frames still in the ring buffer are used first, so short bursts need
+        little or no waiting. Fewer frames are returned if the device
+        delivers none for *timeout* seconds.
+        """
+        frames = self.frames()[-count:] if count > 0 else []
+        seq = frames[-1].seq if frames else 0
+        while len(frames) < count:
+            frame = self.wait_for_frame(seq, timeout)
+            if frame is None:
+                break
+            frames.append(frame)
+            seq = frame.seq
+        return frames
+
+    # worker ------------------------------------------------------------------
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            if not self._resumed.is_set():
+                if self._skip is None:
+                    # Kurz warten, damit ``stop`` den Thread weiterhin beendet
+                    self._resumed.wait(0.1)
+                    continue
+                with self._device_lock:
+                    try:
+                        ok = self._skip()
+                    except Exception as exc:
+                        ok = False
+                        self.error = exc
+                if not ok:
+                    self._resumed.wait(0.1)
+                continue
+            with self._device_lock:
+                if stop.is_set():
+                    break
+                try:
+                    ok, image = self._read()
+                except Exception as exc:  # device vanished, driver error ...
+                    ok, image = False, None
+                    self.error = exc
+            if stop.is_set():
+                break
+            if not ok or image is None:
+                self.failures += 1
+                # Back off a little so a dead device does not spin a core.
+                time.sleep(min(0.5, 0.01 * self.failures))
+                continue
+            stamp = time.monotonic()
+            self.failures = 0
+            self.error = None
+            preview = None
+            if self._process is not None:
+                try:
+                    preview = self._process(image)
+                except Exception as exc:
+                    self.error = exc
+                    continue
+            with self._cond:
+                self._seq += 1
+                seq = self._seq
+                self._frames.append(Frame(seq, stamp, image, preview))
+                self._cond.notify_all()
+            self.frame_ready.emit(seq)
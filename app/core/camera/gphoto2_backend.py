@@ -1,46 +1,230 @@
 # app/core/camera/gphoto2_backend.py
+from contextlib import contextmanager
 from pathlib import Path
+import logging
 import subprocess
-import tempfile
-from PySide6 import QtGui
-from .base import BaseCamera, CameraError
+import time
+from typing import Sequence
+from PySide6 import QtCore, QtGui
+from .base import BaseCamera, CameraError, CameraTimeout, fit_size
+from .frame_grabber import FrameGrabber
+from .gphoto2_shell import GPhoto2Shell, SessionError
+from .mjpeg_stream import MjpegStream
+
+# Ein einziger gphoto2-Prozess liefert den LiveView als MJPEG auf stdout
+LIVEVIEW_CMD = ['gphoto2', '--stdout', '--capture-movie']
+# Mindestabstand zwischen zwei Neustarts eines abgestuerzten Streams
+RESTART_DELAY = 1.0
+# Ab so vielen fehlgeschlagenen Vorschaubildern in Folge meldet die Vorschau einen Fehler
+MAX_PREVIEW_FAILURES = 10
+
+logger = logging.getLogger(__name__)
+
+
+class _FrameSignals(QtCore.QObject):
+    frame_ready = QtCore.Signal(int)
+
 
 class GPhoto2Camera(BaseCamera):
-    def __init__(self):
+    """DSLR backend driven by the ``gphoto2`` command line tool.
+
+    With ``use_shell`` one :class:`GPhoto2Shell` session holds the camera
+    for everything: a :class:`FrameGrabber` polls ``capture-preview``
+    through it for live view, and captures are sent between two preview
+    frames, so a capture pays neither a process start nor the USB set-up.
+    Without the shell, or if it cannot be started, live view comes from
+    the in-memory MJPEG stream of ``--capture-movie`` and every command is
+    one ``gphoto2`` call, for which the stream stops. Each shell command and
+    each one-shot call is killed after *timeout* seconds. *port* (e.g.
+    ``"usb:001,005"``) selects one of several connected cameras.
+    """
+
+    def __init__(
+        self,
+        liveview_cmd: Sequence[str] | None = None,
+        shell_cmd: Sequence[str] | None = None,
+        use_shell: bool = True,
+        timeout: float = 30.0,
+        port: str | None = None,
+    ):
         self.running = False
+        self.paused = False
+        self.timeout = timeout
+        self.port = port
+        self.stream = MjpegStream(
+            liveview_cmd or self._cmd(*LIVEVIEW_CMD[1:]), process=self._decode_preview
+        )
+        self.shell = GPhoto2Shell(shell_cmd, timeout, port) if use_shell else None
+        # LiveView ueber die Shell: jedes Bild ist ein ``capture-preview``
+        self.grabber = FrameGrabber(self._read_preview, 1, process=self._decode_preview)
+        self._signals = _FrameSignals()
+        self.frame_ready = self._signals.frame_ready
+        self.stream.frame_ready.connect(self.frame_ready)
+        self.grabber.frame_ready.connect(self.frame_ready)
 
     def start_liveview(self):
         self.running = True
+        self._start_live()
 
     def stop_liveview(self):
         self.running = False
+        self.grabber.stop()
+        self.stream.stop()
+        if self.shell is not None:
+            self.shell.close()
 
-    def capture(self, dest: Path) -> None:
-        cmd = [
-            'gphoto2',
-            '--capture-image-and-download',
-            '--filename', str(dest)
-        ]
-        proc = subprocess.run(cmd, capture_output=True)
+    def pause_liveview(self):
+        # Spart USB-Verkehr und Dekodieren; die Shell bleibt fuer die
+        # Aufnahme offen
+        self.paused = True
+        self.grabber.pause()
+        self.stream.stop()
+
+    def resume_liveview(self):
+        self.paused = False
+        self.grabber.resume()
+        if self.running and self.shell is None:
+            self.stream.start()
+
+    def _start_live(self) -> None:
+        if self._shell() is not None:
+            self.grabber.start()
+        elif not self.paused:
+            self.stream.start()
+
+    def _read_preview(self):
+        # Fehler zaehlt der Grabber; die Shell startet eine tote Sitzung selbst neu
+        shell = self.shell
+        if shell is None:
+            return False, None
+        return True, shell.capture_preview()
+
+    @contextmanager
+    def _released(self):
+        """Stop the live-view stream while a one-shot call needs the camera."""
+        streaming = self.stream.is_running()
+        if streaming:
+            self.stream.stop()
+        try:
+            yield
+        finally:
+            if streaming and self.running:
+                self.stream.start()
+
+    def _shell(self) -> GPhoto2Shell | None:
+        """Return the started shell session, or ``None`` for one-shot calls."""
+        if self.shell is not None:
+            try:
+                self.shell.start()
+            except SessionError as exc:
+                self._fallback(exc)
+        return self.shell
+
+    def _fallback(self, exc: Exception) -> None:
+        """Give up on the shell session and use one-shot calls instead."""
+        logger.warning("gphoto2-Shell nicht nutzbar, Einzelaufrufe: %s", exc)
+        shell, self.shell = self.shell, None
+        self.grabber.stop()
+        if shell is not None:
+            shell.close()
+        if self.running and not self.paused:
+            self.stream.start()
+
+    def abort(self) -> None:
+        # Nur Prozesse beenden: der haengende Aufruf kehrt dann selbst zurueck
+        # und der naechste Befehl startet eine neue Sitzung
+        if self.shell is not None:
+            self.shell.kill()
+
+    def reset(self) -> None:
+        if self.running:
+            self.grabber.stop()
+            self.stream.stop()
+            self._start_live()
+
+    def _cmd(self, *args: str) -> list[str]:
+        """Build a one-shot ``gphoto2`` call for the configured port."""
+        port = ['--port', self.port] if self.port else []
+        return ['gphoto2', *port, *args]
+
+    def _run(self, cmd) -> None:
+        with self._released():
+            try:
+                proc = subprocess.run(cmd, capture_output=True, timeout=self.timeout)
+            except subprocess.TimeoutExpired as exc:
+                raise CameraTimeout(
+                    f"gphoto2 antwortet nicht nach {self.timeout:.0f} s"
+                ) from exc
         if proc.returncode != 0:
             raise CameraError(proc.stderr.decode(errors='ignore'))
 
+    def capture(self, dest: Path) -> None:
+        shell = self._shell()
+        if shell is not None:
+            # Zwischen zwei Vorschaubildern in derselben Sitzung ausloesen.
+            # Schlaegt die Aufnahme fehl, nicht per Einzelaufruf wiederholen:
+            # der Ausloeser koennte schon gefeuert haben
+            with self.grabber.exclusive():
+                shell.capture(dest)
+            return
+        self._run(self._cmd('--capture-image-and-download', '--filename', str(dest)))
+
+    def capture_frame(self) -> bytes:
+        """Return the camera's JPEG as bytes, without the detour via ``dest``."""
+        shell = self._shell()
+        if shell is not None:
+            with self.grabber.exclusive():
+                return shell.capture_bytes()
+        # Ohne Shell schreibt gphoto2 selbst eine Datei
+        return super().capture_frame()
+
     def capture_preview(self, dest: Path) -> None:
-        cmd = [
-            'gphoto2',
-            '--capture-preview',
-            '--filename', str(dest)
-        ]
-        proc = subprocess.run(cmd, capture_output=True)
-        if proc.returncode != 0:
-            raise CameraError(proc.stderr.decode(errors='ignore'))
+        latest = self._live().latest()
+        if latest is not None:
+            Path(dest).write_bytes(latest.image)
+            return
+        shell = self._shell()
+        if shell is not None:
+            with self.grabber.exclusive():
+                Path(dest).write_bytes(shell.capture_preview())
+            return
+        self._run(self._cmd('--capture-preview', '--filename', str(dest)))
+
+    def _live(self):
+        """Return the live-view source: the shell grabber or the stream."""
+        return self.grabber if self.shell is not None else self.stream
+
+    def _decode_preview(self, data: bytes) -> QtGui.QImage:
+        """Decode a live-view JPEG at display size; runs in a reader thread."""
+        buf = QtCore.QBuffer()
+        buf.setData(QtCore.QByteArray(data))
+        buf.open(QtCore.QIODevice.ReadOnly)
+        reader = QtGui.QImageReader(buf, b'jpeg')
+        size = reader.size()
+        if self.preview_size and size.isValid():
+            # libjpeg skaliert beim Dekodieren, das ist billiger als danach
+            w, h = fit_size(size.width(), size.height(), self.preview_size)
+            reader.setScaledSize(QtCore.QSize(w, h))
+        return reader.read()
+
+    def _ensure_stream(self) -> None:
+        if self.stream.is_running():
+            return
+        if time.monotonic() - self.stream.started_at < RESTART_DELAY:
+            if self.stream.returncode not in (None, 0):
+                raise CameraError(
+                    f"LiveView beendet (Code {self.stream.returncode})"
+                )
+            return
+        self.stream.start()
 
     def get_preview_qimage(self) -> QtGui.QImage:
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-            path = Path(tmp.name)
-        try:
-            self.capture_preview(path)
-            img = QtGui.QImage(str(path))
-            return img
-        finally:
-            path.unlink(missing_ok=True)
+        if self.shell is None:
+            if self.running and not self.paused:
+                self._ensure_stream()
+        elif self.grabber.failures >= MAX_PREVIEW_FAILURES:
+            raise CameraError(f"Kein LiveView-Bild von gphoto2 ({self.grabber.error})")
+        latest = self._live().latest()
+        if latest is None or latest.preview is None:
+            return QtGui.QImage()
+        return latest.preview
@@ -0,0 +1,224 @@
+# app/core/camera/gphoto2_shell.py
+"""Long-lived ``gphoto2 --shell`` session driven over stdin/stdout."""
+from __future__ import annotations
+
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Sequence
+
+from .base import CameraError
+
+
+def _default_shell_cmd(port: str | None = None) -> List[str]:
+    cmd = ['gphoto2', '--shell']
+    if port:
+        cmd[1:1] = ['--port', port]
+    # gphoto2 puffert stdout blockweise, sobald es in eine Pipe schreibt
+    if shutil.which('stdbuf'):
+        cmd = ['stdbuf', '-oL', '-eL'] + cmd
+    return cmd
+
+
+SAVED_RE = re.compile(r'Saving file as (\S.*?)\s*$')
+# ``lcd`` quittiert jeden Befehl und dient als Endemarker der Ausgabe
+DONE_RE = re.compile(r'Local directory now')
+ERROR_MARK = '*** Error'
+
+
+class SessionError(CameraError):
+    """The shell process died or stopped responding."""
+
+
+class GPhoto2Shell:
+    """Keeps one gphoto2 shell open so captures skip process and USB set-up.
+
+    Every command is followed by ``lcd <workdir>``; its confirmation marks the
+    end of the command output, so completion is detected from stdout without
+    relying on the interactive prompt. A dead or hung session is restarted
+    once per command before a :class:`SessionError` is raised; captures are
+    not sent a second time, since the shutter may already have fired. The
+    temporary working directory lives as long as the session.
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str] | None = None,
+        timeout: float = 30.0,
+        port: str | None = None,
+    ):
+        self.cmd = list(cmd) if cmd else _default_shell_cmd(port)
+        self.timeout = timeout
+        self.workdir: Path | None = None
+        self.restarts = 0
+        self._proc: subprocess.Popen | None = None
+        self._lines: queue.Queue = queue.Queue()
+        self._reader: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    # session ---------------------------------------------------------------
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._close()
+        self.workdir = Path(tempfile.mkdtemp(prefix='gphoto2_shell_'))
+        try:
+            self._proc = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=self.workdir,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1,
+            )
+        except OSError as exc:
+            self._close()
+            raise SessionError(f'gphoto2-Shell konnte nicht gestartet werden: {exc}') from exc
+        self._lines = queue.Queue()
+        self._reader = threading.Thread(
+            target=self._read_lines,
+            args=(self._proc, self._lines),
+            name='GPhoto2Shell',
+            daemon=True,
+        )
+        self._reader.start()
+
+    def is_running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def kill(self) -> None:
+        """Kill the process without waiting for a running command.
+
+        The blocked command sees the end of the output, fails with a
+        :class:`SessionError` and removes the working directory; the next
+        command starts a new session.
+        """
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.write('exit\n')
+                proc.stdin.flush()
+                proc.wait(1.0)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+                proc.wait()
+        if self._reader is not None:
+            self._reader.join(1.0)
+            self._reader = None
+        workdir, self.workdir = self.workdir, None
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def _read_lines(proc: subprocess.Popen, lines: queue.Queue) -> None:
+        for line in proc.stdout:
+            lines.put(line.rstrip('\r\n'))
+        lines.put(None)
+
+    # commands --------------------------------------------------------------
+    def _execute(self, command: str) -> List[str]:
+        self.start()
+        proc = self._proc
+        while True:
+            try:
+                self._lines.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            proc.stdin.write(f'{command}\nlcd {self.workdir}\n')
+            proc.stdin.flush()
+        except OSError as exc:
+            self._close()
+            raise SessionError(f'gphoto2-Shell nicht erreichbar: {exc}') from exc
+        deadline = time.monotonic() + self.timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._close()
+                raise SessionError(f'gphoto2-Shell antwortet nicht auf "{command}"')
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                self._close()
+                raise SessionError('gphoto2-Shell wurde beendet')
+            if DONE_RE.search(line):
+                return output
+            output.append(line)
+
+    def run(self, command: str, retry: bool = True) -> List[str]:
+        """Execute *command* and return its output lines.
+
+        Camera errors reported by gphoto2 raise :class:`CameraError`. With
+        *retry* a failed session is restarted and the command sent again.
+        """
+        with self._lock:
+            try:
+                lines = self._execute(command)
+            except SessionError:
+                if not retry:
+                    raise
+                self.restarts += 1
+                lines = self._execute(command)
+        errors = [line for line in lines if ERROR_MARK in line]
+        if errors:
+            raise CameraError('\n'.join(errors))
+        return lines
+
+    def _saved_files(self, lines: List[str]) -> List[Path]:
+        files = []
+        for line in lines:
+            match = SAVED_RE.search(line)
+            if match:
+                files.append(self.workdir / match.group(1))
+        if not files:
+            raise CameraError('Kein Bild von Kamera erhalten')
+        return files
+
+    def _capture_file(self) -> Path:
+        files = self._saved_files(self.run('capture-image-and-download', retry=False))
+        # Bei RAW+JPEG nur das JPEG behalten
+        jpegs = [f for f in files if f.suffix.lower() in ('.jpg', '.jpeg')]
+        keep = jpegs[0] if jpegs else files[0]
+        for f in files:
+            if f != keep:
+                f.unlink(missing_ok=True)
+        return keep
+
+    def capture(self, dest: Path) -> None:
+        shutil.move(str(self._capture_file()), str(dest))
+
+    def capture_bytes(self) -> bytes:
+        """Take a photo and return the downloaded file's content."""
+        path = self._capture_file()
+        try:
+            return path.read_bytes()
+        finally:
+            path.unlink(missing_ok=True)
+
+    def capture_preview(self) -> bytes:
+        files = self._saved_files(self.run('capture-preview'))
+        try:
+            return files[0].read_bytes()
+        finally:
+            for f in files:
+                f.unlink(missing_ok=True)
@@ -0,0 +1,154 @@
+# app/core/camera/manager.py
+"""One owner for the active camera, shared by controller and window."""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future
+from typing import Optional
+
+from PySide6 import QtCore
+
+from .actor import CameraActor
+from .base import BaseCamera
+from .gphoto2_backend import GPhoto2Camera
+from .opencv_backend import OpenCVCamera
+from .simulator import SimulatorCamera
+
+# Im Webcam-Modus standardmaessig die zweite Kamera verwenden
+DEFAULT_WEBCAM_ID = 1
+
+# Kameraeinstellungen, die bei jeder Verwendung frisch gelesen werden und
+# deshalb keinen Neustart der Kamera brauchen
+LIVE_SETTINGS = frozenset({'liveviewFpsZiel', 'burstAnzahl', 'format'})
+
+
+class CameraManager(QtCore.QObject):
+    """Selects, opens, switches and closes the camera of the application.
+
+    The camera is created on first access of :attr:`camera` and wrapped in a
+    :class:`CameraActor`; :meth:`start` opens it in the background. Users
+    keep no reference of their own but follow :attr:`camera_changed`, which
+    fires whenever the camera is replaced, and :attr:`started`, which
+    delivers ``(camera, error)`` once a start attempt has finished.
+
+    With several stations each has its own manager; *station* names the
+    webcam index or gphoto2 port of its camera.
+    """
+
+    camera_changed = QtCore.Signal(object)
+    started = QtCore.Signal(object, object)
+
+    def __init__(self, settings, parent: QtCore.QObject | None = None, station=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.station = station
+        self.logger = logging.getLogger(type(self).__name__)
+        self.current_cam_id = self._webcam_id()
+        self._camera: Optional[BaseCamera] = None
+        self._config: dict | None = None
+
+    # creation ----------------------------------------------------------------
+    @property
+    def camera(self) -> BaseCamera:
+        if self._camera is None:
+            self._config = self._camera_config()
+            self._camera = CameraActor(
+                self.create_camera(),
+                timeout_ms=self.settings.kamera.timeoutMs,
+            )
+        return self._camera
+
+    def _camera_config(self) -> dict:
+        return self.settings.kamera.model_dump(exclude=set(LIVE_SETTINGS))
+
+    def _webcam_id(self) -> int:
+        kamera_id = getattr(self.station, 'kameraId', None)
+        return DEFAULT_WEBCAM_ID if kamera_id is None else kamera_id
+
+    def create_camera(self) -> BaseCamera:
+        """Build the backend selected in the settings; nothing is opened yet."""
+        kamera = self.settings.kamera
+        backend = kamera.backend
+        cam = None
+        if backend == 'gphoto2' and QtCore.QStandardPaths.findExecutable('gphoto2'):
+            cam = GPhoto2Camera(
+                timeout=kamera.timeoutMs / 1000,
+                port=getattr(self.station, 'gphoto2Port', None),
+            )
+        elif backend == 'simulator':
+            cam = SimulatorCamera.from_settings(kamera.simulator)
+        else:
+            try:
+                cam = OpenCVCamera.from_settings(kamera, self._webcam_id())
+                self.current_cam_id = self._webcam_id()
+            except Exception:
+                self.logger.exception('Webcam konnte nicht eingerichtet werden')
+        if cam is None:
+            cam = SimulatorCamera()
+        return cam
+
+    # lifecycle ---------------------------------------------------------------
+    def start(self) -> Future | None:
+        """Open the camera in the background; the result arrives via :attr:`started`."""
+        camera = self.camera
+        start_async = getattr(camera, 'start_liveview_async', None)
+        if start_async is None:
+            try:
+                camera.start_liveview()
+            except Exception as e:
+                self.started.emit(camera, e)
+            else:
+                self.started.emit(camera, None)
+            return None
+
+        def done(future):
+            try:
+                self.started.emit(camera, future.exception())
+            except RuntimeError:
+                pass  # Manager bereits geloescht
+
+        future = start_async()
+        future.add_done_callback(done)
+        return future
+
+    def _teardown(self) -> None:
+        camera, self._camera = self._camera, None
+        if camera is None:
+            return
+        try:
+            camera.stop_liveview()
+        except Exception:
+            self.logger.exception('Kamera konnte nicht gestoppt werden')
+        if hasattr(camera, 'close'):
+            camera.close()
+
+    def restart_camera(self) -> BaseCamera:
+        """Replace the camera with a fresh one built from the settings."""
+        self._teardown()
+        camera = self.camera
+        self.camera_changed.emit(camera)
+        self.start()
+        return camera
+
+    def apply_settings(self) -> bool:
+        """Restart the camera only if its device settings changed; return whether it did.
+
+        Settings in :data:`LIVE_SETTINGS` are read on use and never restart it.
+        """
+        if self._camera is not None and self._camera_config() == self._config:
+            return False
+        self.restart_camera()
+        return True
+
+    def can_switch(self) -> bool:
+        camera = self.camera
+        backend = camera.camera if isinstance(camera, CameraActor) else camera
+        return hasattr(backend, 'switch_camera')
+
+    def switch_camera(self) -> None:
+        if self.can_switch():
+            self.current_cam_id += 1
+            self.camera.switch_camera(self.current_cam_id)
+
+    def shutdown(self) -> None:
+        self._teardown()
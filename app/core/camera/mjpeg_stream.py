@@ -0,0 +1,141 @@
+# app/core/camera/mjpeg_stream.py
+"""Read an MJPEG byte stream from a long-lived subprocess."""
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+from PySide6 import QtCore
+
+from .base import CameraError
+from .frame_grabber import Frame
+
+SOI = b'\xff\xd8'
+EOI = b'\xff\xd9'
+# Schutz gegen Datenmuell ohne JPEG-Endemarker
+MAX_BUFFER = 32 * 1024 * 1024
+
+
+def split_jpeg_frames(buffer: bytearray) -> List[bytes]:
+    """Remove and return all complete JPEG frames from *buffer*.
+
+    Bytes in front of the first start marker are discarded and an incomplete
+    trailing frame stays in *buffer* for the next call.
+    """
+    frames = []
+    while True:
+        start = buffer.find(SOI)
+        if start < 0:
+            # Ein einzelnes 0xFF koennte der Beginn des naechsten Markers sein
+            del buffer[:-1]
+            break
+        end = buffer.find(EOI, start + 2)
+        if end < 0:
+            del buffer[:start]
+            break
+        frames.append(bytes(buffer[start:end + 2]))
+        del buffer[:end + 2]
+    return frames
+
+
+class MjpegStream(QtCore.QObject):
+    """Runs *cmd* and splits its stdout into JPEG frames in a reader thread.
+
+    Only the newest complete frame is kept; older frames that were read in
+    the same chunk are dropped without being decoded. The optional
+    *process* callable decodes the kept frame in the reader thread.
+    """
+
+    frame_ready = QtCore.Signal(int)
+
+    def __init__(
+        self,
+        cmd: Sequence[str],
+        chunk_size: int = 64 * 1024,
+        parent: QtCore.QObject | None = None,
+        process: Callable[[bytes], Any] | None = None,
+    ):
+        super().__init__(parent)
+        self.cmd = list(cmd)
+        self._process = process
+        self.chunk_size = chunk_size
+        self._proc: subprocess.Popen | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._latest: Optional[Frame] = None
+        self._seq = 0
+        self.dropped = 0
+        self.started_at = 0.0
+        self.returncode: int | None = None
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self.stop()
+        self.returncode = None
+        self.started_at = time.monotonic()
+        try:
+            self._proc = subprocess.Popen(
+                self.cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                bufsize=0,
+            )
+        except OSError as exc:
+            self._proc = None
+            self.returncode = -1
+            raise CameraError(f'LiveView-Prozess konnte nicht gestartet werden: {exc}') from exc
+        self._thread = threading.Thread(
+            target=self._run, args=(self._proc,), name='MjpegStream', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._latest = None
+
+    def is_running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def latest(self) -> Optional[Frame]:
+        """Return the newest frame; ``image`` holds the JPEG bytes."""
+        with self._lock:
+            return self._latest
+
+    def _run(self, proc: subprocess.Popen) -> None:
+        buffer = bytearray()
+        stdout = proc.stdout
+        while True:
+            chunk = stdout.read(self.chunk_size)
+            if not chunk:
+                break
+            buffer += chunk
+            frames = split_jpeg_frames(buffer)
+            if len(buffer) > MAX_BUFFER:
+                buffer.clear()
+            if not frames:
+                continue
+            self.dropped += len(frames) - 1
+            data = frames[-1]
+            preview = self._process(data) if self._process is not None else None
+            with self._lock:
+                self._seq += 1
+                seq = self._seq
+                self._latest = Frame(seq, time.monotonic(), data, preview)
+            self.frame_ready.emit(seq)
+        stdout.close()
+        self.returncode = proc.wait()
@@ -1,54 +1,299 @@
 # app/core/camera/opencv_backend.py
 from pathlib import Path
+import logging
+import sys
+import time
+from typing import List, Optional, Tuple
 import cv2
+import numpy as np
 from PySide6 import QtGui
-from .base import BaseCamera, CameraError
+from .base import BaseCamera, CameraError, crop_box, fit_size
+from .frame_grabber import BufferPool, FrameGrabber
+
+# Wie lange ``capture`` auf das erste Bild nach dem Oeffnen wartet
+FIRST_FRAME_TIMEOUT = 2.0
+# Ab so vielen Lesefehlern in Folge gilt die Kamera als ausgefallen
+MAX_READ_FAILURES = 10
+# Nach einem Aufloesungswechsel liefern viele Treiber noch alte Bilder
+SWITCH_DISCARD_FRAMES = 2
+# Bis zu diesem Alter (s) gilt ein Pufferbild bei pausiertem Grabber noch als
+# aktuell; die Aufnahme pausiert die Vorschau erst unmittelbar vorher
+MAX_FRAME_AGE = 0.2
+# Ausschnitt der Lupe, solange keine Anzeigegroesse bekannt ist
+LOUPE_SIZE = (480, 640)
+
+
+def default_api() -> int:
+    """Return the capture API that works best on this platform."""
+    if sys.platform.startswith('linux'):
+        return cv2.CAP_V4L2
+    if sys.platform == 'win32':
+        return cv2.CAP_DSHOW
+    if sys.platform == 'darwin':
+        return cv2.CAP_AVFOUNDATION
+    return cv2.CAP_ANY
 
 
 class OpenCVCamera(BaseCamera):
-    def __init__(self, camera_id: int = 0):
+    """Webcam backend.
+
+    The stream runs at *preview_resolution* in the *fourcc* format (MJPG
+    keeps the frame rate up on USB webcams). If *still_resolution* is set,
+    ``capture`` switches the device to it for a single frame and back.
+    With :meth:`set_loupe` the preview is a 100 % crop instead of the
+    scaled frame.
+    """
+
+    def __init__(
+        self,
+        camera_id: int = 0,
+        buffer_size: int = 3,
+        preview_resolution: Optional[Tuple[int, int]] = None,
+        still_resolution: Optional[Tuple[int, int]] = None,
+        fourcc: Optional[str] = 'MJPG',
+        api: Optional[int] = None,
+    ):
         self.camera_id = camera_id
         self.cap = None
+        self.preview_resolution = preview_resolution
+        self.still_resolution = still_resolution
+        self.fourcc = fourcc
+        self.api = default_api() if api is None else api
+        self.logger = logging.getLogger(type(self).__name__)
+        self.grabber = FrameGrabber(
+            self._read_device, buffer_size, process=self._prepare_preview,
+            skip=self._grab_device,
+        )
+        self.frame_ready = self.grabber.frame_ready
+        # Vorschaupuffer werden im Grabber-Thread reihum beschrieben. Der Ring
+        # ist groesser als der Bildpuffer, damit Bilder im Bildpuffer und das
+        # gerade geschriebene nicht kollidieren; das angezeigte QImage leiht
+        # seinen Puffer, siehe _to_qimage.
+        self._pool = BufferPool(buffer_size + 2)
+        self._resize_buf: np.ndarray | None = None
+        self._loupe: Optional[Tuple[float, float]] = None
+
+    @classmethod
+    def from_settings(cls, settings, camera_id: int = 0) -> 'OpenCVCamera':
+        """Create a camera from :class:`KameraSettings`."""
+        return cls(
+            camera_id,
+            preview_resolution=settings.vorschauAufloesung,
+            still_resolution=settings.fotoAufloesung,
+            fourcc=settings.fourcc or None,
+        )
 
     def start_liveview(self):
         if self.cap is None:
-            self.cap = cv2.VideoCapture(self.camera_id, cv2.CAP_DSHOW)
+            self.cap = self._open()
         if not self.cap.isOpened():
             raise CameraError(f"Kamera {self.camera_id} kann nicht geoeffnet werden")
+        self.grabber.start()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.camera_id, self.api)
+        if not cap.isOpened() and self.api != cv2.CAP_ANY:
+            # Treiber ohne die bevorzugte Schnittstelle: OpenCV waehlen lassen
+            cap.release()
+            cap = cv2.VideoCapture(self.camera_id, cv2.CAP_ANY)
+        if cap.isOpened():
+            if self.fourcc:
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+            self._set_resolution(cap, self.preview_resolution)
+            self.logger.info(
+                "Kamera %s: %s, %dx%d @ %.0f fps", self.camera_id,
+                cap.getBackendName(),
+                cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT),
+                cap.get(cv2.CAP_PROP_FPS),
+            )
+        return cap
+
+    @staticmethod
+    def _set_resolution(cap, resolution: Optional[Tuple[int, int]]) -> None:
+        if resolution:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
 
     def stop_liveview(self):
+        self.grabber.stop()
         if self.cap is not None:
             self.cap.release()
             self.cap = None
 
     def _ensure_open(self):
-        if self.cap is None:
+        if self.cap is None or not self.grabber.is_running():
             self.start_liveview()
 
+    def _read_device(self):
+        cap = self.cap
+        if cap is None:
+            return False, None
+        return cap.read()
+
+    def _grab_device(self) -> bool:
+        # Waehrend der Pause weiter abholen, aber nicht dekodieren: sonst
+        # liefert der Treiber bei der naechsten Aufnahme ein altes Bild
+        cap = self.cap
+        return cap is not None and cap.grab()
+
+    def pause_liveview(self):
+        self.grabber.pause()
+
+    def resume_liveview(self):
+        self.grabber.resume()
+
+    def _read_frames(self, count: int) -> List[np.ndarray]:
+        """Read *count* new frames past the paused grabber."""
+        with self.grabber.exclusive():
+            frames = []
+            for _ in range(count):
+                ok, image = self.cap.read()
+                if ok and image is not None:
+                    frames.append(image)
+        if not frames:
+            raise CameraError("Kein Bild von Kamera erhalten")
+        return frames
+
+    def _latest_frame(self):
+        frame = self.grabber.latest()
+        if frame is None:
+            frame = self.grabber.wait_for_frame(timeout=FIRST_FRAME_TIMEOUT)
+        if frame is None:
+            raise CameraError("Kein Bild von Kamera erhalten")
+        return frame.image
+
+    def _recent_frames(self, count: int) -> List[np.ndarray]:
+        """Return up to *count* buffered frames younger than :data:`MAX_FRAME_AGE`."""
+        oldest = time.monotonic() - MAX_FRAME_AGE
+        return [f.image for f in self.grabber.frames()[-count:] if f.timestamp >= oldest]
+
+    def _read_still(self, count: int = 1) -> List[np.ndarray]:
+        """Read *count* frames at the still resolution, then restore the preview."""
+        with self.grabber.exclusive():
+            cap = self.cap
+            # Die tatsaechliche Groesse merken: ohne vorschauAufloesung laeuft
+            # der Strom in der Treibervorgabe, die sonst verloren ginge
+            stream = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            self._set_resolution(cap, self.still_resolution)
+            try:
+                frames = []
+                for _ in range(SWITCH_DISCARD_FRAMES + count):
+                    ok, image = cap.read()
+                    if ok and image is not None:
+                        frames.append(image)
+            finally:
+                self._set_resolution(cap, stream if all(stream) else self.preview_resolution)
+        if not frames:
+            raise CameraError("Kein Bild von Kamera erhalten")
+        return frames[-count:]
+
+    def _uses_still_resolution(self) -> bool:
+        return bool(self.still_resolution) and self.still_resolution != self.preview_resolution
+
     def capture(self, dest: Path) -> None:
+        if not cv2.imwrite(str(dest), self.capture_frame()):
+            raise CameraError(f"Konnte Aufnahme nicht speichern: {dest}")
+
+    def capture_frame(self) -> np.ndarray:
+        """Return the photo as rotated BGR array."""
         self._ensure_open()
-        ret, frame = self.cap.read()
-        if not ret:
+        if self._uses_still_resolution():
+            frame = self._read_still()[-1]
+        elif self.grabber.paused():
+            # Ein Bild von kurz vor der Pause ist noch aktuell, nach einer
+            # laengeren Pause wird neu gelesen
+            recent = self._recent_frames(1)
+            frame = recent[-1] if recent else self._read_frames(1)[-1]
+        else:
+            # Das neueste Vollbild aus dem Puffer verwenden statt erneut zu lesen
+            frame = self._latest_frame()
+        return cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+
+    def capture_burst(self, count: int) -> List[np.ndarray]:
+        """Return *count* consecutive frames, rotated like :meth:`capture`."""
+        self._ensure_open()
+        if self._uses_still_resolution():
+            images = self._read_still(count)
+        elif self.grabber.paused():
+            images = self._recent_frames(count)
+            if len(images) < count:
+                images = self._read_frames(count)
+        else:
+            images = [f.image for f in self.grabber.burst(count, FIRST_FRAME_TIMEOUT)]
+        if not images:
             raise CameraError("Kein Bild von Kamera erhalten")
-        frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        cv2.imwrite(str(dest), frame)
+        return [cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE) for image in images]
 
     def capture_preview(self, dest: Path) -> None:
         self.capture(dest)
 
     def get_preview_qimage(self) -> QtGui.QImage:
         self._ensure_open()
-        ret, frame = self.cap.read()
-        if not ret:
-            raise CameraError("Kein Bild von Kamera erhalten")
-        frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb.shape
-        bytes_per_line = ch * w
-        img = QtGui.QImage(rgb.data, w, h, bytes_per_line, QtGui.QImage.Format_RGB888)
-        return img.copy()
+        latest = self.grabber.latest()
+        if latest is None or latest.preview is None:
+            if self.grabber.failures >= MAX_READ_FAILURES:
+                raise CameraError("Kein Bild von Kamera erhalten")
+            # Noch kein Bild da - der Grabber meldet sich ueber frame_ready
+            return QtGui.QImage()
+        return self._to_qimage(latest.preview)
+
+    def set_loupe(self, center: Optional[Tuple[float, float]]) -> bool:
+        """Show the frame around *center* at full resolution; ``None`` ends it.
+
+        *center* is relative to the displayed (rotated) preview. The crop
+        takes effect with the next frame.
+        """
+        self._loupe = center
+        return True
+
+    def _prepare_preview(self, frame: np.ndarray) -> np.ndarray:
+        """Shrink and rotate *frame* for display; runs in the grabber thread."""
+        loupe = self._loupe
+        if loupe is not None:
+            return self._prepare_loupe(frame, loupe)
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        elif frame.shape[2] == 4:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        h, w = frame.shape[:2]
+        # Nach der Drehung ist das Bild h Pixel breit und w Pixel hoch
+        out_w, out_h = fit_size(h, w, self.preview_size)
+        if (out_w, out_h) != (h, w):
+            # Vor dem Drehen verkleinern, dann wird nur noch wenig gedreht
+            if self._resize_buf is None or self._resize_buf.shape != (out_w, out_h, 3):
+                self._resize_buf = np.empty((out_w, out_h, 3), np.uint8)
+            frame = cv2.resize(
+                frame, (out_h, out_w), dst=self._resize_buf, interpolation=cv2.INTER_AREA
+            )
+        buf = self._pool.next((out_h, out_w, 3))
+        cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE, dst=buf)
+        return buf
+
+    def _prepare_loupe(self, frame: np.ndarray, center: Tuple[float, float]) -> np.ndarray:
+        """Cut the display-sized region around *center* and rotate only that."""
+        out_w, out_h = self.preview_size or LOUPE_SIZE
+        h, w = frame.shape[:2]
+        # Nach der Drehung laeuft die x-Achse der Anzeige entlang der Zeilen
+        x, y, cw, ch = crop_box(w, h, (1 - center[1], center[0]), (out_h, out_w))
+        crop = frame[y:y + ch, x:x + cw]
+        if crop.ndim == 2:
+            crop = cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
+        elif crop.shape[2] == 4:
+            crop = cv2.cvtColor(crop, cv2.COLOR_BGRA2BGR)
+        buf = self._pool.next((cw, ch, 3))
+        cv2.rotate(crop, cv2.ROTATE_90_COUNTERCLOCKWISE, dst=buf)
+        return buf
+
+    def _to_qimage(self, preview: np.ndarray) -> QtGui.QImage:
+        # Format_BGR888 spart die Farbumwandlung, und das QImage verweist ohne
+        # Kopie auf den Poolpuffer. Der Puffer bleibt verliehen, bis die
+        # Oberflaeche das QImage freigibt; erst dann beschreibt ihn der Grabber neu.
+        h, w = preview.shape[:2]
+        img = QtGui.QImage(preview.data, w, h, preview.strides[0], QtGui.QImage.Format_BGR888)
+        self._pool.lease(preview, img)
+        return img
 
     def switch_camera(self, camera_id: int):
         self.stop_liveview()
         self.camera_id = camera_id
-        self.start_liveview()
\ No newline at end of file
+        self.start_liveview()
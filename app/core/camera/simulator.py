@@ -1,31 +1,296 @@
 # app/core/camera/simulator.py
 from pathlib import Path
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
 from PIL import Image, ImageDraw
 from PySide6 import QtGui
-import time
-from .base import BaseCamera
+
+from .base import BaseCamera, CameraError, CapturedFrame, crop_box, fit_size
+from .frame_grabber import BufferPool, FrameGrabber
+
+# Aufloesung der Bilder im Lastmodus, wenn nur eine Bildrate angegeben ist
+DEFAULT_RESOLUTION = (6000, 4000)
+# Vorgerenderte Bilder pro Bewegungszyklus des Motivs
+DEFAULT_POOL_SIZE = 8
+# Wie lange ``capture`` auf das erste Bild wartet
+FIRST_FRAME_TIMEOUT = 2.0
+# Ab so vielen Lesefehlern in Folge gilt die Kamera als ausgefallen
+MAX_READ_FAILURES = 10
+# Ausschnitt der Lupe, solange keine Anzeigegroesse bekannt ist
+LOUPE_SIZE = (640, 480)
 
 
 class SimulatorCamera(BaseCamera):
+    """Camera without hardware.
+
+    Without arguments every preview and capture is a freshly drawn image
+    with the current time. Passing *resolution* or *fps* switches to a
+    deterministic load generator for benchmarks: a pool of *pool_size*
+    frames with a moving subject is rendered once from *seed* and served
+    by a :class:`FrameGrabber` at *fps* (``None`` means as fast as
+    possible). *latency_ms* +/- *jitter_ms* is added to every read and
+    capture, and *failure_rate* of them fail. :meth:`set_loupe` works in
+    this mode only.
+    """
+
+    def __init__(
+        self,
+        resolution: Optional[Tuple[int, int]] = None,
+        fps: Optional[float] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        seed: int = 0,
+        buffer_size: int = 3,
+    ):
+        self.benchmark = resolution is not None or fps is not None
+        self._loupe: Optional[Tuple[float, float]] = None
+        if not self.benchmark:
+            return
+        self.resolution = tuple(resolution or DEFAULT_RESOLUTION)
+        self.fps = fps
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.pool = render_pool(self.resolution, pool_size, seed)
+        self.grabber = FrameGrabber(
+            self._read_pool, buffer_size, process=self._prepare_preview
+        )
+        self.frame_ready = self.grabber.frame_ready
+        self._preview_pool = BufferPool(buffer_size + 2)
+        # Lesen (Grabber-Thread) und Aufnehmen haben getrennte Zufallsquellen,
+        # damit beide Folgen unabhaengig vom Timing reproduzierbar sind
+        self._read_rng = random.Random(seed)
+        self._capture_rng = random.Random(seed + 1)
+        self._index = 0
+        self._next_due = 0.0
+        self._jpeg_lock = threading.Lock()
+        self._jpegs: dict[int, bytes] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> 'SimulatorCamera':
+        """Create a simulator from :class:`SimulatorSettings`."""
+        return cls(
+            resolution=settings.aufloesung,
+            fps=settings.fps,
+            latency_ms=settings.latenzMs,
+            jitter_ms=settings.jitterMs,
+            failure_rate=settings.fehlerquote,
+            seed=settings.seed,
+        )
+
     def start_liveview(self):
-        pass
+        if self.benchmark:
+            self._next_due = time.monotonic()
+            self.grabber.start()
 
     def stop_liveview(self):
-        pass
+        if self.benchmark:
+            self.grabber.stop()
+
+    def pause_liveview(self):
+        if self.benchmark:
+            self.grabber.pause()
+
+    def resume_liveview(self):
+        if self.benchmark:
+            self.grabber.resume()
 
     def capture(self, dest: Path) -> None:
+        if self.benchmark:
+            Path(dest).write_bytes(self._capture_pool())
+            return
+        self._still().save(dest)
+
+    def capture_frame(self) -> CapturedFrame:
+        """Return JPEG bytes in load mode like a DSLR, else a BGR array."""
+        if self.benchmark:
+            return self._capture_pool()
+        return cv2.cvtColor(np.asarray(self._still()), cv2.COLOR_RGB2BGR)
+
+    def capture_burst(self, count: int) -> List[np.ndarray]:
+        """Return *count* consecutive BGR frames."""
+        if not self.benchmark:
+            return [cv2.cvtColor(np.asarray(self._still()), cv2.COLOR_RGB2BGR)
+                    for _ in range(count)]
+        if not self.grabber.is_running():
+            self.start_liveview()
+        self._delay(self._capture_rng)
+        if self._capture_rng.random() < self.failure_rate:
+            raise CameraError("Simulierter Aufnahmefehler")
+        if self.grabber.paused():
+            return self._read_frames(count)
+        frames = self.grabber.burst(count, FIRST_FRAME_TIMEOUT)
+        if not frames:
+            raise CameraError("Kein Bild von Kamera erhalten")
+        return [frame.image for frame in frames]
+
+    @staticmethod
+    def _still() -> Image.Image:
         img = Image.new('RGB', (1920, 1080), (128, 128, 128))
         d = ImageDraw.Draw(img)
         d.text((10, 10), time.strftime('%H:%M:%S'), fill=(255, 255, 255))
-        img.save(dest)
+        return img
 
     def capture_preview(self, dest: Path) -> None:
         self.capture(dest)
 
     def get_preview_qimage(self) -> QtGui.QImage:
-        img = Image.new('RGB', (640, 480), (80, 80, 80))
+        if self.benchmark:
+            return self._pool_preview()
+        size = fit_size(640, 480, self.preview_size)
+        img = Image.new('RGB', size, (80, 80, 80))
         d = ImageDraw.Draw(img)
         d.text((10, 10), time.strftime('%H:%M:%S'), fill=(255, 255, 255))
         data = img.tobytes('raw', 'RGB')
-        qimg = QtGui.QImage(data, img.width, img.height, QtGui.QImage.Format_RGB888)
-        return qimg
+        qimg = QtGui.QImage(
+            data, img.width, img.height, 3 * img.width, QtGui.QImage.Format_RGB888
+        )
+        return qimg.copy()
+
+    # load generator ----------------------------------------------------------
+    def _delay(self, rng: random.Random) -> None:
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _read_pool(self):
+        if self.fps:
+            # Feste Taktung ohne Drift; wer zu spaet kommt, holt nicht auf
+            wait = self._next_due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_due = max(self._next_due + 1 / self.fps, time.monotonic())
+        self._delay(self._read_rng)
+        if self._read_rng.random() < self.failure_rate:
+            return False, None
+        frame = self.pool[self._index % len(self.pool)]
+        self._index += 1
+        # Poolbilder werden nie beschrieben und daher ohne Kopie weitergegeben
+        return True, frame
+
+    def set_loupe(self, center: Optional[Tuple[float, float]]) -> bool:
+        """Show the frame around *center* at full resolution; ``None`` ends it.
+
+        Returns ``False`` outside the load mode, whose drawn preview has no
+        finer resolution to show.
+        """
+        if not self.benchmark:
+            return center is None
+        self._loupe = center
+        return True
+
+    def _prepare_preview(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        loupe = self._loupe
+        if loupe is not None:
+            # Nur den Ausschnitt kopieren, das Vollbild bleibt unangetastet
+            x, y, cw, ch = crop_box(w, h, loupe, self.preview_size or LOUPE_SIZE)
+            buf = self._preview_pool.next((ch, cw, 3))
+            np.copyto(buf, frame[y:y + ch, x:x + cw])
+            return buf
+        out_w, out_h = fit_size(w, h, self.preview_size)
+        buf = self._preview_pool.next((out_h, out_w, 3))
+        if (out_w, out_h) == (w, h):
+            np.copyto(buf, frame)
+        else:
+            cv2.resize(frame, (out_w, out_h), dst=buf, interpolation=cv2.INTER_AREA)
+        return buf
+
+    def _pool_preview(self) -> QtGui.QImage:
+        if not self.grabber.is_running():
+            self.start_liveview()
+        latest = self.grabber.latest()
+        if latest is None or latest.preview is None:
+            if self.grabber.failures >= MAX_READ_FAILURES:
+                raise CameraError("Kein Bild von Kamera erhalten")
+            return QtGui.QImage()
+        preview = latest.preview
+        h, w = preview.shape[:2]
+        img = QtGui.QImage(preview.data, w, h, preview.strides[0], QtGui.QImage.Format_BGR888)
+        # Wie bei OpenCVCamera: verliehen, bis die Oberflaeche das Bild freigibt
+        self._preview_pool.lease(preview, img)
+        return img
+
+    def _capture_pool(self) -> bytes:
+        if not self.grabber.is_running():
+            self.start_liveview()
+        self._delay(self._capture_rng)
+        if self._capture_rng.random() < self.failure_rate:
+            raise CameraError("Simulierter Aufnahmefehler")
+        if self.grabber.paused():
+            # Der Puffer stammt von vor der Pause
+            return self._jpeg(self._read_frames(1)[-1])
+        frame = self.grabber.latest() or self.grabber.wait_for_frame(
+            timeout=FIRST_FRAME_TIMEOUT
+        )
+        if frame is None:
+            raise CameraError("Kein Bild von Kamera erhalten")
+        return self._jpeg(frame.image)
+
+    def _read_frames(self, count: int) -> List[np.ndarray]:
+        """Read *count* frames past the paused grabber."""
+        with self.grabber.exclusive():
+            frames = [image for ok, image in (self._read_pool() for _ in range(count)) if ok]
+        if not frames:
+            raise CameraError("Kein Bild von Kamera erhalten")
+        return frames
+
+    def _jpeg(self, image: np.ndarray) -> bytes:
+        """Encode a pool frame once and reuse the bytes like a DSLR would."""
+        key = id(image)
+        with self._jpeg_lock:
+            data = self._jpegs.get(key)
+            if data is None:
+                ok, enc = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 92])
+                if not ok:
+                    raise CameraError("Bild konnte nicht kodiert werden")
+                data = self._jpegs[key] = enc.tobytes()
+        return data
+
+
+def render_pool(resolution: Tuple[int, int], size: int, seed: int = 0) -> list[np.ndarray]:
+    """Render *size* BGR frames of a subject moving across a textured backdrop.
+
+    The subject completes one loop per pool, so consecutive frames always
+    differ and the sequence repeats seamlessly. The output depends only on
+    the arguments.
+    """
+    w, h = resolution
+    rng = np.random.default_rng(seed)
+    # Hintergrund: Farbverlauf mit fester Koernung, damit JPEGs realistisch gross werden
+    ramp = np.linspace(60, 160, h, dtype=np.float32)[:, None, None]
+    tint = np.array([1.0, 0.9, 0.8], np.float32)[None, None, :]
+    background = np.broadcast_to(ramp * tint, (h, w, 3)).astype(np.int16)
+    background += rng.integers(-12, 13, (h, w, 1), dtype=np.int16)
+    background = np.clip(background, 0, 255).astype(np.uint8)
+
+    unit = min(w, h)
+    head = (max(1, unit // 8), max(1, unit // 6))
+    body = (max(1, unit // 4), max(1, unit // 3))
+    thickness = max(1, unit // 200)
+    skin = tuple(int(c) for c in rng.integers(120, 220, 3))
+    shirt = tuple(int(c) for c in rng.integers(30, 200, 3))
+    frames = []
+    for i in range(max(1, size)):
+        phase = 2 * np.pi * i / max(1, size)
+        cx = int(w / 2 + w / 6 * np.sin(phase))
+        cy = int(h / 2 + h / 12 * np.sin(2 * phase))
+        frame = background.copy()
+        cv2.ellipse(frame, (cx, cy + head[1] + body[1]), body, 0, 180, 360, shirt, -1)
+        cv2.ellipse(frame, (cx, cy), head, 0, 0, 360, skin, -1)
+        cv2.putText(
+            frame, f'{i:03d}', (unit // 40, unit // 10),
+            cv2.FONT_HERSHEY_SIMPLEX, unit / 600, (255, 255, 255), thickness,
+        )
+        frames.append(frame)
+    return frames
@@ -0,0 +1,127 @@
+# app/core/camera/watchdog.py
+"""Timeouts, recovery and retries for camera operations."""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any, Callable, Deque, List, Optional
+
+from .base import CameraError, CameraTimeout
+
+# Anzahl der gemerkten Versuche fuer die Latenzauswertung
+HISTORY_SIZE = 200
+
+
+@dataclass
+class Attempt:
+    """Outcome of one try of a camera operation."""
+
+    operation: str
+    attempt: int
+    latency_ms: float
+    error: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class Watchdog:
+    """Waits for camera futures with a timeout and retries failed attempts.
+
+    *submit* callables passed to :meth:`call` start one attempt and return
+    its future. If an attempt does not finish within *timeout_ms*,
+    *recover* is called with the hung future to free the device. Timeouts
+    and :class:`CameraError` are retried up to *retries* times, waiting
+    *backoff_s*, then twice as long, and so on; calls with ``retry=False``
+    (captures, where the shutter may already have fired) fail on the first
+    error. The worst case of one call is therefore ``(retries + 1) *
+    timeout`` plus the backoff pauses. Every attempt is kept in
+    :attr:`attempts`.
+    """
+
+    def __init__(
+        self,
+        timeout_ms: Optional[int] = None,
+        retries: int = 0,
+        backoff_s: float = 0.5,
+        recover: Callable[[Optional[Future]], None] | None = None,
+    ):
+        self.timeout_ms = timeout_ms
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.recover = recover
+        self.logger = logging.getLogger(type(self).__name__)
+        self._lock = threading.Lock()
+        self.attempts: Deque[Attempt] = deque(maxlen=HISTORY_SIZE)
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self.timeout_ms / 1000 if self.timeout_ms else None
+
+    def expired(self, started: float) -> bool:
+        """Return ``True`` if an attempt started at *started* has timed out."""
+        timeout = self.timeout
+        return timeout is not None and time.monotonic() - started > timeout
+
+    def call(self, operation: str, submit: Callable[[], Future], retry: bool = True) -> Any:
+        error: CameraError | None = None
+        for attempt in range((self.retries if retry else 0) + 1):
+            if attempt:
+                time.sleep(self.backoff_s * 2 ** (attempt - 1))
+            started = time.monotonic()
+            future = submit()
+            try:
+                result = future.result(self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                error = CameraTimeout(
+                    f"Zeitueberschreitung bei {operation} nach {self.timeout_ms} ms"
+                )
+                self.record(operation, attempt, started, error)
+                self.timed_out(future)
+            except CameraError as exc:
+                error = exc
+                self.record(operation, attempt, started, exc)
+            else:
+                self.record(operation, attempt, started)
+                return result
+        raise error
+
+    def timed_out(self, future: Optional[Future] = None) -> None:
+        if self.recover is None:
+            return
+        try:
+            self.recover(future)
+        except Exception:
+            self.logger.exception("Kamera konnte nicht zurueckgesetzt werden")
+
+    def record(
+        self,
+        operation: str,
+        attempt: int,
+        started: float,
+        error: Exception | None = None,
+    ) -> Attempt:
+        entry = Attempt(
+            operation, attempt, (time.monotonic() - started) * 1000, str(error or '')
+        )
+        with self._lock:
+            self.attempts.append(entry)
+        if entry.ok:
+            self.logger.debug("%s (Versuch %d): %.0f ms", operation, attempt + 1, entry.latency_ms)
+        else:
+            self.logger.warning(
+                "%s (Versuch %d) nach %.0f ms fehlgeschlagen: %s",
+                operation, attempt + 1, entry.latency_ms, entry.error,
+            )
+        return entry
+
+    def latencies(self, operation: str) -> List[float]:
+        """Return the latencies of all recorded attempts of *operation*."""
+        with self._lock:
+            return [a.latency_ms for a in self.attempts if a.operation == operation]
@@ -4,7 +4,7 @@
 from pathlib import Path
 import json
 import os
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
@@ -17,6 +17,13 @@ DEFAULTS = {
         'hoehe': 1600,
         'qualitaet': 90,
         'seitenverhaeltnis': '3:4',
+        'gesichtZentrieren': True,
+        'kopfAnteil': 0.45,
+        'augenlinie': 0.4,
+        'gesichtsModell': '',
+        'duplikatAbstand': 6,
+        'verarbeitungsProzesse': 2,
+        'verarbeitungsWarteschlange': 4,
     },
     'overlay': {
         'drittellinien': True,
@@ -29,6 +36,27 @@ DEFAULTS = {
         'liveviewFpsZiel': 20,
         'format': 'JPEG',
         'timeoutMs': 5000,
+        'vorschauAufloesung': None,
+        'fotoAufloesung': None,
+        'fourcc': 'MJPG',
+        'burstAnzahl': 1,
+        'simulator': {
+            'aufloesung': None,
+            'fps': None,
+            'latenzMs': 0,
+            'jitterMs': 0,
+            'fehlerquote': 0.0,
+            'seed': 0,
+        },
+    },
+    'stationen': [],
+    'analyse': {
+        'autoAusloesung': False,
+        'autoHaltezeitMs': 1500,
+        'autoBewegungsSchwelle': 3.0,
+        'ausweisScan': False,
+        'histogramm': True,
+        'fokusPeaking': False,
     },
     'zip': {'maxAnzahl': None, 'maxGroesseMB': None},
     'copyright': {'artist': '', 'copyright': ''},
@@ -53,6 +81,24 @@ class BildSettings(BaseModel):
     hoehe: int
     qualitaet: int
     seitenverhaeltnis: Tuple[int, int] = (3, 4)
+    # Zuschnitt am erkannten Gesicht statt an der Bildmitte
+    gesichtZentrieren: bool = True
+    kopfAnteil: float = Field(default=0.45, gt=0.0, le=1.0)
+    augenlinie: float = Field(default=0.4, ge=0.0, le=1.0)
+    # Optionales YuNet-Modell (ONNX); ohne wird die Haar-Kaskade von OpenCV genutzt
+    gesichtsModell: Optional[Path] = None
+    # Warnen, wenn ein Foto einem anderen bis auf so viele Bit des dHash
+    # gleicht (0 = aus)
+    duplikatAbstand: int = Field(default=6, ge=0, le=64)
+    # Prozesse fuer Zuschnitt, Skalierung und JPEG (0 = Thread im Programm)
+    verarbeitungsProzesse: int = Field(default=2, ge=0)
+    # Hoechstzahl wartender Bilder, danach wartet die naechste Aufnahme
+    verarbeitungsWarteschlange: int = Field(default=4, ge=1)
+
+    @field_validator('gesichtsModell', mode='before')
+    @classmethod
+    def check_model(cls, v):
+        return Path(v) if v else None
 
     @field_validator('seitenverhaeltnis', mode='before')
     @classmethod
@@ -83,11 +129,74 @@ class OverlaySettings(BaseModel):
         return p
 
 
+def parse_resolution(v):
+    """Accept ``"WxH"`` strings or two-element sequences as resolution."""
+    if v is None or v == '':
+        return None
+    if isinstance(v, str) and 'x' in v.lower():
+        a, b = v.lower().split('x', 1)
+        if a.strip().isdigit() and b.strip().isdigit():
+            return int(a), int(b)
+    if isinstance(v, (list, tuple)) and len(v) == 2:
+        return int(v[0]), int(v[1])
+    raise ValueError('Invalid resolution format')
+
+
+class SimulatorSettings(BaseModel):
+    """Load generator mode of the simulator; ``None`` keeps the plain simulator."""
+
+    aufloesung: Optional[Tuple[int, int]] = None
+    fps: Optional[float] = None
+    latenzMs: float = 0
+    jitterMs: float = 0
+    fehlerquote: float = Field(default=0.0, ge=0.0, le=1.0)
+    seed: int = 0
+
+    @field_validator('aufloesung', mode='before')
+    @classmethod
+    def check_resolution(cls, v):
+        return parse_resolution(v)
+
+
 class KameraSettings(BaseModel):
     backend: str = 'opencv'
     liveviewFpsZiel: int = 20
     format: str = 'JPEG'
     timeoutMs: int = 5000
+    vorschauAufloesung: Optional[Tuple[int, int]] = None
+    fotoAufloesung: Optional[Tuple[int, int]] = None
+    fourcc: str = 'MJPG'
+    # Bilder pro Aufnahme, von denen das schaerfste behalten wird; 1 = aus
+    burstAnzahl: int = Field(default=1, ge=1, le=20)
+    simulator: SimulatorSettings = Field(default_factory=SimulatorSettings)
+
+    @field_validator('vorschauAufloesung', 'fotoAufloesung', mode='before')
+    @classmethod
+    def check_resolution(cls, v):
+        return parse_resolution(v)
+
+
+class StationSettings(BaseModel):
+    """One capture station; several run side by side in one application."""
+
+    name: str = ''
+    kameraId: Optional[int] = None
+    gphoto2Port: Optional[str] = None
+
+
+class AnalyseSettings(BaseModel):
+    """Live-view analyses that run alongside the preview."""
+
+    # Automatisch ausloesen, sobald ein Gesicht ruhig im Rahmen steht
+    autoAusloesung: bool = False
+    autoHaltezeitMs: int = Field(default=1500, ge=0)
+    autoBewegungsSchwelle: float = Field(default=3.0, gt=0)
+    # Schuelerausweise (QR-Code/Barcode) in der Vorschau erkennen
+    ausweisScan: bool = False
+    # Histogramm und abgeschnittene Lichter/Tiefen in der Vorschau
+    histogramm: bool = True
+    # Scharfe Kanten einfaerben und Schaerfewert anzeigen
+    fokusPeaking: bool = False
 
 
 class ZipSettings(BaseModel):
@@ -118,6 +227,8 @@ class Settings(BaseModel):
     bild: BildSettings = Field(default_factory=BildSettings)
     overlay: OverlaySettings = Field(default_factory=OverlaySettings)
     kamera: KameraSettings = Field(default_factory=KameraSettings)
+    stationen: List[StationSettings] = Field(default_factory=list)
+    analyse: AnalyseSettings = Field(default_factory=AnalyseSettings)
     zip: ZipSettings = Field(default_factory=ZipSettings)
     copyright: CopyrightSettings = Field(default_factory=CopyrightSettings)
     excelMapping: ExcelMapping = Field(default_factory=ExcelMapping)
@@ -137,6 +248,15 @@ class Settings(BaseModel):
         data['missedPath'] = str(data['missedPath'])
         ratio = data['bild']['seitenverhaeltnis']
         data['bild']['seitenverhaeltnis'] = f"{ratio[0]}:{ratio[1]}"
+        model = data['bild'].get('gesichtsModell')
+        data['bild']['gesichtsModell'] = str(model) if model else ''
+        for section, key in (
+            (data['kamera'], 'vorschauAufloesung'),
+            (data['kamera'], 'fotoAufloesung'),
+            (data['kamera']['simulator'], 'aufloesung'),
+        ):
+            if section[key]:
+                section[key] = f"{section[key][0]}x{section[key][1]}"
         img = data['overlay'].get('image')
         data['overlay']['image'] = str(img) if img else ''
         path.write_text(json.dumps(data, indent=2), encoding='utf-8')
@@ -1,64 +1,86 @@
 from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import logging
 import psutil
-from PySide6 import QtCore
 
-from .config.settings import Settings
-from .camera import SimulatorCamera, GPhoto2Camera, OpenCVCamera
-from .excel.reader import ExcelReader, Learner
-from .excel.missed_writer import MissedWriter, MissedEntry
-from .imaging.processor import process_image
+from .config.settings import Settings, StationSettings
+from .camera import CameraManager
+from .camera.base import CapturedFrame
+from .excel.reader import Learner
+from .excel.roster import RosterIndex
+from .excel.missed_writer import MissedEntry
+from .imaging.duplicates import process_and_hash
+from .imaging.face_crop import FaceRules
+from .imaging.processor import process_image, save_raw
+from .imaging.sharpness import best_frame
+from .stations import StationHub
 from .util.paths import class_output_dir, new_learner_dir, unique_file_path
 
 
+# Unterordner fuer Aufnahmen, deren Verarbeitung fehlgeschlagen ist; er wird
+# nicht mit gezippt
+RAW_DIR = "unbearbeitet"
+
+
 class MainController:
-    """Service layer containing business logic for the application."""
+    """Service layer containing business logic for the application.
 
-    def __init__(self, settings: Settings):
+    One controller drives one capture station: its camera, its learner
+    queue and a worker thread for captures and Excel updates. Stations of
+    the same application share a :class:`StationHub`.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        cameras: CameraManager | None = None,
+        hub: StationHub | None = None,
+        station: StationSettings | None = None,
+    ):
         self.settings = settings
-        self.camera = self._init_camera()
-        self.reader: Optional[ExcelReader] = None
+        self.logger = logging.getLogger(type(self).__name__)
+        self.station = station or StationSettings()
+        self._owns_hub = hub is None
+        self.hub = hub or StationHub(settings)
+        self.cameras = cameras or CameraManager(settings, station=self.station)
+        self.reader: Optional[RosterIndex] = None
         self.learners: List[Learner] = []
         self.current: int = 0
         self.current_classes: List[str] = []
+        self._worker = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"Station{self.station.name}"
+        )
+
+    # worker -----------------------------------------------------------------
+    def submit(self, fn, *args) -> Future:
+        """Run ``fn(*args)`` on this station's worker thread."""
+        return self._worker.submit(fn, *args)
+
+    def shutdown(self):
+        # Laufende Aufnahmen nicht abwarten, eine haengende Kamera wuerde
+        # sonst das Schliessen blockieren
+        self._worker.shutdown(wait=False, cancel_futures=True)
+        self.cameras.shutdown()
+        if self._owns_hub:
+            self.hub.close()
 
     # camera -----------------------------------------------------------------
-    def _init_camera(self):
-        backend = getattr(self.settings.kamera, "backend", "opencv")
-        cam = None
-        if backend == "gphoto2" and QtCore.QStandardPaths.findExecutable("gphoto2"):
-            cam = GPhoto2Camera()
-        elif backend == "simulator":
-            cam = SimulatorCamera()
-        else:
-            try:
-                # In Webcam-Modus standardmaessig die zweite Kamera verwenden
-                cam = OpenCVCamera(1)
-                self.current_cam_id = 1
-            except Exception:
-                cam = None
-        if cam is None:
-            cam = SimulatorCamera()
-        return cam
+    @property
+    def camera(self):
+        return self.cameras.camera
 
     def restart_camera(self):
-        if hasattr(self.camera, "stop_liveview"):
-            self.camera.stop_liveview()
-        self.camera = self._init_camera()
-        if hasattr(self.camera, "start_liveview"):
-            self.camera.start_liveview()
-        return self.camera
+        return self.cameras.restart_camera()
 
     def switch_camera(self):
-        if hasattr(self.camera, "switch_camera"):
-            self.current_cam_id = getattr(self, "current_cam_id", 0) + 1
-            self.camera.switch_camera(self.current_cam_id)
+        self.cameras.switch_camera()
 
     # excel handling ---------------------------------------------------------
     def load_excel(self, path: Path) -> List[str]:
-        self.reader = ExcelReader(path, self.settings.excelMapping)
+        self.reader = self.hub.roster(path)
         locations = self.reader.locations()
         return locations
 
@@ -90,6 +112,18 @@ class MainController:
     def advance(self):
         self.current += 1
 
+    def find_learner(self, location: str, schueler_id: str) -> Optional[Learner]:
+        if not self.reader or not location:
+            return None
+        return self.reader.find(location, schueler_id.strip())
+
+    def queue_index(self, learner: Learner) -> Optional[int]:
+        """Return the position of *learner* in the current queue, if it is there."""
+        for idx, queued in enumerate(self.learners):
+            if queued.schueler_id == learner.schueler_id and queued.klasse == learner.klasse:
+                return idx
+        return None
+
     # actions ----------------------------------------------------------------
     def excel_running(self) -> bool:
         for proc in psutil.process_iter(["name"]):
@@ -102,24 +136,116 @@ class MainController:
         return False
 
     def capture(self, learner: Learner, location: str) -> Path:
+        """Take and process a photo; return its path once it is saved."""
+        return self.capture_async(learner, location).result()
+
+    def capture_async(self, learner: Learner, location: str) -> Future:
+        """Take a photo and hand it to the imaging pool.
+
+        Returns as soon as the raw frame is held by the pool. The returned
+        future yields the path of the processed photo. If processing fails,
+        the unprocessed photo is kept in the ``unbearbeitet`` folder next to
+        it and the error says where.
+        """
         if learner.is_new:
             out_dir = new_learner_dir(self.settings.ausgabeBasisPfad, location, learner.klasse)
             raw_path = unique_file_path(out_dir, f"{learner.vorname}_{learner.nachname}.jpg")
         else:
             out_dir = class_output_dir(self.settings.ausgabeBasisPfad, location, learner.klasse)
             raw_path = unique_file_path(out_dir, f"{learner.schueler_id}.jpg")
-        self.camera.capture(raw_path)
         aspect = getattr(self.settings.bild, "seitenverhaeltnis", (3, 4))
-        process_image(
-            raw_path,
+        frame = self._capture_frame(raw_path)
+        processing = self.hub.imaging.submit(
+            process_and_hash,
+            frame,
+            process_image,
             raw_path,
             self.settings.bild.breite,
             self.settings.bild.hoehe,
             self.settings.bild.qualitaet,
             aspect,
+            face=self._face_rules(),
         )
+        result: Future = Future()
+
+        def processed(future: Future):
+            try:
+                value = future.result()
+            except BaseException as e:
+                result.set_exception(self._keep_raw(frame, raw_path, e))
+                return
+            # Der Hash kommt fertig aus dem Arbeitsprozess: kein Dateizugriff
+            # im Ergebnis-Thread des Pools
+            self._remember_photo(learner, location, raw_path, value)
+            result.set_result(raw_path)
+
+        processing.add_done_callback(processed)
+        return result
+
+    def _keep_raw(self, frame: CapturedFrame | Path, raw_path: Path, error: BaseException) -> BaseException:
+        """Save the unprocessed *frame* after *error*; return the error to report."""
+        dest = raw_path.parent / RAW_DIR / raw_path.name
+        try:
+            save_raw(frame, dest)
+        except OSError as e:
+            self.logger.error("Unbearbeitete Aufnahme nicht gespeichert: %s", e)
+            return error
+        self.logger.error("Verarbeitung fehlgeschlagen, unbearbeitet gespeichert: %s", dest)
+        wrapped = RuntimeError(
+            f"Bild konnte nicht verarbeitet werden ({error}). "
+            f"Die unbearbeitete Aufnahme liegt unter {dest}"
+        )
+        wrapped.__cause__ = error
+        return wrapped
+
+    def _capture_frame(self, raw_path: Path) -> CapturedFrame | Path:
+        """Take a photo, or a burst of which only the best frame is kept.
+
+        The photo stays in memory so that it is encoded and written only
+        once; cameras without ``capture_frame`` write it to *raw_path*.
+        """
+        count = getattr(self.settings.kamera, "burstAnzahl", 1)
+        camera = self.camera
+        backend = getattr(camera, "camera", camera)
+        if count > 1 and hasattr(backend, "capture_burst"):
+            frames = camera.capture_burst(count)
+            return frames[best_frame(frames)]
+        if hasattr(backend, "capture_frame"):
+            return camera.capture_frame()
+        camera.capture(raw_path)
         return raw_path
 
+    @staticmethod
+    def _photo_key(learner: Learner):
+        if learner.is_new:
+            return (learner.klasse, learner.vorname, learner.nachname)
+        return (learner.klasse, learner.schueler_id)
+
+    def _remember_photo(self, learner: Learner, location: str, path: Path, value: Optional[int]) -> None:
+        if value is None:
+            # Ohne Hash fehlt nur die Doppelpruefung, die Aufnahme bleibt gueltig
+            self.logger.warning("Kein Bild-Hash fuer %s", path)
+            return
+        label = f"{learner.vorname} {learner.nachname} ({learner.klasse})"
+        self.hub.photo_hashes(location).add(self._photo_key(learner), label, value)
+
+    def forget_photo(self, learner: Learner, location: str) -> None:
+        """Drop the hash of a rejected photo from the duplicate check."""
+        self.hub.photo_hashes(location).remove(self._photo_key(learner))
+
+    def duplicates_of(self, learner: Learner, location: str) -> List[Tuple[str, int]]:
+        """Return other learners whose photo looks like the one of *learner*."""
+        max_distance = getattr(self.settings.bild, "duplikatAbstand", 0)
+        if not max_distance:
+            return []
+        return self.hub.photo_hashes(location).near_key(self._photo_key(learner), max_distance)
+
+    def _face_rules(self) -> FaceRules | None:
+        bild = self.settings.bild
+        if not getattr(bild, "gesichtZentrieren", False):
+            return None
+        return FaceRules(bild.kopfAnteil, bild.augenlinie, bild.gesichtsModell)
+
     def mark_photographed(self, learner: Learner, location: str):
         if learner.is_new:
             return
@@ -127,7 +253,6 @@ class MainController:
         self.reader.mark_photographed(location, learner.row, True, date_str)
 
     def skip(self, learner: Learner, location: str, reason: str):
-        missed = MissedWriter(self.settings.missedPath)
         entry = MissedEntry(
             location,
             learner.klasse,
@@ -137,7 +262,7 @@ class MainController:
             datetime.now().isoformat(),
             reason,
         )
-        missed.append(entry)
+        self.hub.append_missed(entry)
         if not learner.is_new:
             self.reader.mark_photographed(location, learner.row, False, reason=reason)
 
@@ -29,16 +29,23 @@ class MissedWriter:
             self.wb.save(path)
 
     def append(self, entry: MissedEntry) -> None:
+        self.add(entry)
+        self.save()
+
+    def add(self, entry: MissedEntry) -> None:
+        """Append *entry* without saving the workbook."""
+        self.ws.append([
+            entry.standort,
+            entry.klasse,
+            entry.nachname,
+            entry.vorname,
+            entry.schueler_id,
+            entry.datum,
+            entry.grund,
+        ])
+
+    def save(self) -> None:
         try:
-            self.ws.append([
-                entry.standort,
-                entry.klasse,
-                entry.nachname,
-                entry.vorname,
-                entry.schueler_id,
-                entry.datum,
-                entry.grund,
-            ])
             self.wb.save(self.path)
         except Exception as e:
             raise IOError(f'Konnte Datei für verpasste Termine nicht speichern: {e}')
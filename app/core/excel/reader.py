@@ -1,6 +1,6 @@
 # app/core/excel/reader.py
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List
 from pathlib import Path
 import openpyxl
 @dataclass
@@ -33,18 +33,27 @@ class ExcelReader:
         return sorted(values)
 
     def learners(self, location: str, class_name: str) -> List[Learner]:
+        return self.learners_by_class(location).get(class_name, [])
+
+    def learners_by_class(self, location: str) -> Dict[str, List[Learner]]:
+        """Read all learners of *location* in one pass, grouped by class."""
         sheet = self.wb[location]
         m = self.mapping
-        learners = []
+        idx = {key: openpyxl.utils.column_index_from_string(m[key]) - 1
+               for key in ('klasse', 'nachname', 'vorname', 'schuelerId')}
+        classes: Dict[str, List[Learner]] = {}
         for row in sheet.iter_rows(min_row=2):
-            if str(row[openpyxl.utils.column_index_from_string(m['klasse'])-1].value) == class_name:
-                nachname = row[openpyxl.utils.column_index_from_string(m['nachname'])-1].value
-                vorname = row[openpyxl.utils.column_index_from_string(m['vorname'])-1].value
-                sid = row[openpyxl.utils.column_index_from_string(m['schuelerId'])-1].value
-                if nachname and vorname and sid:
-                    learners.append(Learner(str(class_name), str(nachname), str(vorname), str(sid), row=row[0].row))
-        learners.sort(key=lambda l: (l.nachname, l.vorname))
-        return learners
+            nachname = row[idx['nachname']].value
+            vorname = row[idx['vorname']].value
+            sid = row[idx['schuelerId']].value
+            if nachname and vorname and sid:
+                klasse = str(row[idx['klasse']].value)
+                classes.setdefault(klasse, []).append(
+                    Learner(klasse, str(nachname), str(vorname), str(sid), row=row[0].row)
+                )
+        for learners in classes.values():
+            learners.sort(key=lambda l: (l.nachname, l.vorname))
+        return classes
 
     def mark_photographed(
         self,
@@ -54,6 +63,18 @@ class ExcelReader:
         date: str | None = None,
         reason: str | None = None,
     ) -> None:
+        self.set_photographed(location, row, photographed, date, reason)
+        self.save()
+
+    def set_photographed(
+        self,
+        location: str,
+        row: int,
+        photographed: bool,
+        date: str | None = None,
+        reason: str | None = None,
+    ) -> None:
+        """Update the cells of *row* without saving the workbook."""
         sheet = self.wb[location]
         col_phot = self.mapping.get('fotografiert')
         col_date = self.mapping.get('aufnahmedatum')
@@ -64,6 +85,8 @@ class ExcelReader:
             sheet[f"{col_date}{row}"].value = date if photographed else None
         if col_reason:
             sheet[f"{col_reason}{row}"].value = None if photographed else reason
+
+    def save(self) -> None:
         try:
             self.wb.save(self.path)
         except Exception as e:
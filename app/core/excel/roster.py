@@ -0,0 +1,122 @@
+# app/core/excel/roster.py
+"""In-memory roster shared by all capture stations."""
+from __future__ import annotations
+
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .reader import ExcelReader, Learner
+from .write_queue import ExcelWriteQueue
+
+
+class RosterIndex:
+    """Read a class list workbook once and serve it to every station.
+
+    Offers the reading interface of :class:`ExcelReader` from an index
+    built on load, so stations never touch the workbook while it is being
+    written. :meth:`find` looks learners up by ``schueler_id`` in constant
+    time. :meth:`mark_photographed` goes through the shared
+    :class:`ExcelWriteQueue`; :meth:`reload` picks up edits made outside
+    the app. Every call returns fresh lists, so a station
+    may reorder or extend its queue without affecting the others.
+    """
+
+    def __init__(self, path: Path, mapping: dict, writes: ExcelWriteQueue):
+        self.path = path
+        self.mapping = mapping
+        self.writes = writes
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        reader = ExcelReader(self.path, self.mapping)
+        locations = reader.locations()
+        classes: Dict[str, List[str]] = {}
+        learners: Dict[str, Dict[str, List[Learner]]] = {}
+        by_id: Dict[str, Dict[str, Learner]] = {}
+        for location in locations:
+            classes[location] = reader.classes_for_location(location)
+            learners[location] = reader.learners_by_class(location)
+            by_id[location] = {
+                learner.schueler_id: learner
+                for rows in learners[location].values()
+                for learner in rows
+            }
+        self.reader = reader
+        self._locations = locations
+        self._classes = classes
+        self._learners = learners
+        self._by_id = by_id
+        self._mtime = self._modified()
+
+    def _modified(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def changed_on_disk(self) -> bool:
+        """Return ``True`` if the workbook was saved by someone else since loading."""
+        return self._modified() != self._mtime
+
+    def reload(self) -> None:
+        """Read the workbook again, e.g. after it was edited outside the app.
+
+        Runs on the write thread, so changes queued before are saved first
+        and later ones go into the fresh workbook.
+        """
+        self.writes.submit(self, self._reload).result()
+
+    def _reload(self) -> None:
+        if self._dirty:
+            self.reader.save()
+            self._dirty = False
+        self._load()
+
+    def save(self) -> None:
+        """Save the changes of the last batch; called by the write queue."""
+        if not self._dirty:
+            return
+        self.reader.save()
+        self._dirty = False
+        # Eigenes Speichern ist keine fremde Aenderung
+        self._mtime = self._modified()
+
+    def locations(self) -> List[str]:
+        return list(self._locations)
+
+    def classes_for_location(self, location: str) -> List[str]:
+        return list(self._classes[location])
+
+    def learners(self, location: str, class_name: str) -> List[Learner]:
+        return list(self._learners[location].get(class_name, []))
+
+    def find(self, location: str, schueler_id: str) -> Optional[Learner]:
+        """Return the learner of *location* with *schueler_id*, if any."""
+        return self._by_id.get(location, {}).get(schueler_id)
+
+    def mark_photographed_async(
+        self,
+        location: str,
+        row: int,
+        photographed: bool,
+        date: str | None = None,
+        reason: str | None = None,
+    ) -> Future:
+        def apply():
+            self.reader.set_photographed(location, row, photographed, date, reason)
+            self._dirty = True
+
+        return self.writes.submit(self, apply)
+
+    def mark_photographed(
+        self,
+        location: str,
+        row: int,
+        photographed: bool,
+        date: str | None = None,
+        reason: str | None = None,
+    ) -> None:
+        """Write the status and wait until it is saved."""
+        self.mark_photographed_async(location, row, photographed, date, reason).result()
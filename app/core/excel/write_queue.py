@@ -0,0 +1,91 @@
+# app/core/excel/write_queue.py
+"""One writer thread for all workbooks shared by the capture stations."""
+from __future__ import annotations
+
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class ExcelWriteQueue:
+    """Apply workbook changes on one thread and save each workbook once per batch.
+
+    :meth:`submit` queues a change of the workbook *target* (any object with
+    a ``save()`` method, e.g. :class:`ExcelReader` or :class:`MissedWriter`).
+    The writer thread applies every change that is waiting at that moment
+    and then saves each touched workbook a single time, so changes arriving
+    while a save is running share the next save. The returned future
+    completes after the save that contains the change.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.saves = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, target: Any, apply: Callable[[], None]) -> Future:
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((target, apply, future))
+        return future
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='ExcelWriteQueue', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Alles mitnehmen, was waehrend des letzten Speicherns eingetroffen ist
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(target is None for target, _, _ in batch)
+            self._write([item for item in batch if item[0] is not None])
+            for target, _, future in batch:
+                if target is None:
+                    future.set_result(None)
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[Any, Callable, Future]]) -> None:
+        pending: Dict[int, Tuple[Any, List[Future]]] = {}
+        for target, apply, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                apply()
+            except BaseException as exc:
+                future.set_exception(exc)
+                continue
+            pending.setdefault(id(target), (target, []))[1].append(future)
+        for target, futures in pending.values():
+            try:
+                target.save()
+            except BaseException as exc:
+                self.logger.warning("Speichern fehlgeschlagen: %s", exc)
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            self.saves += 1
+            for future in futures:
+                future.set_result(None)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write everything still queued and end the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put((None, None, Future()))
+        thread.join(timeout)
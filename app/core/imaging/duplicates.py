@@ -0,0 +1,125 @@
+# app/core/imaging/duplicates.py
+"""Spot the same face saved under two learners."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Kantenlaenge des dHash: 8x8 Helligkeitsvergleiche ergeben 64 Bit
+HASH_SIZE = 8
+# Anfangsgroesse des Hash-Speichers, waechst bei Bedarf auf das Doppelte
+INITIAL_CAPACITY = 256
+# Gesetzte Bits je Bytewert, fuer NumPy vor 2.0 ohne bitwise_count
+BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def dhash(img: Image.Image) -> int:
+    """Return the 64-bit difference hash of *img*.
+
+    Each bit tells whether a pixel of the ``9x8`` grey thumbnail is darker
+    than its right neighbour, so the hash survives recompression, small
+    shifts and exposure changes.
+    """
+    # JPEGs gleich verkleinert dekodieren, das Vollbild wird nicht gebraucht
+    img.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+    small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX)
+    px = np.asarray(small, dtype=np.int16)
+    bits = px[:, 1:] < px[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def dhash_file(path: Path) -> int:
+    with Image.open(path) as img:
+        return dhash(img)
+
+
+def process_and_hash(src, process: Callable, dest: Path, *args, **kwargs) -> Optional[int]:
+    """Run ``process(src, dest, *args, **kwargs)`` and hash the written *dest*.
+
+    Submitted to the imaging pool so the hash is computed in the worker
+    next to the processing. Returns ``None`` if *dest* cannot be read back.
+    """
+    process(src, dest, *args, **kwargs)
+    try:
+        return dhash_file(dest)
+    except OSError:
+        return None
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Return the number of set bits of each ``uint64`` in *values*."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return BYTE_BITS[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class PhotoHashIndex:
+    """Hashes of the photos of one location, searchable by Hamming distance.
+
+    Photos are keyed by learner; adding a photo for a key replaces the
+    previous one, e.g. after a retake. All hashes live in one ``uint64``
+    array, so a lookup is a single vectorised XOR and popcount and stays
+    well below a millisecond for tens of thousands of photos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = np.zeros(INITIAL_CAPACITY, np.uint64)
+        self._keys: List[Hashable] = []
+        self._labels: List[str] = []
+        self._slots: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, label: str, value: int) -> None:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = len(self._keys)
+                if slot == len(self._hashes):
+                    self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+                self._keys.append(key)
+                self._labels.append(label)
+                self._slots[key] = slot
+            self._labels[slot] = label
+            self._hashes[slot] = value
+
+    def remove(self, key: Hashable) -> None:
+        """Forget the photo stored under *key*, e.g. after it was rejected."""
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                return
+            # Letzten Eintrag in die Luecke ziehen, damit das Feld dicht bleibt
+            last = len(self._keys) - 1
+            if slot != last:
+                moved = self._keys[last]
+                self._keys[slot] = moved
+                self._labels[slot] = self._labels[last]
+                self._hashes[slot] = self._hashes[last]
+                self._slots[moved] = slot
+            self._keys.pop()
+            self._labels.pop()
+
+    def near(self, value: int, max_distance: int, exclude: Hashable = None) -> List[Tuple[str, int]]:
+        """Return ``(label, distance)`` of all photos within *max_distance*, closest first."""
+        with self._lock:
+            n = len(self._keys)
+            distances = popcount(self._hashes[:n] ^ np.uint64(value))
+            hits = np.flatnonzero(distances <= max_distance)
+            found = [
+                (int(distances[i]), self._labels[i]) for i in hits if self._keys[i] != exclude
+            ]
+        return [(label, distance) for distance, label in sorted(found)]
+
+    def near_key(self, key: Hashable, max_distance: int) -> List[Tuple[str, int]]:
+        """Like :meth:`near` for the photo stored under *key*."""
+        with self._lock:
+            slot = self._slots.get(key)
+            value = None if slot is None else int(self._hashes[slot])
+        return [] if value is None else self.near(value, max_distance, exclude=key)
@@ -0,0 +1,177 @@
+# app/core/imaging/face_crop.py
+"""Crop portraits around the detected face instead of the image centre."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Laengste Bildseite der verkleinerten Kopie fuer die Gesichtserkennung
+DETECT_SIZE = 320
+# Augenlinie innerhalb des Kastens der Haar-Kaskade (Anteil der Kastenhoehe)
+CASCADE_EYE_LINE = 0.4
+
+logger = logging.getLogger(__name__)
+
+# Gesicht als (x, y, Breite, Hoehe, Hoehe der Augenlinie)
+Face = Tuple[float, float, float, float, float]
+Detector = Callable[[np.ndarray], List[Face]]
+
+
+@dataclass
+class FaceRules:
+    """Where the face goes in the cropped photo.
+
+    *head_ratio* is the height of the detected face relative to the crop
+    height, *eye_line* the distance of the eyes from the top edge relative
+    to the crop height. *model* is an optional YuNet ONNX file; without it
+    the Haar cascade shipped with OpenCV is used if available.
+    """
+
+    head_ratio: float = 0.45
+    eye_line: float = 0.4
+    model: Optional[Path] = None
+
+
+class _Locked:
+    """Serialise a detector; OpenCV detectors keep per-call state."""
+
+    def __init__(self, detect: Detector):
+        self._detect = detect
+        self._lock = threading.Lock()
+
+    def __call__(self, image: np.ndarray) -> List[Face]:
+        with self._lock:
+            return self._detect(image)
+
+
+def _yunet(model: str) -> Detector:
+    net = cv2.FaceDetectorYN.create(model, '', (DETECT_SIZE, DETECT_SIZE))
+
+    def detect(image: np.ndarray) -> List[Face]:
+        h, w = image.shape[:2]
+        net.setInputSize((w, h))
+        _, faces = net.detect(image)
+        if faces is None:
+            return []
+        # Spalten: Kasten, rechtes Auge, linkes Auge, Nase, Mundwinkel, Score
+        return [(f[0], f[1], f[2], f[3], (f[5] + f[7]) / 2) for f in faces]
+
+    return detect
+
+
+def _cascade() -> Detector | None:
+    if not hasattr(cv2, 'CascadeClassifier'):
+        return None
+    # Nur die OpenCV-4-Pakete bringen die Kaskaden mit
+    folder = getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+    path = Path(folder) / 'haarcascade_frontalface_default.xml'
+    if not folder or not path.is_file():
+        return None
+    cascade = cv2.CascadeClassifier(str(path))
+    if cascade.empty():
+        return None
+
+    def detect(image: np.ndarray) -> List[Face]:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        boxes = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+        return [(x, y, w, h, y + CASCADE_EYE_LINE * h) for x, y, w, h in boxes]
+
+    return detect
+
+
+@lru_cache(maxsize=None)
+def load_detector(model: str | None = None) -> Detector | None:
+    """Return the face detector for *model*, loading it once per process.
+
+    Returns ``None`` if this OpenCV build has no usable detector; callers
+    then fall back to a centre crop.
+    """
+    detect = None
+    try:
+        if model and os.path.isfile(model) and hasattr(cv2, 'FaceDetectorYN'):
+            detect = _yunet(model)
+        else:
+            detect = _cascade()
+    except cv2.error:
+        logger.exception("Gesichtserkennung konnte nicht geladen werden")
+    if detect is None:
+        logger.info("Keine Gesichtserkennung verfuegbar, Bilder werden mittig zugeschnitten")
+        return None
+    return _Locked(detect)
+
+
+def detect_face(img: Image.Image, detector: Detector) -> Face | None:
+    """Find the largest face on a downscaled copy; coordinates refer to *img*."""
+    factor = max(img.size) // DETECT_SIZE
+    # ``reduce`` mittelt ganze Pixelbloecke und ist viel schneller als ``resize``
+    small = img.reduce(factor) if factor > 1 else img
+    small = small.convert('RGB')
+    small.thumbnail((DETECT_SIZE, DETECT_SIZE), Image.BILINEAR)
+    scale = img.width / small.width
+    bgr = cv2.cvtColor(np.asarray(small), cv2.COLOR_RGB2BGR)
+    faces = detector(bgr)
+    if not len(faces):
+        return None
+    face = max(faces, key=lambda f: f[2] * f[3])
+    return tuple(float(v) * scale for v in face)
+
+
+def face_box(
+    size: Tuple[int, int], face: Face, aspect: Tuple[int, int], rules: FaceRules
+) -> Tuple[int, int, int, int]:
+    """Return the crop ``(left, top, right, bottom)`` placing *face* by *rules*."""
+    w, h = size
+    x, y, fw, fh, eye_y = face
+    crop_h = fh / rules.head_ratio
+    crop_w = crop_h * aspect[0] / aspect[1]
+    # Passt der Ausschnitt nicht ins Bild, wird er kleiner und der Kopf groesser
+    shrink = min(1.0, w / crop_w, h / crop_h)
+    crop_w, crop_h = int(crop_w * shrink), int(crop_h * shrink)
+    left = round(x + fw / 2 - crop_w / 2)
+    top = round(eye_y - rules.eye_line * crop_h)
+    left = min(max(0, left), w - crop_w)
+    top = min(max(0, top), h - crop_h)
+    return left, top, left + crop_w, top + crop_h
+
+
+def face_crop_box(
+    img: Image.Image,
+    full_size: Tuple[int, int],
+    aspect: Tuple[int, int],
+    rules: FaceRules,
+    detector: Detector | None = None,
+) -> Tuple[int, int, int, int] | None:
+    """Return the face crop of an image of *full_size*, found on *img*.
+
+    *img* may be a smaller decode of the same picture (e.g. a JPEG draft);
+    the box refers to *full_size*. ``None`` means no face was found.
+    """
+    if detector is None:
+        detector = load_detector(str(rules.model) if rules.model else None)
+    if detector is None:
+        return None
+    face = detect_face(img, detector)
+    if face is None:
+        return None
+    scale = full_size[0] / img.width
+    return face_box(full_size, tuple(v * scale for v in face), aspect, rules)
+
+
+def crop_face(
+    img: Image.Image,
+    aspect: Tuple[int, int],
+    rules: FaceRules,
+    detector: Detector | None = None,
+) -> Image.Image | None:
+    """Crop *img* around its face, or return ``None`` if no face was found."""
+    box = face_crop_box(img, img.size, aspect, rules, detector)
+    return None if box is None else img.crop(box)
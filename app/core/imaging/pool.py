@@ -0,0 +1,133 @@
+# app/core/imaging/pool.py
+"""Run the imaging stage in worker processes next to the capture."""
+from __future__ import annotations
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from multiprocessing import shared_memory
+import threading
+from typing import Any, Callable, Tuple
+
+import numpy as np
+
+# Beschreibung eines Bilds im gemeinsamen Speicher: (Name, Form, Datentyp);
+# ohne Form liegen dort kodierte Bytes
+SharedFrame = Tuple[str, Tuple[int, ...], str]
+
+
+def _share(frame: np.ndarray | bytes) -> Tuple[shared_memory.SharedMemory, SharedFrame]:
+    """Copy *frame* into a new shared memory block."""
+    if isinstance(frame, np.ndarray):
+        shm = shared_memory.SharedMemory(create=True, size=max(1, frame.nbytes))
+        np.ndarray(frame.shape, frame.dtype, buffer=shm.buf)[...] = frame
+        return shm, (shm.name, frame.shape, frame.dtype.str)
+    data = memoryview(frame).cast('B')
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    return shm, (shm.name, (len(data),), '')
+
+
+def _run_shared(fn: Callable, shared: SharedFrame, *args, **kwargs) -> Any:
+    """Worker side: rebuild the frame from shared memory and call *fn*."""
+    name, shape, dtype = shared
+    # Freigegeben wird der Block vom Hauptprozess, sobald die Aufgabe fertig ist
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        if dtype:
+            src = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        else:
+            src = bytes(shm.buf[:shape[0]])
+        try:
+            return fn(src, *args, **kwargs)
+        finally:
+            # Keine Verweise auf den Puffer zuruecklassen, sonst scheitert close
+            del src
+    finally:
+        shm.close()
+
+
+class ImagingPool:
+    """Bounded executor for crop, resize and encode of captured photos.
+
+    With *workers* > 0 the jobs run in that many processes, so they neither
+    hold the GIL of the GUI nor delay the next capture; frames in memory
+    reach the workers through shared memory instead of being pickled.
+    ``workers=0`` runs the jobs on one background thread of this process.
+    At most *max_pending* jobs are queued or running; :meth:`submit` waits
+    for a free slot, which throttles the capture instead of letting frames
+    pile up in memory. If a worker dies (e.g. out of memory), its jobs fail
+    with :class:`BrokenProcessPool` and the next job gets a fresh pool.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 4):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+
+    def _ensure_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    # ``spawn``: ein Fork des laufenden Qt-Programms kann in
+                    # fremden Sperren haengen bleiben
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(1, thread_name_prefix='Imaging')
+            return self._executor
+
+    def _discard(self, executor: Executor) -> None:
+        """Drop a broken *executor* so that the next job starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable, src, *args, **kwargs) -> Future:
+        """Run ``fn(src, *args, **kwargs)`` and return its future.
+
+        *src* may be a path, encoded bytes or an array; *fn* must be a
+        module-level function when worker processes are used.
+        """
+        self._slots.acquire()
+        shm = None
+        try:
+            executor = self._ensure_executor()
+            if isinstance(executor, ProcessPoolExecutor) and isinstance(src, (np.ndarray, bytes)):
+                shm, shared = _share(src)
+                job = (_run_shared, fn, shared, *args)
+            else:
+                job = (fn, src, *args)
+            try:
+                future = executor.submit(*job, **kwargs)
+            except BrokenProcessPool:
+                # Ein Arbeitsprozess ist seit dem letzten Auftrag gestorben
+                self._discard(executor)
+                executor = self._ensure_executor()
+                future = executor.submit(*job, **kwargs)
+        except BaseException:
+            self._release(shm)
+            raise
+        future.add_done_callback(lambda f: self._done(f, executor, shm))
+        return future
+
+    def _done(self, future: Future, executor: Executor, shm) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(executor)
+        self._release(shm)
+
+    def _release(self, shm: shared_memory.SharedMemory | None) -> None:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -1,7 +1,19 @@
 # app/core/imaging/processor.py
+import io
 from pathlib import Path
 from PIL import Image
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .face_crop import DETECT_SIZE, FaceRules, face_crop_box
+
+# Groesster Verkleinerungsfaktor, den der JPEG-Dekoder (DCT) beherrscht
+MAX_DRAFT_SCALE = 8
+# Vor LANCZOS per Pixelblock-Mittelung verkleinern, solange das Bild noch
+# mindestens so viel groesser als das Ziel bleibt
+REDUCING_GAP = 3.0
 
 
 def _parse_ratio(val: Union[Tuple[int, int], str, None]) -> Tuple[int, int] | None:
@@ -21,8 +33,9 @@ def _parse_ratio(val: Union[Tuple[int, int], str, None]) -> Tuple[int, int] | No
     return None
 
 
-def crop_center(img: Image.Image, aspect: Tuple[int, int]) -> Image.Image:
-    w, h = img.size
+def center_box(size: Tuple[int, int], aspect: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """Return the largest centred ``(left, top, right, bottom)`` box of *aspect*."""
+    w, h = size
     target_w = w
     target_h = int(w * aspect[1] / aspect[0])
     if target_h > h:
@@ -30,24 +43,99 @@ def crop_center(img: Image.Image, aspect: Tuple[int, int]) -> Image.Image:
         target_w = int(h * aspect[0] / aspect[1])
     left = (w - target_w) // 2
     top = (h - target_h) // 2
-    right = left + target_w
-    bottom = top + target_h
-    return img.crop((left, top, right, bottom))
+    return left, top, left + target_w, top + target_h
+
+
+def crop_center(img: Image.Image, aspect: Tuple[int, int]) -> Image.Image:
+    return img.crop(center_box(img.size, aspect))
+
+
+def draft_scale(box: Tuple[int, int, int, int], width: int, height: int) -> int:
+    """Largest power of two by which *box* can shrink and still cover the target."""
+    box_w, box_h = box[2] - box[0], box[3] - box[1]
+    scale = 1
+    while (
+        scale < MAX_DRAFT_SCALE
+        and box_w // (scale * 2) >= width
+        and box_h // (scale * 2) >= height
+    ):
+        scale *= 2
+    return scale
+
+
+def open_image(src: Union[Path, bytes, np.ndarray]) -> Image.Image:
+    """Open a file, encoded image bytes or a BGR array as PIL image."""
+    if isinstance(src, np.ndarray):
+        if src.ndim == 3:
+            src = cv2.cvtColor(src, cv2.COLOR_BGR2RGB)
+        return Image.fromarray(src)
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(src))
+    return Image.open(src)
+
+
+def save_raw(src: Union[Path, bytes, np.ndarray], dest: Path) -> None:
+    """Store *src* unprocessed at *dest*; a source file is moved there."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(src, np.ndarray):
+        if not cv2.imwrite(str(dest), src):
+            raise OSError(f"Bild konnte nicht gespeichert werden: {dest}")
+    elif isinstance(src, (bytes, bytearray, memoryview)):
+        dest.write_bytes(src)
+    else:
+        Path(src).replace(dest)
+
+
+def _find_face(src, im: Image.Image, aspect: Tuple[int, int], face: FaceRules):
+    if im.format != 'JPEG':
+        return face_crop_box(im, im.size, aspect, face)
+    # Fuer die Erkennung reicht eine stark verkleinert dekodierte Kopie; das
+    # eigentliche Bild bleibt ungeladen, bis der Ausschnitt feststeht
+    with open_image(src) as small:
+        small.draft(small.mode, (DETECT_SIZE, DETECT_SIZE))
+        return face_crop_box(small, im.size, aspect, face)
 
 
 def process_image(
-    src: Path,
+    src: Union[Path, bytes, np.ndarray],
     dest: Path,
     width: int,
     height: int,
     quality: int,
     aspect: Union[Tuple[int, int], str, None] = None,
+    face: Optional[FaceRules] = None,
 ) -> None:
+    """Crop *src* to *aspect*, scale it and save it as JPEG to *dest*.
+
+    *src* is a file or a photo in memory as taken by
+    :meth:`BaseCamera.capture_frame`; then *dest* is written only once.
+    With *face* the crop follows the detected face; without a face (or a
+    detector) it falls back to the image centre. Large JPEGs are decoded
+    at the smallest power-of-two scale that still covers the crop at the
+    target size, so a 24 MP file is never fully decoded for a 2 MP photo.
+    """
     aspect_tuple = _parse_ratio(aspect)
-    with Image.open(src) as im:
+    with open_image(src) as im:
+        full_w, full_h = im.size
+        box = (0, 0, full_w, full_h)
         if aspect_tuple:
-            im = crop_center(im, aspect_tuple)
-        im = im.resize((width, height), Image.LANCZOS)
+            found = _find_face(src, im, aspect_tuple, face) if face else None
+            box = found or center_box(im.size, aspect_tuple)
+        scale = draft_scale(box, width, height)
+        if scale > 1:
+            # JPEGs direkt verkleinert dekodieren (DCT-Skalierung); andere
+            # Formate ignorieren ``draft``
+            im.draft(im.mode, (-(-full_w // scale), -(-full_h // scale)))
+        fx, fy = im.size[0] / full_w, im.size[1] / full_h
+        box = (
+            int(box[0] * fx),
+            int(box[1] * fy),
+            min(im.size[0], round(box[2] * fx)),
+            min(im.size[1], round(box[3] * fy)),
+        )
+        if box != (0, 0, *im.size):
+            im = im.crop(box)
+        im = im.resize((width, height), Image.LANCZOS, reducing_gap=REDUCING_GAP)
         dest_temp = dest.with_suffix('.tmp')
         im.save(dest_temp, 'JPEG', quality=quality)
         dest_temp.replace(dest)
@@ -0,0 +1,73 @@
+# app/core/imaging/sharpness.py
+"""Pick the best frame of a burst by focus and open eyes."""
+from __future__ import annotations
+
+from typing import Sequence
+
+import cv2
+import numpy as np
+
+# Laengste Bildseite, auf die fuer die Bewertung ausgeduennt wird
+SCORE_SIZE = 800
+# Augenbereich relativ zum Hochformat-Bild (Zeilen, Spalten), passend zur
+# Kopfposition der Overlay-Hilfslinien
+EYE_ROWS = (0.25, 0.45)
+EYE_COLS = (0.25, 0.75)
+# Gewicht des Augenkontrasts gegenueber der Schaerfe
+EYE_WEIGHT = 0.5
+
+
+def _gray_stack(images: Sequence[np.ndarray]) -> np.ndarray:
+    """Return the frames as one ``float32`` stack of thinned-out grey images."""
+    h, w = images[0].shape[:2]
+    # Jeden k-ten Pixel nehmen statt zu skalieren: kostet nichts und laesst
+    # Unschaerfe ueber mehrere Pixel erkennbar
+    step = max(1, -(-max(h, w) // SCORE_SIZE))
+    grays = []
+    for image in images:
+        small = image[::step, ::step]
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        grays.append(small)
+    return np.stack(grays).astype(np.float32)
+
+
+def laplacian_variance(stack: np.ndarray) -> np.ndarray:
+    """Variance of the Laplacian of every frame in an ``(n, h, w)`` stack."""
+    lap = (
+        stack[:, 1:-1, :-2] + stack[:, 1:-1, 2:]
+        + stack[:, :-2, 1:-1] + stack[:, 2:, 1:-1]
+        - 4 * stack[:, 1:-1, 1:-1]
+    )
+    return lap.var(axis=(1, 2))
+
+
+def eye_contrast(stack: np.ndarray) -> np.ndarray:
+    """RMS contrast of the eye region of every frame; closed eyes score lower."""
+    n, h, w = stack.shape
+    region = stack[
+        :,
+        int(h * EYE_ROWS[0]):int(h * EYE_ROWS[1]),
+        int(w * EYE_COLS[0]):int(w * EYE_COLS[1]),
+    ]
+    mean = region.mean(axis=(1, 2))
+    return region.std(axis=(1, 2)) / (mean + 1.0)
+
+
+def score_frames(images: Sequence[np.ndarray]) -> np.ndarray:
+    """Return one score per frame; higher is better."""
+    if not images:
+        return np.empty(0, np.float32)
+    stack = _gray_stack(images)
+    sharp = laplacian_variance(stack)
+    eyes = eye_contrast(stack)
+    # Beide Masse relativ zum besten Bild der Serie, damit Licht und Motiv
+    # keine Rolle spielen
+    sharp = sharp / max(float(sharp.max()), 1e-6)
+    eyes = eyes / max(float(eyes.max()), 1e-6)
+    return sharp + EYE_WEIGHT * eyes
+
+
+def best_frame(images: Sequence[np.ndarray]) -> int:
+    """Return the index of the best frame in *images*."""
+    return int(np.argmax(score_frames(images)))
@@ -0,0 +1,79 @@
+# app/core/stations.py
+"""State shared by several capture stations running in one application."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from .config.settings import Settings, StationSettings
+from .excel.missed_writer import MissedEntry, MissedWriter
+from .excel.roster import RosterIndex
+from .excel.write_queue import ExcelWriteQueue
+from .imaging.duplicates import PhotoHashIndex
+from .imaging.pool import ImagingPool
+
+
+def station_settings(settings: Settings) -> List[StationSettings]:
+    """Return the configured stations; without any there is one default station."""
+    return list(settings.stationen) or [StationSettings()]
+
+
+class StationHub:
+    """Roster, Excel write path, imaging and photo hashes shared by all stations.
+
+    Each workbook is loaded and indexed once, no matter how many stations
+    open it, and all writes go through one :class:`ExcelWriteQueue`.
+    Photos of all stations are processed by one :class:`ImagingPool`. The
+    photo hashes of a location are shared so a face photographed at one
+    station is recognised at the others.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.writes = ExcelWriteQueue()
+        self.imaging = ImagingPool(
+            settings.bild.verarbeitungsProzesse, settings.bild.verarbeitungsWarteschlange
+        )
+        self._lock = threading.Lock()
+        self._rosters: Dict[Path, RosterIndex] = {}
+        self._missed: MissedWriter | None = None
+        self._photo_hashes: Dict[str, PhotoHashIndex] = {}
+
+    def roster(self, path: Path) -> RosterIndex:
+        """Return the shared index of *path*, re-read if the file changed on disk."""
+        key = Path(path).resolve()
+        with self._lock:
+            roster = self._rosters.get(key)
+            if roster is None:
+                # Eine zweite Instanz derselben Datei wuerde Aenderungen der
+                # ersten beim Speichern ueberschreiben
+                roster = RosterIndex(
+                    Path(path), self.settings.excelMapping.model_dump(), self.writes
+                )
+                self._rosters[key] = roster
+                return roster
+        if roster.changed_on_disk():
+            # Ausserhalb bearbeitet: neu einlesen statt den alten Stand zurueckzuschreiben
+            roster.reload()
+        return roster
+
+    def photo_hashes(self, location: str) -> PhotoHashIndex:
+        with self._lock:
+            return self._photo_hashes.setdefault(location, PhotoHashIndex())
+
+    def missed_writer(self) -> MissedWriter:
+        with self._lock:
+            path = self.settings.missedPath
+            if self._missed is None or self._missed.path != path:
+                self._missed = MissedWriter(path)
+            return self._missed
+
+    def append_missed(self, entry: MissedEntry) -> None:
+        """Add *entry* to the list of missed appointments and wait until it is saved."""
+        writer = self.missed_writer()
+        self.writes.submit(writer, lambda: writer.add(entry)).result()
+
+    def close(self) -> None:
+        self.imaging.shutdown()
+        self.writes.close()
@@ -1,6 +1,8 @@
 # app/main.py
 import sys
 import logging
+import multiprocessing
+import time
 from pathlib import Path
 
 from PySide6 import QtWidgets, QtGui
@@ -9,10 +11,12 @@ from app.core.config.settings import Settings
 from pydantic import ValidationError
 from app.core.util.logging import setup_logging
 from app.core.controller import MainController
+from app.core.stations import StationHub, station_settings
 from app.ui.main_window import MainWindow
 
 
 def main() -> int:
+    started_at = time.perf_counter()
     setup_logging(Path('logs'))
     logger = logging.getLogger(__name__)
     try:
@@ -24,10 +28,22 @@ def main() -> int:
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("Fusion")
     app.setFont(QtGui.QFont("Segoe UI", 10))
-    controller = MainController(settings)
-    win = MainWindow(settings, controller, logger=logger.getChild('MainWindow'))
-    win.show()
-    return app.exec()
+    # Alle Stationen teilen sich Klassenliste und Excel-Schreibzugriffe
+    hub = StationHub(settings)
+    windows = []
+    for station in station_settings(settings):
+        controller = MainController(settings, hub=hub, station=station)
+        win = MainWindow(
+            settings, controller, logger=logger.getChild('MainWindow'), started_at=started_at
+        )
+        win.show()
+        windows.append(win)
+    try:
+        return app.exec()
+    finally:
+        hub.close()
 
 if __name__ == '__main__':
+    # Die Bildverarbeitung startet Arbeitsprozesse, auch aus der gepackten EXE
+    multiprocessing.freeze_support()
     sys.exit(main())
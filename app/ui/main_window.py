@@ -2,77 +2,238 @@
 
 from __future__ import annotations
 
-from PySide6 import QtWidgets, QtGui, QtCore, QtConcurrent
+from concurrent.futures import Future
+
+from PySide6 import QtWidgets, QtGui, QtCore
 from pathlib import Path
 from datetime import datetime
 import logging
+import time
 import psutil
 
+from ..core.analysis import (
+    AnalysisWorker,
+    AutoTrigger,
+    CodeScanner,
+    measure_exposure,
+    measure_focus,
+)
+from ..core.camera import CameraTimeout
 from ..core.config.settings import Settings
 from ..core.controller import MainController
-from ..core.camera import SimulatorCamera, GPhoto2Camera, OpenCVCamera
-from ..core.excel.reader import ExcelReader, Learner
-from ..core.excel.missed_writer import MissedWriter, MissedEntry
+from ..core.excel.reader import Learner
+from ..core.excel.missed_writer import MissedEntry
+from ..core.imaging.face_crop import load_detector
 from ..core.imaging.processor import process_image
 from .settings_dialog import SettingsDialog
 from .class_search_dialog import ClassSearchDialog
 from .widgets import ControlPanel
 
 
+# Bilder pro Sekunde fuer die automatische Ausloesung
+AUTO_TRIGGER_HZ = 10
+# Bilder pro Sekunde fuer den Ausweis-Scan
+SCAN_HZ = 5
+# Aktualisierungen pro Sekunde fuer das Histogramm
+EXPOSURE_HZ = 4
+# Aktualisierungen pro Sekunde fuer Fokus-Peaking und Schaerfewert
+FOCUS_HZ = 10
+# Anzeigedauer von Hinweisen in der Statusleiste
+STATUS_MS = 4000
+
+
 class MainWindow(QtWidgets.QMainWindow):
-    """Main GUI window for the application."""
+    """Main GUI window for the application; one window per capture station."""
+
+    # Ergebnis einer Aufgabe des Stations-Threads: (Rueckruf, Future)
+    _task_done = QtCore.Signal(object, object)
 
     def __init__(
         self,
         settings: Settings,
         controller: MainController | None = None,
         logger: logging.Logger | None = None,
+        started_at: float | None = None,
     ):
         super().__init__()
+        # Bezugspunkt fuer die Startzeiten, idealerweise der Programmstart
+        self._started_at = time.perf_counter() if started_at is None else started_at
+        self._window_timed = False
         self.logger = logger or logging.getLogger(type(self).__name__)
         self.settings = settings
         self.controller = controller or MainController(settings)
-        self.camera = self._init_camera()
-        # Ensure the controller uses the same camera instance as the UI so that
-        # all capture operations share state and configuration.
-        self.controller.camera = self.camera
-        self._reader = None
+        # Controller, Fenster und Vorschau teilen sich die Kamera des Managers
+        self.cameras = self.controller.cameras
         self.busy = False
         self._jump_return = None
+        self.auto_trigger: AutoTrigger | None = None
+        self.scanning = False
+        self.peaking = False
         self._setup_ui()
-        if hasattr(self.camera, "start_liveview"):
-            self.camera.start_liveview()
+        self._task_done.connect(self._on_task_done)
+        self.analysis = AnalysisWorker(self)
+        self.analysis.result.connect(self._on_analysis)
+        self.preview.set_analysis(self.analysis)
+        self._apply_analysis_settings()
+        self.cameras.camera_changed.connect(self._on_camera_changed)
+        self.cameras.started.connect(self._on_camera_started)
+        self.preview.first_frame.connect(self._on_first_frame)
+        self._start_camera()
 
     @property
     def reader(self):
-        return self._reader
+        return self.controller.reader
 
     @reader.setter
     def reader(self, value):
-        self._reader = value
-        if self.controller is not None:
-            self.controller.reader = value
-
-    def _init_camera(self):
-        backend = self.settings.kamera.backend
-        cam = None
-        if backend == 'gphoto2' and QtCore.QStandardPaths.findExecutable('gphoto2'):
-            cam = GPhoto2Camera()
-        elif backend == 'simulator':
-            cam = SimulatorCamera()
+        self.controller.reader = value
+
+    @property
+    def camera(self):
+        return self.cameras.camera
+
+    def _run_task(self, task, done):
+        """Run *task* on the station's worker; ``done(future)`` follows in the GUI thread."""
+        self.controller.submit(task).add_done_callback(lambda f: self._emit_task_done(done, f))
+
+    def _emit_task_done(self, done, future):
+        try:
+            self._task_done.emit(done, future)
+        except RuntimeError:
+            pass  # Fenster bereits geschlossen
+
+    def _on_task_done(self, done, future):
+        done(future)
+
+    # live analysis ---------------------------------------------------------
+    def _apply_analysis_settings(self):
+        analyse = self.settings.analyse
+        self.auto_trigger = None
+        self.analysis.remove('auto')
+        if analyse.autoAusloesung:
+            model = self.settings.bild.gesichtsModell
+            detector = load_detector(str(model) if model else None)
+            if detector is None:
+                self.logger.warning(
+                    'Automatische Aufnahme braucht eine Gesichtserkennung und bleibt aus'
+                )
+            else:
+                self.auto_trigger = AutoTrigger(
+                    detector,
+                    analyse.autoHaltezeitMs / 1000,
+                    analyse.autoBewegungsSchwelle,
+                )
+                self.analysis.add('auto', self.auto_trigger, hz=AUTO_TRIGGER_HZ)
+        self.set_scanning(analyse.ausweisScan)
+        if analyse.histogramm:
+            self.analysis.add('exposure', measure_exposure, hz=EXPOSURE_HZ)
         else:
-            try:
-                # In Webcam-Modus standardmaessig die zweite Kamera verwenden
-                cam = OpenCVCamera(1)
-                self.current_cam_id = 1
-            except Exception:
-                cam = None
-        if cam is None:
-            cam = SimulatorCamera()
-        return cam
+            self.analysis.remove('exposure')
+            self.preview.set_exposure(None)
+        self.set_peaking(analyse.fokusPeaking)
+
+    def set_scanning(self, enabled: bool):
+        """Switch the student-card scan of the live view on or off."""
+        self.scanning = enabled
+        if enabled:
+            if 'scan' not in self.analysis.names():
+                self.analysis.add('scan', CodeScanner(), hz=SCAN_HZ)
+        else:
+            self.analysis.remove('scan')
+
+    def toggle_scanning(self):
+        self.set_scanning(not self.scanning)
+        self.statusBar().showMessage(
+            'Ausweis-Scan an' if self.scanning else 'Ausweis-Scan aus', STATUS_MS
+        )
+
+    def set_peaking(self, enabled: bool):
+        """Switch focus peaking and the sharpness meter on or off."""
+        self.peaking = enabled
+        if enabled:
+            self.analysis.add('focus', measure_focus, hz=FOCUS_HZ)
+        else:
+            self.analysis.remove('focus')
+            self.preview.set_focus(None)
+
+    def toggle_peaking(self):
+        self.set_peaking(not self.peaking)
+
+    def _on_analysis(self, name: str, value):
+        if name == 'auto' and value and not self.busy:
+            self.capture_photo()
+        elif name == 'scan' and self.scanning:
+            self.jump_to_code(value)
+        elif name == 'exposure' and 'exposure' in self.analysis.names():
+            self.preview.set_exposure(value)
+        elif name == 'focus' and self.peaking:
+            self.preview.set_focus(value)
+
+    def jump_to_code(self, code: str):
+        """Jump to the learner whose student card shows *code*."""
+        if self.busy:
+            return
+        location = self.cmb_location.currentText()
+        learner = self.controller.find_learner(location, code)
+        index = self.controller.queue_index(learner) if learner else None
+        if learner is None:
+            text = f'Ausweis {code} gehört zu keiner Person in {location}'
+        elif index is None:
+            text = f'{learner.vorname} {learner.nachname} ist in Klasse {learner.klasse}'
+        elif index < self.controller.current:
+            text = f'{learner.vorname} {learner.nachname} ist bereits erledigt'
+        else:
+            if index > self.controller.current:
+                self.jump_to(index)
+            text = f'Ausweis erkannt: {learner.vorname} {learner.nachname}'
+        self.logger.info(text)
+        self.statusBar().showMessage(text, STATUS_MS)
+
+    def _start_camera(self):
+        """Open the camera in the background; the preview shows a hint meanwhile."""
+        if not hasattr(self.camera, 'start_liveview'):
+            return
+        self.preview.set_connecting(True)
+        self.cameras.start()
+
+    def _on_camera_changed(self, camera):
+        # Zeiten ab jetzt messen; der Manager startet die neue Kamera gleich
+        self._started_at = time.perf_counter()
+        self.preview.set_camera(camera)
+        self.preview.set_connecting(True)
+
+    def _on_camera_started(self, camera, error):
+        if camera is not self.camera:
+            return  # inzwischen ersetzt
+        self.preview.set_connecting(False)
+        if error is not None:
+            self.logger.error('Kamera konnte nicht gestartet werden: %s', error)
+            self.preview.show_message(str(error))
+        else:
+            self.logger.info(
+                'Kamera bereit nach %.0f ms', (time.perf_counter() - self._started_at) * 1000
+            )
+
+    def _on_first_frame(self):
+        self.logger.info(
+            'Erstes Kamerabild nach %.0f ms', (time.perf_counter() - self._started_at) * 1000
+        )
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._window_timed:
+            self._window_timed = True
+            # Erst nach dem ersten Durchlauf der Eventloop ist das Fenster gezeichnet
+            QtCore.QTimer.singleShot(0, self._log_window_time)
+
+    def _log_window_time(self):
+        self.logger.info(
+            'Fenster sichtbar nach %.0f ms', (time.perf_counter() - self._started_at) * 1000
+        )
 
     def _setup_ui(self):
-        self.setWindowTitle('LegicCard-Creator')
+        name = self.controller.station.name
+        self.setWindowTitle(f'LegicCard-Creator – {name}' if name else 'LegicCard-Creator')
         self.setFixedSize(1000, 700)
         central = QtWidgets.QWidget()
         layout = QtWidgets.QHBoxLayout(central)
@@ -106,7 +267,7 @@ class MainWindow(QtWidgets.QMainWindow):
         from .widgets.live_view_widget import LiveViewWidget
         fps = self.settings.kamera.liveviewFpsZiel
         self.preview = LiveViewWidget(self.camera, fps)
-        self.preview.set_overlay_image(self.settings.overlay.image)
+        self.preview.set_overlay_settings(self.settings.overlay)
         preview_layout = QtWidgets.QVBoxLayout()
         preview_layout.setSpacing(10)
         name_layout = QtWidgets.QHBoxLayout()
@@ -150,6 +311,9 @@ class MainWindow(QtWidgets.QMainWindow):
         QtGui.QShortcut(QtGui.QKeySequence('F'), self, self.finish_class)
         QtGui.QShortcut(QtGui.QKeySequence('A'), self, self.add_person)
         QtGui.QShortcut(QtGui.QKeySequence('C'), self, self.switch_camera)
+        QtGui.QShortcut(QtGui.QKeySequence('L'), self, self.preview.toggle_loupe)
+        QtGui.QShortcut(QtGui.QKeySequence('Q'), self, self.toggle_scanning)
+        QtGui.QShortcut(QtGui.QKeySequence('P'), self, self.toggle_peaking)
 
     # ------------------------------------------------------------------
     def _notify(
@@ -178,8 +342,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if not path:
             return
         try:
-            self.reader = ExcelReader(Path(path), self.settings.excelMapping.model_dump())
-            locations = self.reader.locations()
+            locations = self.controller.load_excel(Path(path))
         except Exception as e:
             self._notify('Excel', str(e), level='error')
             return
@@ -214,7 +377,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.show_next()
         self._update_buttons()
 
+    def _reset_auto_trigger(self):
+        # Erst nach Bewegung wieder ausloesen, sonst trifft ein noch
+        # stehendes Gesicht die naechste Person
+        if self.auto_trigger is not None:
+            self.auto_trigger.reset()
+
     def show_next(self):
+        self._reset_auto_trigger()
         learner = self.controller.current_learner()
         if learner is None:
             self.label_current.setText('Klasse abgeschlossen')
@@ -266,11 +436,14 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _set_busy(self, busy: bool):
         self.busy = busy
+        # Waehrend Aufnahme und Speichern braucht niemand die Vorschau
+        self.preview.set_paused('busy', busy)
         for btn in [self.btn_excel, self.btn_settings, self.btn_switch_camera]:
             btn.setEnabled(not busy)
         self._update_buttons()
 
     def capture_photo(self):
+        self._reset_auto_trigger()
         if self.controller.current >= len(self.controller.learners):
             return
         if self.controller.excel_running():
@@ -287,26 +460,33 @@ class MainWindow(QtWidgets.QMainWindow):
         def task():
             # Delegate the actual capture process to the controller so that
             # filenames are determined solely based on the provided *learner*.
-            return self.controller.capture(learner, location)
-
-        if hasattr(QtConcurrent, 'run'):
-            future = QtConcurrent.run(task)
-            watcher = QtCore.QFutureWatcher()
-            watcher.setFuture(future)
-            watcher.finished.connect(
-                lambda: self._capture_finished(watcher, learner, location, None)
-            )
-            self._capture_watcher = watcher
-        else:
-            raw_path = task()
-            self._capture_finished(None, learner, location, raw_path)
+            return self.controller.capture_async(learner, location)
+
+        def done(future):
+            self._capture_finished(future, learner, location, None)
+
+        def captured(future: Future):
+            # Die Station ist wieder frei, das Bild wird noch verarbeitet
+            if future.exception() is not None:
+                done(future)
+                return
+            future.result().add_done_callback(lambda f: self._emit_task_done(done, f))
+
+        self._run_task(task, captured)
 
-    def _capture_finished(self, watcher: QtCore.QFutureWatcher | None, learner: Learner, location: str, raw_path: Path | None):
+    def _capture_finished(self, future: Future | None, learner: Learner, location: str, raw_path: Path | None):
+        duplicates = []
         try:
-            if watcher is not None:
-                raw_path = watcher.result()
+            if future is not None:
+                raw_path = future.result()
+                duplicates = self.controller.duplicates_of(learner, location)
         except Exception as e:
-            self._notify('Aufnahme fehlgeschlagen', str(e), level='error')
+            message = str(e)
+            if isinstance(e, CameraTimeout):
+                # Nicht automatisch wiederholen: sonst entstehen womoeglich
+                # mehrere Fotos derselben Person
+                message += '\nDie Kamera hat eventuell trotzdem ausgelöst. Bitte prüfen und erneut aufnehmen.'
+            self._notify('Aufnahme fehlgeschlagen', message, level='error')
             if raw_path is not None:
                 raw_path.unlink(missing_ok=True)
             self._set_busy(False)
@@ -314,26 +494,24 @@ class MainWindow(QtWidgets.QMainWindow):
         if raw_path is None:
             self._set_busy(False)
             return
-        if self._show_review(raw_path):
+        warning = ''
+        if duplicates:
+            names = ', '.join(label for label, _ in duplicates)
+            warning = f'Dieses Foto gleicht dem von {names}. Richtige Person?'
+            self.logger.warning(warning)
+        if self._show_review(raw_path, warning):
             if not learner.is_new:
                 date_str = datetime.now().strftime('%d.%m.%Y')
 
                 def excel_task():
                     self.reader.mark_photographed(location, learner.row, True, date_str)
 
-                if hasattr(QtConcurrent, 'run'):
-                    future = QtConcurrent.run(excel_task)
-                    watcher2 = QtCore.QFutureWatcher()
-                    watcher2.setFuture(future)
-                    watcher2.finished.connect(lambda: self._mark_finished(watcher2))
-                    self._excel_watcher = watcher2
-                else:
-                    excel_task()
-                    self._mark_finished(None)
+                self._run_task(excel_task, self._mark_finished)
             else:
                 self._after_learner_done()
         else:
             raw_path.unlink(missing_ok=True)
+            self.controller.forget_photo(learner, location)
             # Preserve the currently selected learner when retrying a
             # capture so that manually chosen entries (via the drop-down
             # menu) remain active until a photo is accepted.  The
@@ -342,10 +520,10 @@ class MainWindow(QtWidgets.QMainWindow):
             self.show_next()
             self._set_busy(False)
 
-    def _mark_finished(self, watcher: QtCore.QFutureWatcher | None):
+    def _mark_finished(self, future: Future | None):
         try:
-            if watcher is not None:
-                watcher.result()
+            if future is not None:
+                future.result()
         except Exception as e:
             self._notify('Excel', str(e), level='warning')
         self._after_learner_done()
@@ -393,7 +571,6 @@ class MainWindow(QtWidgets.QMainWindow):
             if not ok:
                 return
         learner = self.controller.learners[self.controller.current]
-        missed = MissedWriter(self.settings.missedPath)
         entry = MissedEntry(
             self.cmb_location.currentText(),
             learner.klasse,
@@ -408,7 +585,7 @@ class MainWindow(QtWidgets.QMainWindow):
         def task():
             errors = []
             try:
-                missed.append(entry)
+                self.controller.hub.append_missed(entry)
             except Exception as e:
                 errors.append(str(e))
             if not learner.is_new:
@@ -423,22 +600,10 @@ class MainWindow(QtWidgets.QMainWindow):
                     errors.append(str(e))
             return errors
 
-        if hasattr(QtConcurrent, 'run'):
-            future = QtConcurrent.run(task)
-            watcher = QtCore.QFutureWatcher()
-            watcher.setFuture(future)
-            watcher.finished.connect(lambda: self._skip_finished(watcher))
-            self._skip_watcher = watcher
-        else:
-            errors = task()
-            for err in errors:
-                self._notify('Excel', err, level='warning')
-            self.controller.advance()
-            self.show_next()
-            self._set_busy(False)
+        self._run_task(task, self._skip_finished)
 
-    def _skip_finished(self, watcher: QtCore.QFutureWatcher):
-        errors = watcher.result()
+    def _skip_finished(self, future: Future):
+        errors = future.result()
         for err in errors:
             self._notify('Excel', err, level='warning')
         self._after_learner_done()
@@ -485,10 +650,15 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.show_next()
                 self._update_buttons()
 
-    def _show_review(self, path: Path) -> bool:
+    def _show_review(self, path: Path, warning: str = '') -> bool:
         dlg = QtWidgets.QDialog(self)
         dlg.setWindowTitle('Aufnahme ansehen')
         vbox = QtWidgets.QVBoxLayout(dlg)
+        if warning:
+            warn = QtWidgets.QLabel(warning)
+            warn.setWordWrap(True)
+            warn.setStyleSheet('color: white; background: #c62828; padding: 6px; font-weight: bold;')
+            vbox.addWidget(warn)
         lbl = QtWidgets.QLabel()
         pix = QtGui.QPixmap(str(path))
         lbl.setPixmap(pix.scaled(self.preview.size(), QtCore.Qt.KeepAspectRatio))
@@ -504,36 +674,37 @@ class MainWindow(QtWidgets.QMainWindow):
         ok_btn.clicked.connect(dlg.accept)
         QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_Space), dlg, ok_btn.click)
         QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_Escape), dlg, retry.click)
-        dlg.exec()
+        self.preview.pause('review')
+        try:
+            dlg.exec()
+        finally:
+            self.preview.resume('review')
         return result['ok']
 
     def switch_camera(self):
-        if hasattr(self.controller.camera, 'switch_camera'):
+        if self.cameras.can_switch():
             try:
                 self.controller.switch_camera()
-                self.preview.set_camera(self.controller.camera)
             except Exception as e:
                 self._notify('Kamera', str(e), level='warning')
 
     def closeEvent(self, event):
-        self.controller.camera.stop_liveview()
+        self.analysis.stop()
+        self.controller.shutdown()
         super().closeEvent(event)
 
     def open_settings(self):
         dlg = SettingsDialog(
             self.settings, self, logger=self.logger.getChild('SettingsDialog')
         )
-        before_backend = self.settings.kamera.backend
-        before_overlay = self.settings.overlay.image
+        before_overlay = self.settings.overlay.model_copy()
         if dlg.exec() == QtWidgets.QDialog.Accepted:
-            if self.settings.kamera.backend != before_backend:
-                self.camera.stop_liveview()
-                self.camera = self._init_camera()
-                if hasattr(self.camera, 'start_liveview'):
-                    self.camera.start_liveview()
-                self.preview.set_camera(self.camera)
-            if self.settings.overlay.image != before_overlay:
-                self.preview.set_overlay_image(self.settings.overlay.image)
+            # Nur bei geaenderten Kameraeinstellungen neu verbinden
+            self.cameras.apply_settings()
+            self.preview.scheduler.set_fps(self.settings.kamera.liveviewFpsZiel)
+            if self.settings.overlay != before_overlay:
+                self.preview.set_overlay_settings(self.settings.overlay)
+            self._apply_analysis_settings()
         self._update_buttons()
 
     def _update_buttons(self):
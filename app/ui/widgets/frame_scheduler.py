@@ -0,0 +1,117 @@
+# app/ui/widgets/frame_scheduler.py
+"""Adaptive timer for live-view updates."""
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from PySide6 import QtCore
+
+# Anteil eines Intervalls, den das Holen und Zeichnen eines Bildes hoechstens
+# belegen darf, bevor die Bildrate gesenkt wird
+BUDGET_SHARE = 0.5
+MIN_INTERVAL_MS = 30
+MAX_INTERVAL_MS = 500
+# Glaettung des gemessenen Aufwands (exponentieller Mittelwert)
+SMOOTHING = 0.2
+
+
+class FrameScheduler(QtCore.QObject):
+    """Calls *callback* at the target rate and backs off when frames are slow.
+
+    *callback* returns ``True`` if it produced a new frame; only those ticks
+    are measured. The scheduler stops its timer while any pause reason is
+    set, e.g. ``'hidden'``, ``'busy'`` or ``'review'``, and reports the
+    change through :attr:`paused_changed` so the frame source can pause too.
+    """
+
+    paused_changed = QtCore.Signal(bool)
+
+    def __init__(
+        self,
+        callback: Callable[[], bool],
+        fps: int = 20,
+        parent: QtCore.QObject | None = None,
+    ):
+        super().__init__(parent)
+        self._callback = callback
+        self._reasons: set[str] = set()
+        self._running = False
+        self.cost_ms = 0.0
+        self.paint_ms = 0.0
+        self.target_ms = MIN_INTERVAL_MS
+        self.interval_ms = MIN_INTERVAL_MS
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self._on_timeout)
+        self.set_fps(fps)
+
+    def set_fps(self, fps: int) -> None:
+        self.target_ms = max(MIN_INTERVAL_MS, int(1000 / max(1, fps)))
+        self._set_interval(self.target_ms)
+
+    def _set_interval(self, ms: float) -> None:
+        self.interval_ms = ms
+        self._timer.setInterval(int(ms))
+
+    # lifecycle ---------------------------------------------------------------
+    def start(self) -> None:
+        self._running = True
+        self._apply()
+
+    def stop(self) -> None:
+        self._running = False
+        self._apply()
+
+    def pause(self, reason: str) -> None:
+        was_paused = self.is_paused()
+        self._reasons.add(reason)
+        self._apply()
+        if not was_paused:
+            self.paused_changed.emit(True)
+
+    def resume(self, reason: str) -> None:
+        if reason not in self._reasons:
+            return
+        self._reasons.discard(reason)
+        self._apply()
+        if not self._reasons:
+            self.paused_changed.emit(False)
+
+    def set_paused(self, reason: str, paused: bool) -> None:
+        if paused:
+            self.pause(reason)
+        else:
+            self.resume(reason)
+
+    def is_active(self) -> bool:
+        return self._timer.isActive()
+
+    def is_paused(self) -> bool:
+        return bool(self._reasons)
+
+    def pause_reasons(self) -> set[str]:
+        return set(self._reasons)
+
+    def _apply(self) -> None:
+        if self._running and not self._reasons:
+            if not self._timer.isActive():
+                self._timer.start()
+        else:
+            self._timer.stop()
+
+    # measurement -------------------------------------------------------------
+    def _on_timeout(self) -> None:
+        start = time.perf_counter()
+        produced = self._callback()
+        if produced:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.record(elapsed + self.paint_ms)
+
+    def record(self, cost_ms: float) -> None:
+        """Feed the cost of one frame and adapt the interval."""
+        self.cost_ms += SMOOTHING * (cost_ms - self.cost_ms)
+        budget = self.interval_ms * BUDGET_SHARE
+        if self.cost_ms > budget:
+            self._set_interval(min(MAX_INTERVAL_MS, self.interval_ms * 1.25))
+        elif self.cost_ms < budget / 2 and self.interval_ms > self.target_ms:
+            self._set_interval(max(self.target_ms, self.interval_ms * 0.9))
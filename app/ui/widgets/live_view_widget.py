@@ -1,38 +1,135 @@
 # app/ui/widgets/live_view_widget.py
 from pathlib import Path
+import time
+import numpy as np
 from PySide6 import QtWidgets, QtGui, QtCore
+from ...core.analysis import frame_from_qimage
+from .frame_scheduler import FrameScheduler
 from .overlay import Overlay
 
+CONNECTING_TEXT = 'Kamera wird verbunden …'
+LOUPE_TEXT = 'Lupe 100 %'
+# Groesse der Histogrammanzeige in Pixeln
+HISTOGRAM_SIZE = (128, 48)
+# Ab diesem Anteil abgeschnittener Pixel (Prozent) wird gewarnt
+CLIP_WARN = 1.0
+# Farbe der Fokus-Peaking-Markierung (RGBA)
+PEAKING_COLOR = (255, 40, 200, 255)
+# Auch ohne neues Bild so oft (Sekunden) nachfragen, damit die Kamera einen
+# stehengebliebenen LiveView bemerkt
+STALL_POLL_INTERVAL = 1.0
+
+
 class LiveViewWidget(QtWidgets.QWidget):
-    """Widget zur Anzeige des Live-Streams mit einblendbarem Overlay."""
+    """Widget zur Anzeige des Live-Streams mit einblendbarem Overlay.
+
+    Die Kamera liefert Bilder bereits in Anzeigegroesse (siehe
+    ``set_preview_size``); ``paintEvent`` zeichnet sie nur noch. Ein
+    :class:`FrameScheduler` holt die Bilder und pausiert, solange die
+    Vorschau nicht sichtbar ist oder ``pause`` aufgerufen wurde; die Kamera
+    pausiert dann ebenfalls (``pause_liveview``).
+    Waehrend die Kamera noch geoeffnet wird (``set_connecting``) zeigt das
+    Widget einen Hinweis; :attr:`first_frame` meldet das erste Bild einer
+    Kamera.
+
+    Ein Doppelklick (oder ``toggle_loupe``) schaltet die Lupe ein: Die
+    Kamera liefert dann einen unskalierten Ausschnitt des Vollbilds um den
+    gewaehlten Punkt, um die Schaerfe zu beurteilen.
+
+    Mit ``set_analysis`` erhaelt ein :class:`AnalysisWorker` ausgeduennte
+    Kopien der angezeigten Bilder, sobald er wieder eines verarbeiten kann.
+    ``set_exposure`` blendet das dort berechnete Histogramm samt Anteil
+    abgeschnittener Lichter und Tiefen ein; es wird nur bei neuen Werten
+    gezeichnet und beim Malen als fertiges Bild uebernommen. Ebenso legt
+    ``set_focus`` die scharfen Kanten als vorberechnete Ebene ueber das
+    Bild und zeigt den Schaerfewert des Augenbereichs an.
+    """
+
+    first_frame = QtCore.Signal()
 
     def __init__(self, camera, fps: int = 20, parent=None):
         super().__init__(parent)
-        self.camera = camera
-        self.label = QtWidgets.QLabel()
-        self.label.setAlignment(QtCore.Qt.AlignCenter)
-        self.label.setStyleSheet("background-color: black;")
-        self.label.setSizePolicy(
+        self.camera = None
+        self._frame_pending = True
+        self._polled_at = 0.0
+        self._first_frame_pending = True
+        self._image = QtGui.QImage()
+        self._message = ''
+        self._frame_rect = QtCore.QRect()
+        self._preview_size = None
+        self._loupe = None
+        self._analysis = None
+        self._shown = 0
+        self._exposure = None
+        self._histogram = QtGui.QPixmap()
+        self._focus = None
+        self._peaking = QtGui.QImage()
+        self._peaking_scaled = QtGui.QPixmap()
+        self.setSizePolicy(
             QtWidgets.QSizePolicy.Expanding,
             QtWidgets.QSizePolicy.Expanding,
         )
         self.frame_ratio = 3 / 4
-        self.overlay = Overlay()
-        layout = QtWidgets.QStackedLayout(self)
-        layout.setStackingMode(QtWidgets.QStackedLayout.StackAll)
-        layout.addWidget(self.label)
-        layout.addWidget(self.overlay)
+        self.overlay = Overlay(self)
         # Sicherstellen, dass das Overlay ueber dem Bild liegt
         self.overlay.raise_()
         self.overlay.show()
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(max(30, int(1000 / max(1, fps))))
+        self.set_camera(camera)
+        self._watched_window = None
+        self.scheduler = FrameScheduler(self.update_frame, fps, self)
+        self.scheduler.paused_changed.connect(self._pause_camera)
+        self.scheduler.pause('hidden')
+        self.scheduler.start()
 
-    def _update_label_geometry(self):
-        if self.frame_ratio <= 0:
-            return
+    # scheduling ------------------------------------------------------------
+    def pause(self, reason: str):
+        self.scheduler.pause(reason)
+
+    def resume(self, reason: str):
+        self.scheduler.resume(reason)
+
+    def set_paused(self, reason: str, paused: bool):
+        self.scheduler.set_paused(reason, paused)
+
+    def _pause_camera(self, paused: bool):
+        # Auch Grabber-Thread bzw. LiveView-Prozess der Kamera anhalten
+        name = 'pause_liveview' if paused else 'resume_liveview'
+        method = getattr(self.camera, name, None)
+        if method is not None:
+            method()
+
+    def _update_visibility(self):
+        window = self.window()
+        visible = self.isVisible() and not window.isMinimized()
+        self.scheduler.set_paused('hidden', not visible)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        window = self.window()
+        if window is not self._watched_window:
+            if self._watched_window is not None:
+                self._watched_window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._watched_window = window
+        self._update_visibility()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_visibility()
+
+    def eventFilter(self, obj, event):
+        if obj is self._watched_window and event.type() in (
+            QtCore.QEvent.WindowStateChange,
+            QtCore.QEvent.Show,
+            QtCore.QEvent.Hide,
+        ):
+            self._update_visibility()
+        return super().eventFilter(obj, event)
+
+    def _update_frame_geometry(self):
         w, h = self.width(), self.height()
+        if self.frame_ratio <= 0 or w <= 0 or h <= 0:
+            return
         if w / h > self.frame_ratio:
             new_w = int(h * self.frame_ratio)
             new_h = h
@@ -41,12 +138,27 @@ class LiveViewWidget(QtWidgets.QWidget):
             new_h = int(w / self.frame_ratio)
         x = (w - new_w) // 2
         y = (h - new_h) // 2
-        self.label.setGeometry(x, y, new_w, new_h)
-        self.overlay.setGeometry(self.label.geometry())
+        self._frame_rect = QtCore.QRect(x, y, new_w, new_h)
+        self.overlay.setGeometry(self._frame_rect)
+        self._send_preview_size()
+        self.update()
+
+    def _send_preview_size(self):
+        """Teilt der Kamera die Anzeigegroesse in Geraetepixeln mit."""
+        if self._frame_rect.isEmpty() or not hasattr(self.camera, 'set_preview_size'):
+            return
+        ratio = self.devicePixelRatioF()
+        size = (
+            round(self._frame_rect.width() * ratio),
+            round(self._frame_rect.height() * ratio),
+        )
+        if size != self._preview_size:
+            self._preview_size = size
+            self.camera.set_preview_size(*size)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self._update_label_geometry()
+        self._update_frame_geometry()
 
     def sizeHint(self):
         if self.frame_ratio >= 1:
@@ -55,12 +167,164 @@ class LiveViewWidget(QtWidgets.QWidget):
             return QtCore.QSize(int(640 * self.frame_ratio), 640)
 
     def set_camera(self, camera):
+        old = getattr(self.camera, 'frame_ready', None)
+        if old is not None:
+            try:
+                old.disconnect(self._on_frame_ready)
+            except (RuntimeError, TypeError):
+                pass
         self.camera = camera
+        self._frame_pending = True
+        self._first_frame_pending = True
+        self._preview_size = None
+        self._loupe = None
+        self.set_exposure(None)
+        self.set_focus(None)
+        self._send_preview_size()
+        scheduler = getattr(self, 'scheduler', None)
+        if scheduler is not None and scheduler.is_paused():
+            self._pause_camera(True)
+        signal = getattr(camera, 'frame_ready', None)
+        if signal is not None:
+            signal.connect(self._on_frame_ready)
+
+    def _on_frame_ready(self, _seq: int = 0):
+        self._frame_pending = True
+
+    # loupe -------------------------------------------------------------------
+    @property
+    def loupe(self):
+        return self._loupe
+
+    def set_loupe(self, center: tuple[float, float] | None) -> bool:
+        """Zoom to 100 % around *center* (relative to the frame) or back out.
+
+        Returns ``False`` if the camera cannot deliver a crop.
+        """
+        setter = getattr(self.camera, 'set_loupe', None)
+        if setter is None or setter(center) is False:
+            self._loupe = None
+            return center is None
+        self._loupe = center
+        self._frame_pending = True
+        self.update(self._frame_rect)
+        return True
+
+    def toggle_loupe(self, center: tuple[float, float] = (0.5, 0.5)) -> bool:
+        return self.set_loupe(None if self._loupe is not None else center)
+
+    def mouseDoubleClickEvent(self, event):
+        rect = self._frame_rect
+        pos = event.position()
+        if event.button() != QtCore.Qt.LeftButton or not QtCore.QRectF(rect).contains(pos):
+            super().mouseDoubleClickEvent(event)
+            return
+        self.toggle_loupe((
+            (pos.x() - rect.x()) / rect.width(),
+            (pos.y() - rect.y()) / rect.height(),
+        ))
+
+    def set_analysis(self, worker):
+        self._analysis = worker
+
+    # exposure ----------------------------------------------------------------
+    @property
+    def exposure(self):
+        return self._exposure
+
+    def set_exposure(self, exposure):
+        """Show the histogram of an :class:`Exposure`, or hide it for ``None``."""
+        self._exposure = exposure
+        self._histogram = QtGui.QPixmap() if exposure is None else self._render_histogram(exposure)
+        self.update(self._frame_rect)
+
+    def _render_histogram(self, exposure) -> QtGui.QPixmap:
+        w, h = HISTOGRAM_SIZE
+        text_h = self.fontMetrics().height()
+        pixmap = QtGui.QPixmap(w, h + text_h)
+        pixmap.fill(QtGui.QColor(0, 0, 0, 140))
+        painter = QtGui.QPainter(pixmap)
+        bins = len(exposure.histogram)
+        bar = w / bins
+        for i, value in enumerate(exposure.histogram):
+            bar_h = float(value) * h
+            painter.fillRect(QtCore.QRectF(i * bar, h - bar_h, bar, bar_h), QtGui.QColor(230, 230, 230))
+        for share, x in ((exposure.shadows, 0), (exposure.highlights, w - bar)):
+            if share >= CLIP_WARN:
+                painter.fillRect(QtCore.QRectF(x, 0, bar, h), QtCore.Qt.red)
+        warn = max(exposure.shadows, exposure.highlights) >= CLIP_WARN
+        painter.setPen(QtCore.Qt.red if warn else QtCore.Qt.white)
+        text = f'Tiefen {exposure.shadows:.1f} %  Lichter {exposure.highlights:.1f} %'
+        painter.drawText(QtCore.QRect(0, h, w, text_h), QtCore.Qt.AlignCenter, text.replace('.', ','))
+        painter.end()
+        return pixmap
+
+    # focus -------------------------------------------------------------------
+    @property
+    def focus(self):
+        return self._focus
+
+    def set_focus(self, focus):
+        """Overlay the edge mask of a :class:`Focus`, or remove it for ``None``."""
+        self._focus = focus
+        self._peaking = QtGui.QImage() if focus is None else self._render_peaking(focus.mask)
+        self._peaking_scaled = QtGui.QPixmap()
+        self.update(self._frame_rect)
+
+    @staticmethod
+    def _render_peaking(mask) -> QtGui.QImage:
+        h, w = mask.shape
+        rgba = np.zeros((h, w, 4), np.uint8)
+        rgba[mask] = PEAKING_COLOR
+        img = QtGui.QImage(rgba.data, w, h, w * 4, QtGui.QImage.Format_RGBA8888)
+        # Kopie, damit das Bild nicht am NumPy-Puffer haengt
+        return img.copy()
+
+    def _scaled_peaking(self, size: QtCore.QSize) -> QtGui.QPixmap:
+        # Nur bei neuer Maske oder Groesse skalieren, nicht bei jedem Bild
+        if self._peaking_scaled.size() != size:
+            self._peaking_scaled = QtGui.QPixmap.fromImage(
+                self._peaking.scaled(size, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.FastTransformation)
+            )
+        return self._peaking_scaled
+
+    def set_connecting(self, connecting: bool):
+        """Show a hint instead of polling while the camera is being opened."""
+        self.scheduler.set_paused('connecting', connecting)
+        if connecting:
+            self.show_message(CONNECTING_TEXT)
+        elif self._message == CONNECTING_TEXT:
+            self.show_message('')
+
+    def show_message(self, message: str):
+        if message != self._message or not self._image.isNull():
+            self._image = QtGui.QImage()
+            self._message = message
+            self.update(self._frame_rect)
 
     def set_overlay_image(self, path: str | Path | None):
         self.overlay.set_image(path)
 
-    def update_frame(self):
+    def set_overlay_settings(self, settings):
+        """Apply an :class:`OverlaySettings` instance to the overlay."""
+        self.overlay.set_settings(
+            settings.drittellinien, settings.horizonte, settings.deckkraft
+        )
+        self.overlay.set_image(settings.image)
+
+    def update_frame(self) -> bool:
+        """Fetch the newest frame; return ``True`` if a new one is shown."""
+        # Kameras mit eigenem Grabber-Thread melden neue Bilder selbst; ohne
+        # neues Bild wird nur selten nachgefragt.
+        now = time.monotonic()
+        if (
+            hasattr(self.camera, 'frame_ready')
+            and not self._frame_pending
+            and now - self._polled_at < STALL_POLL_INTERVAL
+        ):
+            return False
+        self._frame_pending = False
+        self._polled_at = now
         try:
             if hasattr(self.camera, 'get_preview_qimage'):
                 img = self.camera.get_preview_qimage()
@@ -73,14 +337,77 @@ class LiveViewWidget(QtWidgets.QWidget):
                     img = QtGui.QImage(str(path))
                 finally:
                     path.unlink(missing_ok=True)
-            if not img.isNull():
-                self.frame_ratio = img.width() / img.height()
-                self._update_label_geometry()
-                pix = QtGui.QPixmap.fromImage(img).scaled(
-                    self.label.size(),
-                    QtCore.Qt.KeepAspectRatio,
-                    QtCore.Qt.SmoothTransformation,
-                )
-                self.label.setPixmap(pix)
+            if img.isNull():
+                # Noch kein Bild verfuegbar: beim naechsten Tick erneut fragen
+                self._frame_pending = True
+                return False
+            if img.cacheKey() == self._image.cacheKey():
+                # Unveraendertes Bild nicht erneut zeichnen
+                return False
+            self._show_image(img)
+            return True
         except Exception as e:
-            self.label.setText(str(e))
+            self._frame_pending = True
+            self.show_message(str(e))
+            return False
+
+    def _show_image(self, img: QtGui.QImage):
+        self._image = img
+        self._message = ''
+        self._shown += 1
+        analysis = self._analysis
+        # Lupenbilder zeigen nur einen Ausschnitt und taugen nicht fuer die Analyse
+        if analysis is not None and self._loupe is None and analysis.wants_frame():
+            analysis.submit(frame_from_qimage(img, self._shown))
+        if self._first_frame_pending:
+            self._first_frame_pending = False
+            self.first_frame.emit()
+        ratio = img.width() / img.height()
+        # Rundungsunterschiede der verkleinerten Bilder nicht weiterreichen,
+        # sonst schwingen Anzeige- und Vorschaugroesse gegeneinander
+        if abs(ratio - self.frame_ratio) > 0.01 * self.frame_ratio:
+            self.frame_ratio = ratio
+            self._update_frame_geometry()
+        else:
+            self.update(self._frame_rect)
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        painter = QtGui.QPainter(self)
+        self._paint(painter)
+        painter.end()
+        self.scheduler.paint_ms = (time.perf_counter() - start) * 1000
+
+    def _paint(self, painter: QtGui.QPainter):
+        rect = self._frame_rect
+        painter.fillRect(rect, QtCore.Qt.black)
+        if not self._image.isNull():
+            ratio = self._image.devicePixelRatio()
+            size = QtCore.QSizeF(self._image.size()) / ratio
+            # Immer einpassen: zu grosse Bilder von Kameras ohne
+            # Groessenanpassung ebenso wie kleine Quellen (z. B. 640x480),
+            # damit Bild und Overlay deckungsgleich sind
+            size.scale(QtCore.QSizeF(rect.size()), QtCore.Qt.KeepAspectRatio)
+            target = QtCore.QRectF(QtCore.QPointF(0, 0), size)
+            target.moveCenter(QtCore.QRectF(rect).center())
+            painter.drawImage(target, self._image)
+            if self._loupe is None and not self._peaking.isNull():
+                painter.drawPixmap(target.topLeft(), self._scaled_peaking(target.size().toSize()))
+            if self._loupe is None and self._focus is not None:
+                painter.setPen(QtCore.Qt.white)
+                painter.drawText(
+                    rect.adjusted(8, 8, -8, -8),
+                    QtCore.Qt.AlignTop | QtCore.Qt.AlignRight,
+                    f'Schärfe {self._focus.score:.0f}',
+                )
+            if self._loupe is not None:
+                painter.setPen(QtCore.Qt.white)
+                painter.drawText(
+                    rect.adjusted(8, 8, -8, -8), QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft, LOUPE_TEXT
+                )
+            elif not self._histogram.isNull():
+                pos = rect.bottomLeft() + QtCore.QPoint(8, -8 - self._histogram.height())
+                painter.drawPixmap(pos, self._histogram)
+        elif self._message:
+            painter.setPen(QtCore.Qt.white)
+            painter.drawText(rect, QtCore.Qt.AlignCenter | QtCore.Qt.TextWordWrap, self._message)
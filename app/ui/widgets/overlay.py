@@ -2,13 +2,29 @@
 from pathlib import Path
 from PySide6 import QtWidgets, QtGui, QtCore
 
+# Groesste Kantenlaenge, mit der ein Overlay-PNG dekodiert wird
+MAX_SOURCE_SIDE = 2048
+# Drittellinien und Horizontlinien als Anteil der Bildhoehe bzw. -breite
+THIRDS = (1 / 3, 2 / 3)
+HORIZONS = (0.5,)
+
 
 class Overlay(QtWidgets.QWidget):
-    """Zeigt ein optionales PNG-Bild ueber dem LiveView."""
+    """Zeigt PNG-Bild, Drittellinien und Horizontlinie ueber dem LiveView.
+
+    Alle Ebenen werden mit der eingestellten Deckkraft in eine Pixmap in
+    Widgetgroesse gerendert. Diese wird erst bei Groessen- oder
+    Einstellungsaenderungen neu erzeugt, pro Frame bleibt ein einziges
+    ``drawPixmap``.
+    """
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.pixmap = None
+        self.source = None
+        self.drittellinien = False
+        self.horizonte = False
+        self.deckkraft = 1.0
+        self._cache = None
         self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
         self.setAttribute(QtCore.Qt.WA_NoSystemBackground)
         # Unter Windows sorgt diese Flag-Kombination fuer korrekte Transparenz
@@ -20,18 +36,75 @@ class Overlay(QtWidgets.QWidget):
 
     def set_image(self, path: str | Path | None):
         if path and Path(path).exists():
-            self.pixmap = QtGui.QPixmap(str(path))
+            self.source = self._load(Path(path))
         else:
-            self.pixmap = None
+            self.source = None
+        self._invalidate()
+
+    def set_settings(self, drittellinien: bool, horizonte: bool, deckkraft: float):
+        self.drittellinien = drittellinien
+        self.horizonte = horizonte
+        self.deckkraft = min(1.0, max(0.0, deckkraft))
+        self._invalidate()
+
+    @staticmethod
+    def _load(path: Path) -> QtGui.QImage | None:
+        reader = QtGui.QImageReader(str(path))
+        size = reader.size()
+        if size.isValid() and max(size.width(), size.height()) > MAX_SOURCE_SIDE:
+            # Grosse PNGs gleich verkleinert dekodieren
+            reader.setScaledSize(
+                size.scaled(MAX_SOURCE_SIDE, MAX_SOURCE_SIDE, QtCore.Qt.KeepAspectRatio)
+            )
+        img = reader.read()
+        return None if img.isNull() else img
+
+    def _has_content(self) -> bool:
+        return self.source is not None or self.drittellinien or self.horizonte
+
+    def _invalidate(self):
+        self._cache = None
         self.update()
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._cache = None
+
+    def _render(self) -> QtGui.QPixmap:
+        ratio = self.devicePixelRatioF()
+        w, h = self.width(), self.height()
+        pix = QtGui.QPixmap(round(w * ratio), round(h * ratio))
+        pix.setDevicePixelRatio(ratio)
+        pix.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pix)
+        painter.setOpacity(self.deckkraft)
+        if self.source is not None:
+            img = self.source.scaled(
+                pix.size(), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
+            )
+            img.setDevicePixelRatio(ratio)
+            x = (w - img.width() / ratio) / 2
+            y = (h - img.height() / ratio) / 2
+            painter.drawImage(QtCore.QPointF(x, y), img)
+        pen = QtGui.QPen(QtCore.Qt.white)
+        pen.setCosmetic(True)
+        if self.drittellinien:
+            painter.setPen(pen)
+            for f in THIRDS:
+                painter.drawLine(QtCore.QLineF(w * f, 0, w * f, h))
+                painter.drawLine(QtCore.QLineF(0, h * f, w, h * f))
+        if self.horizonte:
+            pen.setStyle(QtCore.Qt.DashLine)
+            painter.setPen(pen)
+            for f in HORIZONS:
+                painter.drawLine(QtCore.QLineF(0, h * f, w, h * f))
+        painter.end()
+        return pix
+
     def paintEvent(self, event):
-        if not self.pixmap:
+        if not self._has_content() or self.width() <= 0 or self.height() <= 0:
             return
+        if self._cache is None:
+            self._cache = self._render()
         painter = QtGui.QPainter(self)
-        pix = self.pixmap.scaled(
-            self.size(), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
-        )
-        x = (self.width() - pix.width()) // 2
-        y = (self.height() - pix.height()) // 2
-        painter.drawPixmap(x, y, pix)
+        painter.drawPixmap(0, 0, self._cache)
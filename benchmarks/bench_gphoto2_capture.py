@@ -0,0 +1,145 @@
+# benchmarks/bench_gphoto2_capture.py
+"""Per-capture latency of GPhoto2Camera with live view on.
+
+Run with ``python -m benchmarks.bench_gphoto2_capture``. A stand-in
+``gphoto2`` on ``PATH`` sleeps *--setup-ms* on every process start (USB
+enumeration and session set-up of a real camera) and *--capture-ms* per
+photo. Each capture runs like in ``MainWindow``: pause live view,
+capture, resume. Reported are the capture call and the time until the
+next live-view frame after resuming. Compared are the shell session,
+the shell closed after every capture (the behaviour before the session
+carried live view) and one-shot calls.
+"""
+import argparse
+import os
+import statistics
+import stat
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from app.core.camera import GPhoto2Camera
+
+FAKE_GPHOTO2 = """\
+#!{python}
+import os, sys, time
+time.sleep({setup} / 1000)
+args = sys.argv[1:]
+with open({starts!r}, 'a') as fh:
+    fh.write('x')
+frame = open({frame!r}, 'rb').read()
+if '--shell' in args:
+    count = 0
+    for line in sys.stdin:
+        cmd = line.strip()
+        if cmd.startswith('lcd '):
+            os.chdir(cmd[4:])
+            print(f"Local directory now '{{cmd[4:]}}'.", flush=True)
+        elif cmd == 'capture-image-and-download':
+            time.sleep({capture} / 1000)
+            count += 1
+            name = f'capt{{count:04d}}.jpg'
+            open(name, 'wb').write(frame)
+            print(f'Saving file as {{name}}', flush=True)
+        elif cmd == 'capture-preview':
+            time.sleep({preview} / 1000)
+            open('capture_preview.jpg', 'wb').write(frame)
+            print('Saving file as capture_preview.jpg', flush=True)
+        elif cmd == 'exit':
+            break
+elif '--capture-movie' in args:
+    out = sys.stdout.buffer
+    while True:
+        time.sleep({preview} / 1000)
+        out.write(frame)
+        out.flush()
+elif '--capture-image-and-download' in args:
+    time.sleep({capture} / 1000)
+    open(args[args.index('--filename') + 1], 'wb').write(frame)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--setup-ms", type=float, default=500)
+    parser.add_argument("--capture-ms", type=float, default=200)
+    parser.add_argument("--preview-ms", type=float, default=40)
+    parser.add_argument("--captures", type=int, default=5)
+    return parser.parse_args()
+
+
+def wait_for_frame(cam, after, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        cam.get_preview_qimage()
+        latest = cam._live().latest()
+        if latest is not None and latest.timestamp > after:
+            return time.monotonic()
+        time.sleep(0.002)
+    raise TimeoutError("kein LiveView-Bild")
+
+
+def run(name, tmp, captures, starts):
+    cam = GPhoto2Camera(use_shell=name != "one-shot", timeout=10)
+    starts.write_text("")
+    cam.start_liveview()
+    capture_ms, back_ms = [], []
+    try:
+        wait_for_frame(cam, 0)
+        for i in range(captures):
+            cam.pause_liveview()
+            if name == "reopen":
+                # Wie frueher: der Stream hielt die Kamera, die Aufnahme
+                # braucht eine neue Sitzung
+                cam.shell.close()
+            start = time.monotonic()
+            cam.capture(tmp / f"{name}-{i}.jpg")
+            captured = time.monotonic()
+            if name == "reopen":
+                # ... und der LiveView startet danach neu
+                cam.shell.close()
+            cam.resume_liveview()
+            if name == "reopen":
+                cam.reset()
+            back = wait_for_frame(cam, captured)
+            capture_ms.append((captured - start) * 1000)
+            back_ms.append((back - captured) * 1000)
+    finally:
+        cam.stop_liveview()
+    return statistics.median(capture_ms), statistics.median(back_ms), len(starts.read_text())
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        frame = tmp / "frame.jpg"
+        rng = np.random.default_rng(0)
+        Image.fromarray(rng.integers(0, 255, (480, 640, 3), np.uint8)).save(frame)
+        starts = tmp / "starts.txt"
+        fake = tmp / "gphoto2"
+        fake.write_text(textwrap.dedent(FAKE_GPHOTO2).format(
+            python=sys.executable, setup=args.setup_ms, capture=args.capture_ms,
+            preview=args.preview_ms, starts=str(starts), frame=str(frame),
+        ))
+        fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{os.environ['PATH']}"
+        print(
+            f"setup {args.setup_ms:.0f} ms, capture {args.capture_ms:.0f} ms, "
+            f"preview {args.preview_ms:.0f} ms, {args.captures} captures"
+        )
+        for name in ("shell", "reopen", "one-shot"):
+            capture_ms, back_ms, processes = run(name, tmp, args.captures, starts)
+            print(
+                f"{name:<8} capture {capture_ms:7.1f} ms  live view back after "
+                f"{back_ms:7.1f} ms  gphoto2 starts {processes}"
+            )
+
+
+if __name__ == "__main__":
+    main()
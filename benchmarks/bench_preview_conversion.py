@@ -0,0 +1,85 @@
+# benchmarks/bench_preview_conversion.py
+"""Compare the old and the pooled preview conversion of OpenCVCamera.
+
+Run with ``python -m benchmarks.bench_preview_conversion``. Each variant
+runs in a fresh process. Reported are the time per frame, the image data
+Qt had to allocate per frame (a QImage whose pixels do not lie in one of
+the camera's pool buffers owns a copy) and the peak RSS of the process,
+which includes allocations inside Qt.
+"""
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+WIDTH, HEIGHT = 1920, 1080
+FRAMES = 200
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KiB, macOS Bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def legacy_convert(frame):
+    import cv2
+    from PySide6 import QtGui
+
+    frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb.shape
+    img = QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
+    return img.copy()
+
+
+def run(name):
+    from app.core.camera import OpenCVCamera
+
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(0, 255, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+        for _ in range(4)
+    ] * (FRAMES // 4)
+    cam = OpenCVCamera()
+    if name == "display":
+        cam.set_preview_size(480, 640)
+    if name == "legacy":
+        convert = legacy_convert
+    else:
+        def convert(frame):
+            return cam._to_qimage(cam._prepare_preview(frame))
+    shown = convert(frames[0])  # warm-up, fills the buffer pool
+    qt_bytes = 0
+    start = time.perf_counter()
+    for frame in frames:
+        # Wie im Widget: das neue Bild ersetzt das angezeigte
+        shown = convert(frame)
+        bits = np.frombuffer(shown.constBits(), np.uint8).ctypes.data
+        if bits not in [buf.ctypes.data for buf in cam._pool.buffers()]:
+            qt_bytes += shown.sizeInBytes()
+    elapsed = time.perf_counter() - start
+    return elapsed / len(frames) * 1000, qt_bytes / len(frames), peak_rss_mb()
+
+
+def main():
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{WIDTH}x{HEIGHT}, {FRAMES} frames")
+    for name in ("legacy", "pooled", "display"):
+        with ctx.Pool(1) as pool:
+            ms, qt_bytes, peak = pool.apply(run, (name,))
+        print(
+            f"{name:<8} {ms:6.2f} ms/frame  Qt image data {qt_bytes / 1024:7.0f} KiB/frame  "
+            f"peak RSS {peak:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
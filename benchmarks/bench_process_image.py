@@ -0,0 +1,88 @@
+# benchmarks/bench_process_image.py
+"""Compare full decoding with draft decoding in ``process_image``.
+
+``draft`` reads the photo from a file, ``bytes`` from in-memory JPEG bytes
+as delivered by ``capture_frame``; both are decoded at reduced scale. Run with ``python -m benchmarks.bench_process_image``. Each variant runs
+in a fresh process so that its peak memory is measured on its own.
+"""
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from app.core.imaging.processor import crop_center, process_image
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resolution", default="6000x4000")
+    parser.add_argument("--target", default="1200x1600")
+    parser.add_argument("--runs", type=int, default=5)
+    return parser.parse_args()
+
+
+def size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def legacy_process(src, dest, width, height, quality, aspect):
+    """``process_image`` before draft decoding: full decode, crop, LANCZOS."""
+    with Image.open(src) as im:
+        im = crop_center(im, aspect).resize((width, height), Image.LANCZOS)
+        im.save(dest, "JPEG", quality=quality)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KiB, macOS Bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def run(name, src, target, runs):
+    fn = {"legacy": legacy_process, "draft": process_image, "bytes": process_image}[name]
+    if name == "bytes":
+        # Einmal vorab lesen: gemessen wird nur die Verarbeitung
+        src = Path(src).read_bytes()
+    times = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            start = time.perf_counter()
+            fn(src, Path(tmp) / f"{i}.jpg", *target, 90, (3, 4))
+            times.append((time.perf_counter() - start) * 1000)
+    # Absolut statt Differenz: der Importspitzenwert wuerde kleine Zuwaechse verdecken
+    return statistics.median(times), peak_rss_mb()
+
+
+def main():
+    args = parse_args()
+    width, height = size(args.resolution)
+    target = size(args.target)
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Weiche Struktur wie bei einem echten Foto, damit JPEG realistisch gross wird
+        rng = np.random.default_rng(0)
+        base = Image.fromarray(rng.integers(0, 255, (height // 50, width // 50, 3), np.uint8))
+        src = Path(tmp) / "dslr.jpg"
+        base.resize((width, height), Image.BICUBIC).save(src, quality=95)
+        print(f"{width}x{height} -> {target[0]}x{target[1]}, {src.stat().st_size / 2**20:.1f} MiB")
+        for name in ("legacy", "draft", "bytes"):
+            with ctx.Pool(1) as pool:
+                median_ms, peak = pool.apply(run, (name, src, target, args.runs))
+            print(f"{name:<7} {median_ms:7.1f} ms/photo  peak RSS {peak:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_simulator_pipeline.py
+"""Drive live view, capture and processing with the simulator load generator.
+
+Run with ``python -m benchmarks.bench_simulator_pipeline``; see ``--help``
+for resolution, frame rate, latency and failure options.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from PySide6 import QtWidgets
+
+from app.core.camera import CameraError, SimulatorCamera
+from app.core.imaging.processor import process_image
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resolution", default="6000x4000")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    parser.add_argument("--captures", type=int, default=5)
+    parser.add_argument("--preview", default="480x640")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def ms(values):
+    if not values:
+        return "-"
+    return f"median {statistics.median(values):7.1f} ms  max {max(values):7.1f} ms"
+
+
+def main():
+    args = parse_args()
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    start = time.perf_counter()
+    cam = SimulatorCamera(
+        resolution=size(args.resolution),
+        fps=args.fps,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    print(f"pool     {len(cam.pool)} frames rendered in {time.perf_counter() - start:.2f} s")
+    cam.set_preview_size(*size(args.preview))
+
+    shown = []
+    latency = []
+    cam.start_liveview()
+    try:
+        deadline = time.monotonic() + args.seconds
+        last_seq = 0
+        while time.monotonic() < deadline:
+            frame = cam.grabber.wait_for_frame(last_seq, timeout=1.0)
+            if frame is None:
+                continue
+            t = time.perf_counter()
+            img = cam.get_preview_qimage()
+            app.processEvents()
+            shown.append((time.perf_counter() - t) * 1000)
+            latency.append((time.monotonic() - frame.timestamp) * 1000)
+            last_seq = frame.seq
+            if img.isNull():
+                break
+        print(
+            f"liveview {len(shown) / args.seconds:5.1f} fps of {args.fps:g} "
+            f"(frames read: {last_seq}, failures now: {cam.grabber.failures})"
+        )
+        print(f"preview  fetch {ms(shown)}")
+        print(f"preview  age   {ms(latency)}")
+
+        capture_ms, process_ms, failed = [], [], 0
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(args.captures):
+                raw = Path(tmp) / f"raw_{i}.jpg"
+                t = time.perf_counter()
+                try:
+                    cam.capture(raw)
+                except CameraError:
+                    failed += 1
+                    continue
+                capture_ms.append((time.perf_counter() - t) * 1000)
+                t = time.perf_counter()
+                process_image(raw, Path(tmp) / f"out_{i}.jpg", 1200, 1600, 90, (3, 4))
+                process_ms.append((time.perf_counter() - t) * 1000)
+        print(f"capture  {ms(capture_ms)}  failed {failed}/{args.captures}")
+        print(f"process  {ms(process_ms)}")
+    finally:
+        cam.stop_liveview()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Tests for the live-view analysis worker."""
+
+import os
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PySide6 import QtGui
+
+from app.core.analysis import AnalysisFrame, AnalysisWorker, frame_from_qimage
+
+
+def make_frame(seq=0):
+    return AnalysisFrame(seq, time.perf_counter(), np.zeros((4, 4, 3), np.uint8), 1, (4, 4))
+
+
+@pytest.mark.parametrize(
+    "fmt", [QtGui.QImage.Format_BGR888, QtGui.QImage.Format_RGB888, QtGui.QImage.Format_RGB32]
+)
+def test_frame_from_qimage_thins_out_to_bgr(qtbot, fmt):
+    img = QtGui.QImage(750, 1000, fmt)
+    img.fill(QtGui.QColor(255, 0, 0))
+    frame = frame_from_qimage(img, seq=3, size=320)
+    assert frame.scale == 4
+    assert frame.bgr.shape == (250, 188, 3)
+    assert tuple(frame.bgr[0, 0]) == (0, 0, 255)
+    assert frame.size == (750, 1000)
+    assert frame.gray.shape == (250, 188)
+
+
+def test_worker_keeps_only_newest_frame_and_reports_results(qtbot):
+    worker = AnalysisWorker()
+    release = threading.Event()
+    seen = []
+
+    def slow(frame):
+        release.wait(2)
+        seen.append(frame.seq)
+        return frame.seq
+
+    results = []
+    worker.result.connect(lambda name, value: results.append((name, value)))
+    worker.add("slow", slow)
+    try:
+        worker.submit(make_frame(1))
+        qtbot.waitUntil(lambda: not worker.wants_frame())
+        for seq in range(2, 6):
+            worker.submit(make_frame(seq))
+        release.set()
+        qtbot.waitUntil(lambda: len(results) == 2)
+        assert seen == [1, 5]
+        assert results == [("slow", 1), ("slow", 5)]
+        assert len(worker.latencies("slow")) == 2
+    finally:
+        worker.stop()
+
+
+def test_worker_throttles_each_analysis(qtbot):
+    worker = AnalysisWorker()
+    calls = {"fast": 0, "slow": 0}
+    worker.add("fast", lambda f: calls.__setitem__("fast", calls["fast"] + 1))
+    worker.add("slow", lambda f: calls.__setitem__("slow", calls["slow"] + 1), hz=2)
+    try:
+        for seq in range(20):
+            worker.submit(make_frame(seq))
+            time.sleep(0.02)
+        qtbot.waitUntil(lambda: worker.wants_frame())
+    finally:
+        worker.stop()
+    assert calls["fast"] > calls["slow"] >= 1
+    assert calls["slow"] <= 2
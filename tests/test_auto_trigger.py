@@ -0,0 +1,67 @@
+"""Tests for the automatic capture trigger."""
+
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from app.core.analysis import AnalysisFrame, AutoTrigger
+
+
+class FakeDetector:
+    def __init__(self, faces):
+        self.faces = faces
+
+    def __call__(self, image):
+        return self.faces
+
+
+CENTRED = [(60, 60, 60, 60, 80)]  # auf einem 180x240-Bild
+
+
+def frame(t, value=100, seq=0):
+    bgr = np.full((240, 180, 3), value, np.uint8)
+    return AnalysisFrame(seq, t, bgr, 1, (180, 240))
+
+
+def run(trigger, values, start=0.0, dt=0.1):
+    return [trigger(frame(start + i * dt, v)) for i, v in enumerate(values)]
+
+
+def test_fires_once_after_hold_time():
+    trigger = AutoTrigger(FakeDetector(CENTRED), hold_s=0.5)
+    results = run(trigger, [100] * 12)
+    assert results.count(True) == 1
+    # Erstes Bild ohne Vergleich, dann 0,5 s stillhalten
+    assert results.index(True) == 6
+    assert len(trigger.latencies) == 1
+
+
+def test_motion_and_face_outside_frame_block_trigger():
+    trigger = AutoTrigger(FakeDetector([(0, 0, 40, 40, 20)]), hold_s=0.2)
+    assert True not in run(trigger, [100] * 10)
+    trigger = AutoTrigger(FakeDetector(CENTRED), hold_s=0.2)
+    # Jedes Bild anders: Bewegung
+    assert True not in run(trigger, [0, 60, 120, 180, 240, 0, 60])
+    assert trigger(frame(10.0, 0)) is None
+
+
+def test_rearms_only_after_motion():
+    trigger = AutoTrigger(FakeDetector(CENTRED), hold_s=0.2)
+    first = run(trigger, [100] * 6)
+    assert first.count(True) == 1
+    assert True not in run(trigger, [100] * 6, start=1.0)
+    # Naechste Person tritt ins Bild
+    later = run(trigger, [200] + [150] * 6, start=2.0)
+    assert later.count(True) == 1
+
+
+def test_decision_is_fast():
+    trigger = AutoTrigger(FakeDetector(CENTRED), hold_s=0.0)
+    trigger(frame(time.perf_counter()))
+    start = time.perf_counter()
+    trigger(frame(time.perf_counter()))
+    trigger(frame(time.perf_counter()))
+    assert (time.perf_counter() - start) < 0.02
@@ -0,0 +1,120 @@
+"""Tests for the single-thread camera actor."""
+
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6 import QtCore, QtGui
+
+from app.core.camera import CameraActor, CameraError, SimulatorCamera
+
+
+class RecordingCamera:
+    """Records which thread performs each call; previews can be held back."""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def _record(self, name):
+        self.calls.append(name)
+        self.threads.add(threading.get_ident())
+
+    def start_liveview(self):
+        self._record("start")
+
+    def stop_liveview(self):
+        self._record("stop")
+
+    def capture(self, dest):
+        self._record("capture")
+
+    def capture_preview(self, dest):
+        self._record("capture_preview")
+
+    def get_preview_qimage(self):
+        self._record("preview")
+        self.release.wait(2)
+        if self.fail:
+            raise CameraError("kaputt")
+        img = QtGui.QImage(4, 4, QtGui.QImage.Format_RGB888)
+        img.fill(QtCore.Qt.red)
+        return img
+
+
+@pytest.fixture
+def actor():
+    cam = RecordingCamera()
+    actor = CameraActor(cam)
+    yield actor
+    cam.release.set()
+    actor.close()
+
+
+def test_calls_run_on_one_worker_thread(actor, tmp_path):
+    actor.start_liveview()
+    actor.capture(tmp_path / "a.jpg")
+    actor.submit_preview().result(2)
+    actor.stop_liveview()
+    cam = actor.camera
+    assert cam.calls == ["start", "capture", "preview", "stop"]
+    assert cam.threads == {actor._thread.ident}
+    assert threading.get_ident() not in cam.threads
+
+
+def test_capture_outranks_coalesced_previews(actor, tmp_path):
+    cam = actor.camera
+    cam.release.clear()
+    running = actor.submit_preview()
+    QtCore.QThread.msleep(50)  # erste Vorschau blockiert den Worker
+    queued = [actor.submit_preview() for _ in range(5)]
+    assert all(f is queued[0] for f in queued)
+    assert queued[0] is not running
+    capture = actor.submit_capture(tmp_path / "a.jpg")
+    cam.release.set()
+    capture.result(2)
+    queued[0].result(2)
+    assert cam.calls == ["preview", "capture", "preview"]
+
+
+def test_preview_is_cached_and_signalled(actor, qtbot):
+    with qtbot.waitSignal(actor.frame_ready, timeout=2000):
+        assert actor.get_preview_qimage().isNull()
+    img = actor.get_preview_qimage()
+    assert img.width() == 4
+
+
+def test_preview_error_is_raised_once(actor, qtbot):
+    actor.camera.fail = True
+    future = actor.submit_preview()
+    with pytest.raises(CameraError):
+        future.result(2)
+    with pytest.raises(CameraError):
+        actor.get_preview_qimage()
+
+
+def test_capture_errors_propagate(actor, tmp_path, monkeypatch):
+    def broken(dest):
+        raise CameraError("belegt")
+
+    monkeypatch.setattr(actor.camera, "capture", broken)
+    with pytest.raises(CameraError):
+        actor.capture(tmp_path / "a.jpg")
+
+
+def test_source_frames_trigger_previews(qtbot):
+    cam = SimulatorCamera(resolution=(64, 48), fps=50)
+    actor = CameraActor(cam)
+    try:
+        with qtbot.waitSignal(actor.frame_ready, timeout=2000):
+            actor.start_liveview()
+        qtbot.waitUntil(lambda: not actor.get_preview_qimage().isNull(), timeout=2000)
+        assert actor.grabber is cam.grabber
+    finally:
+        actor.stop_liveview()
+        actor.close()
@@ -0,0 +1,181 @@
+"""Tests for timeouts, resets and retries of camera operations."""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6 import QtCore, QtGui
+
+from app.core.camera import CameraActor, CameraError, CameraTimeout
+from app.core.camera.watchdog import Watchdog
+
+
+def done(value=None, error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+    return future
+
+
+def test_watchdog_retries_with_backoff_and_records_attempts():
+    results = iter([done(error=CameraError("belegt")), done(error=CameraError("belegt")), done("ok")])
+    dog = Watchdog(timeout_ms=1000, retries=2, backoff_s=0.05)
+    start = time.monotonic()
+    assert dog.call("capture", lambda: next(results)) == "ok"
+    # 0.05 s + 0.1 s Pause zwischen den Versuchen
+    assert time.monotonic() - start >= 0.14
+    assert [a.ok for a in dog.attempts] == [False, False, True]
+    assert len(dog.latencies("capture")) == 3
+
+
+def test_watchdog_gives_up_after_retries():
+    dog = Watchdog(timeout_ms=1000, retries=1, backoff_s=0)
+    with pytest.raises(CameraError, match="belegt"):
+        dog.call("capture", lambda: done(error=CameraError("belegt")))
+    assert len(dog.attempts) == 2
+
+
+class HangingCamera:
+    """Blocks the first capture until :meth:`abort` is called."""
+
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.captures = 0
+        self.busy = False
+        self.resets = []
+        self.hang_preview = False
+
+    def start_liveview(self):
+        pass
+
+    def stop_liveview(self):
+        pass
+
+    def capture(self, dest):
+        self.captures += 1
+        if self.captures == 1:
+            self.busy = True
+            self.unblock.wait(10)
+            time.sleep(0.1)
+            self.busy = False
+            raise CameraError("abgebrochen")
+        dest.write_bytes(b"data")
+
+    def capture_preview(self, dest):
+        pass
+
+    def get_preview_qimage(self):
+        if self.hang_preview:
+            self.unblock.wait(10)
+        return QtGui.QImage(2, 2, QtGui.QImage.Format_RGB888)
+
+    def abort(self):
+        self.unblock.set()
+
+    def reset(self):
+        # Merkt, ob der haengende Aufruf noch lief
+        self.resets.append(self.busy)
+
+
+def test_hung_capture_is_reported_not_retried(tmp_path):
+    cam = HangingCamera()
+    actor = CameraActor(cam, timeout_ms=200, retries=2, backoff_s=0)
+    try:
+        start = time.monotonic()
+        with pytest.raises(CameraTimeout):
+            actor.capture(tmp_path / "a.jpg")
+        assert time.monotonic() - start < 2
+        # Die Kamera wird erst zurueckgesetzt, wenn der Aufruf beendet ist
+        actor.submit(lambda: None).result(2)
+        assert cam.resets == [False]
+        actor.capture(tmp_path / "b.jpg")
+    finally:
+        actor.close()
+    assert cam.captures == 2
+    assert not (tmp_path / "a.jpg").exists()
+    attempts = list(actor.watchdog.attempts)
+    assert [a.ok for a in attempts] == [False, True]
+    assert attempts[0].latency_ms >= 200
+    assert "Zeitueberschreitung" in attempts[0].error
+
+
+def test_preview_is_retried(tmp_path):
+    calls = []
+
+    class FlakyCamera(HangingCamera):
+        def capture_preview(self, dest):
+            calls.append(dest)
+            if len(calls) == 1:
+                raise CameraError("belegt")
+
+    actor = CameraActor(FlakyCamera(), timeout_ms=200, retries=1, backoff_s=0)
+    try:
+        actor.capture_preview(tmp_path / "p.jpg")
+    finally:
+        actor.close()
+    assert len(calls) == 2
+
+
+def test_capture_timeout_without_abort_gives_the_call_up(tmp_path):
+    cam = HangingCamera()
+    cam.abort = lambda: None  # Geraet laesst sich nicht befreien
+    actor = CameraActor(cam, timeout_ms=100)
+    try:
+        with pytest.raises(CameraTimeout):
+            actor.capture(tmp_path / "a.jpg")
+        # Nach einer weiteren Wartezeit wird der Aufruf aufgegeben
+        actor.submit(lambda: None).result(2)
+        assert cam.resets == [True]
+    finally:
+        cam.unblock.set()
+        actor.close()
+
+
+def test_hung_preview_reports_timeout(qtbot):
+    cam = HangingCamera()
+    cam.hang_preview = True
+    actor = CameraActor(cam, timeout_ms=100)
+    try:
+        assert actor.get_preview_qimage().isNull()
+        time.sleep(0.2)
+        with pytest.raises(CameraTimeout):
+            actor.get_preview_qimage()
+        qtbot.waitUntil(lambda: len(cam.resets) == 1, timeout=2000)
+    finally:
+        actor.close()
+
+
+class FrameSignals(QtCore.QObject):
+    frame_ready = QtCore.Signal(int)
+
+
+def test_live_view_without_new_frames_is_reset(qtbot):
+    cam = HangingCamera()
+    signals = FrameSignals()
+    cam.frame_ready = signals.frame_ready
+    actor = CameraActor(cam, timeout_ms=100)
+    try:
+        actor.start_liveview()
+        signals.frame_ready.emit(1)
+        qtbot.waitUntil(lambda: not actor.get_preview_qimage().isNull(), timeout=2000)
+        # Angehalten liefert die Kamera absichtlich keine Bilder
+        actor.pause_liveview()
+        time.sleep(0.2)
+        actor.get_preview_qimage()
+        actor.resume_liveview()
+        time.sleep(0.2)
+        with pytest.raises(CameraTimeout, match="LiveView"):
+            actor.get_preview_qimage()
+        qtbot.waitUntil(lambda: len(cam.resets) == 1, timeout=2000)
+        assert cam.unblock.is_set()
+        # Der Neustart bekommt wieder die volle Frist
+        actor.get_preview_qimage()
+    finally:
+        actor.close()
+    assert cam.resets == [False]
@@ -0,0 +1,51 @@
+"""Tests for the student-card scan."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+from app.core.analysis import AnalysisFrame, CodeScanner
+from app.core.controller import MainController
+from app.core.camera import CameraManager
+from tests.test_excel_reader import create_sample
+from tests.test_stations import make_settings
+
+
+def card_frame(text, t=0.0):
+    qr = cv2.QRCodeEncoder.create().encode(text)
+    qr = cv2.resize(qr, (qr.shape[1] * 3, qr.shape[0] * 3), interpolation=cv2.INTER_NEAREST)
+    bgr = np.full((320, 240, 3), 200, np.uint8)
+    h, w = qr.shape
+    bgr[100:100 + h, 60:60 + w] = qr[..., None]
+    return AnalysisFrame(0, t, bgr, 1, (240, 320))
+
+
+def test_scanner_reports_each_card_once():
+    scanner = CodeScanner(repeat_s=1.0)
+    assert scanner(card_frame("002", 0.0)) == "002"
+    # Karte bleibt im Bild: kein erneuter Sprung
+    assert scanner(card_frame("002", 0.5)) is None
+    assert scanner(card_frame("002", 1.2)) is None
+    assert scanner(card_frame("001", 1.4)) == "001"
+    assert scanner(card_frame("002", 1.6)) == "002"
+    empty = AnalysisFrame(0, 5.0, np.full((320, 240, 3), 200, np.uint8), 1, (240, 320))
+    assert scanner(empty) is None
+    assert scanner(card_frame("002", 10.0)) == "002"
+
+
+def test_controller_finds_learner_by_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: None)
+    xl = tmp_path / "klassen.xlsx"
+    create_sample(xl)
+    controller = MainController(make_settings(tmp_path))
+    controller.load_excel(xl)
+    controller.learners_for_class("Standort1", "INF")
+    learner = controller.find_learner("Standort1", " 002\n")
+    assert (learner.vorname, learner.klasse) == ("Eva", "INF")
+    assert controller.queue_index(learner) == 1
+    assert controller.find_learner("Standort1", "999") is None
+    assert controller.find_learner("Fehlt", "002") is None
+    controller.shutdown()
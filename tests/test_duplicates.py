@@ -0,0 +1,122 @@
+"""Tests for the duplicate-face check."""
+
+import io
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app.core.camera import CameraManager
+from app.core.controller import MainController
+from app.core.excel.reader import Learner
+from app.core.imaging.duplicates import PhotoHashIndex, dhash, popcount, process_and_hash
+from tests.test_stations import make_settings
+
+
+def face(shift=0, seed=0):
+    rng = np.random.default_rng(seed)
+    img = Image.fromarray(rng.integers(0, 255, (16, 12, 3), np.uint8)).resize((600, 800))
+    ImageDraw.Draw(img).ellipse((150 + shift, 150, 450 + shift, 550), fill=(220, 180, 150))
+    return img
+
+
+def distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def test_dhash_survives_recompression_but_not_another_face():
+    original = face()
+    buf = io.BytesIO()
+    original.resize((300, 400)).save(buf, "JPEG", quality=60)
+    buf.seek(0)
+    with Image.open(buf) as recompressed:
+        assert distance(dhash(original), dhash(recompressed)) <= 4
+    assert distance(dhash(original), dhash(face(seed=1))) > 10
+
+
+def test_index_replaces_retakes_and_skips_own_photo():
+    index = PhotoHashIndex()
+    index.add("a", "Anna", 0b1111)
+    index.add("b", "Ben", 0b0111)
+    index.add("c", "Cleo", 0xFFFF0000)
+    assert index.near(0b1111, 2) == [("Anna", 0), ("Ben", 1)]
+    assert index.near_key("a", 2) == [("Ben", 1)]
+    index.add("b", "Ben", 0xFFFF0001)
+    assert index.near_key("a", 2) == []
+    assert len(index) == 3
+    assert index.near_key("fehlt", 2) == []
+
+
+def test_removed_photo_is_no_longer_found():
+    index = PhotoHashIndex()
+    index.add("a", "Anna", 0b1111)
+    index.add("b", "Ben", 0b0111)
+    index.add("c", "Cleo", 0b0011)
+    index.remove("a")
+    index.remove("fehlt")
+    assert len(index) == 2
+    assert index.near(0b1111, 2) == [("Ben", 1), ("Cleo", 2)]
+    assert index.near_key("c", 1) == [("Ben", 1)]
+    index.add("a", "Anna", 0b1111)
+    assert index.near_key("a", 1) == [("Ben", 1)]
+
+
+def test_popcount_without_bitwise_count(monkeypatch):
+    values = np.random.default_rng(0).integers(0, 2**63, 100, dtype=np.int64).astype(np.uint64)
+    values[0] = np.uint64(2**64 - 1)
+    expected = [bin(int(v)).count("1") for v in values]
+    assert popcount(values).tolist() == expected
+    # NumPy vor 2.0
+    monkeypatch.delattr(np, "bitwise_count")
+    assert popcount(values).tolist() == expected
+
+
+def test_lookup_stays_fast_with_many_photos():
+    index = PhotoHashIndex()
+    values = np.random.default_rng(0).integers(0, 2**63, 12000, dtype=np.int64)
+    for i, value in enumerate(values):
+        index.add(i, str(i), int(value))
+    assert len(index) == 12000
+    start = time.perf_counter()
+    found = index.near(int(values[9000]), 3)
+    assert (time.perf_counter() - start) < 0.01
+    assert ("9000", 0) in found
+
+
+def test_processing_job_returns_the_hash_of_the_written_photo(tmp_path):
+    def save(src, dest):
+        src.save(dest)
+
+    dest = tmp_path / "a.png"
+    assert process_and_hash(face(), save, dest) == dhash(face())
+    assert process_and_hash(face(), lambda src, dest: None, tmp_path / "fehlt.png") is None
+
+
+def test_controller_reports_same_face_under_two_learners(tmp_path, monkeypatch):
+    class FaceCamera:
+        def start_liveview(self):
+            pass
+
+        def stop_liveview(self):
+            pass
+
+        def capture(self, path):
+            face().save(path)
+
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: FaceCamera())
+    controller = MainController(make_settings(tmp_path))
+    anna = Learner("1a", "Muster", "Anna", "1")
+    ben = Learner("1a", "Meier", "Ben", "2")
+    try:
+        controller.capture(anna, "Loc")
+        assert controller.duplicates_of(anna, "Loc") == []
+        controller.capture(ben, "Loc")
+        assert [label for label, _ in controller.duplicates_of(ben, "Loc")] == ["Anna Muster (1a)"]
+        assert controller.duplicates_of(ben, "Anderer Ort") == []
+        controller.forget_photo(anna, "Loc")
+        assert controller.duplicates_of(ben, "Loc") == []
+    finally:
+        controller.shutdown()
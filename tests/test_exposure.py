@@ -0,0 +1,22 @@
+"""Tests for the live exposure histogram."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from app.core.analysis import AnalysisFrame, measure_exposure
+from app.core.analysis.exposure import HIST_BINS
+
+
+def test_histogram_and_clipping():
+    bgr = np.full((100, 100, 3), 128, np.uint8)
+    bgr[:10] = 255
+    bgr[10:12] = 0
+    exposure = measure_exposure(AnalysisFrame(0, 0.0, bgr, 1, (100, 100)))
+    assert exposure.histogram.shape == (HIST_BINS,)
+    assert exposure.histogram.max() == 1.0
+    assert exposure.histogram[128 * HIST_BINS // 256] == 1.0
+    assert exposure.highlights == 10.0
+    assert exposure.shadows == 2.0
@@ -0,0 +1,62 @@
+"""Tests for the face-aware crop stage."""
+
+from PIL import Image, ImageDraw
+
+from app.core.imaging import face_crop
+from app.core.imaging.face_crop import FaceRules, crop_face, face_box
+from app.core.imaging.processor import process_image
+
+
+class FakeDetector:
+    """Reports one face at fixed coordinates of the downscaled copy."""
+
+    def __init__(self, faces):
+        self.faces = faces
+        self.shapes = []
+
+    def __call__(self, image):
+        self.shapes.append(image.shape)
+        return self.faces
+
+
+def test_face_box_places_eyes_and_head_by_rules():
+    rules = FaceRules(head_ratio=0.5, eye_line=0.4)
+    # Gesicht 200 px hoch, Augen bei y=1000, Mitte bei x=1200
+    left, top, right, bottom = face_box((3000, 2000), (1100, 900, 200, 200, 1000), (3, 4), rules)
+    assert (right - left, bottom - top) == (300, 400)
+    assert (left + right) / 2 == 1200
+    assert 1000 - top == 160
+
+
+def test_face_box_stays_inside_the_image():
+    rules = FaceRules(head_ratio=0.2, eye_line=0.4)
+    box = face_box((600, 800), (0, 0, 200, 200, 80), (3, 4), rules)
+    assert box == (0, 0, 600, 800)
+
+
+def test_crop_follows_off_centre_face_on_downscaled_copy():
+    img = Image.new("RGB", (3200, 2400))
+    # Markierung an der erwarteten linken oberen Ecke des Ausschnitts
+    ImageDraw.Draw(img).rectangle((300, 240, 309, 249), fill=(255, 0, 0))
+    # Auf der 320 px breiten Kopie liegt das Gesicht links oben
+    detector = FakeDetector([(40, 40, 40, 40, 56), (0, 0, 5, 5, 2)])
+    cropped = crop_face(img, (3, 4), FaceRules(0.5, 0.4), detector)
+    assert max(detector.shapes[0][:2]) <= face_crop.DETECT_SIZE
+    assert cropped.size == (600, 800)
+    assert cropped.getpixel((5, 5)) == (255, 0, 0)
+    assert cropped.getpixel((15, 15)) == (0, 0, 0)
+
+
+def test_without_face_or_detector_the_centre_is_used(tmp_path, monkeypatch):
+    assert crop_face(Image.new("RGB", (400, 300)), (3, 4), FaceRules(), FakeDetector([])) is None
+    monkeypatch.setattr(face_crop, "load_detector", lambda model=None: None)
+    src = tmp_path / "src.jpg"
+    Image.new("RGB", (400, 300), (255, 0, 0)).save(src)
+    process_image(src, tmp_path / "out.jpg", 150, 200, 80, (3, 4), face=FaceRules())
+    with Image.open(tmp_path / "out.jpg") as im:
+        assert im.size == (150, 200)
+
+
+def test_detector_is_loaded_once_per_process():
+    face_crop.load_detector.cache_clear()
+    assert face_crop.load_detector(None) is face_crop.load_detector(None)
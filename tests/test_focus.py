@@ -0,0 +1,22 @@
+"""Tests for focus peaking and the live sharpness score."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+from app.core.analysis import AnalysisFrame, measure_focus
+
+
+def test_sharp_edges_are_marked_and_score_higher():
+    bgr = np.zeros((240, 180, 3), np.uint8)
+    bgr[:, ::8] = 255
+    sharp = measure_focus(AnalysisFrame(0, 0.0, bgr, 1, (180, 240)))
+    blurred = measure_focus(AnalysisFrame(0, 0.0, cv2.GaussianBlur(bgr, (9, 9), 3), 1, (180, 240)))
+    assert sharp.mask.shape == (240, 180)
+    assert sharp.mask[:, 0].all()
+    assert not sharp.mask[:, 4].any()
+    assert not blurred.mask.any()
+    assert sharp.score > 10 * blurred.score
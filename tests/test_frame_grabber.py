@@ -0,0 +1,121 @@
+"""Tests for the background frame grabber."""
+
+import threading
+
+from app.core.camera.frame_grabber import BufferPool, FrameGrabber
+
+
+def counting_reader(limit=None):
+    state = {'n': 0}
+
+    def read():
+        if limit is not None and state['n'] >= limit:
+            threading.Event().wait(0.01)
+            return False, None
+        state['n'] += 1
+        threading.Event().wait(0.001)
+        return True, state['n']
+
+    return read, state
+
+
+def test_ring_buffer_keeps_latest_frames():
+    read, _ = counting_reader(limit=10)
+    grabber = FrameGrabber(read, size=3)
+    grabber.start()
+    try:
+        frame = grabber.wait_for_frame(after_seq=9, timeout=2)
+        assert frame is not None and frame.image == 10
+        frames = grabber.frames()
+        assert [f.image for f in frames] == [8, 9, 10]
+        assert grabber.latest().seq == 10
+    finally:
+        grabber.stop()
+    assert grabber.latest() is None
+
+
+def test_frame_ready_signal(qtbot):
+    read, _ = counting_reader()
+    grabber = FrameGrabber(read)
+    with qtbot.waitSignal(grabber.frame_ready, timeout=2000) as blocker:
+        grabber.start()
+    grabber.stop()
+    assert blocker.args[0] >= 1
+
+
+def test_exclusive_pauses_reading():
+    read, state = counting_reader()
+    grabber = FrameGrabber(read)
+    grabber.start()
+    try:
+        grabber.wait_for_frame(timeout=2)
+        with grabber.exclusive():
+            before = state['n']
+            threading.Event().wait(0.05)
+            assert state['n'] == before
+    finally:
+        grabber.stop()
+
+
+def test_failing_reader_counts_failures():
+    grabber = FrameGrabber(lambda: (False, None))
+    grabber.start()
+    try:
+        assert grabber.wait_for_frame(timeout=0.2) is None
+        assert grabber.failures > 0
+    finally:
+        grabber.stop()
+
+
+def test_burst_starts_with_buffered_frames():
+    read, _ = counting_reader(limit=8)
+    grabber = FrameGrabber(read, size=3)
+    grabber.start()
+    try:
+        assert grabber.wait_for_frame(after_seq=4, timeout=2) is not None
+        frames = grabber.burst(4, timeout=2)
+        images = [f.image for f in frames]
+        assert len(images) == 4
+        assert images == list(range(images[0], images[0] + 4))
+        # Mehr Bilder als das Geraet noch liefert: nach dem Timeout abbrechen
+        assert len(grabber.burst(20, timeout=0.1)) < 20
+    finally:
+        grabber.stop()
+
+
+def test_pause_stops_reading_until_resumed():
+    read, state = counting_reader()
+    skips = []
+    grabber = FrameGrabber(read, skip=lambda: skips.append(1) or True)
+    grabber.start()
+    try:
+        assert grabber.wait_for_frame(timeout=2) is not None
+        grabber.pause()
+        threading.Event().wait(0.05)
+        reads = state['n']
+        threading.Event().wait(0.05)
+        assert state['n'] == reads
+        assert skips and grabber.latest() is not None
+        grabber.resume()
+        assert grabber.wait_for_frame(after_seq=grabber.latest().seq, timeout=2) is not None
+    finally:
+        grabber.stop()
+
+
+def test_leased_buffer_is_not_handed_out_until_released():
+    class Owner:
+        pass
+
+    pool = BufferPool(2)
+    a = pool.next((2, 2))
+    owner = Owner()
+    pool.lease(a, owner)
+    handed = [pool.next((2, 2)) for _ in range(4)]
+    assert all(buf is not a for buf in handed)
+    # Alle verliehen: der Pool waechst, statt zu warten
+    pool.lease(handed[-1], owner)
+    assert len({id(pool.next((2, 2))) for _ in range(3)} - {id(a), id(handed[-1])}) == 1
+    assert len(pool.buffers()) == 3
+    del owner
+    assert pool.leased() == 0
+    assert any(pool.next((2, 2)) is a for _ in range(3))
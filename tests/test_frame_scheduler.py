@@ -0,0 +1,108 @@
+"""Tests for the adaptive live-view scheduler."""
+
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtGui
+
+from app.ui.widgets.frame_scheduler import FrameScheduler, MIN_INTERVAL_MS
+from app.ui.widgets.live_view_widget import LiveViewWidget
+
+
+def test_pause_reasons_stop_the_timer(qtbot):
+    scheduler = FrameScheduler(lambda: False, fps=20)
+    scheduler.start()
+    assert scheduler.is_active()
+    scheduler.pause("review")
+    scheduler.pause("busy")
+    assert not scheduler.is_active()
+    scheduler.resume("review")
+    assert not scheduler.is_active()
+    scheduler.resume("busy")
+    assert scheduler.is_active()
+    scheduler.stop()
+    assert not scheduler.is_active()
+
+
+def test_pause_state_changes_are_signalled_once(qtbot):
+    scheduler = FrameScheduler(lambda: False, fps=20)
+    changes = []
+    scheduler.paused_changed.connect(changes.append)
+    scheduler.pause("review")
+    scheduler.pause("busy")
+    scheduler.resume("review")
+    scheduler.resume("hidden")
+    assert changes == [True]
+    scheduler.resume("busy")
+    assert changes == [True, False]
+
+
+def test_slow_frames_lower_the_rate_and_recover(qtbot):
+    scheduler = FrameScheduler(lambda: True, fps=20)
+    target = scheduler.target_ms
+    for _ in range(20):
+        scheduler.record(target * 2)
+    slowed = scheduler.interval_ms
+    assert slowed > target
+    for _ in range(100):
+        scheduler.record(1)
+    assert scheduler.interval_ms == target
+
+
+def test_fps_is_bounded():
+    scheduler = FrameScheduler(lambda: False, fps=1000)
+    assert scheduler.interval_ms == MIN_INTERVAL_MS
+
+
+class CountingCamera:
+    def __init__(self):
+        self.calls = 0
+        self.image = QtGui.QImage(30, 40, QtGui.QImage.Format_RGB888)
+        self.image.fill(0)
+
+    def get_preview_qimage(self):
+        self.calls += 1
+        return self.image
+
+
+def test_widget_skips_unchanged_frames_and_pauses_when_hidden(qtbot):
+    cam = CountingCamera()
+    widget = LiveViewWidget(cam)
+    qtbot.addWidget(widget)
+    assert not widget.scheduler.is_active()
+    widget.show()
+    qtbot.waitExposed(widget)
+    assert widget.scheduler.is_active()
+    assert widget.update_frame() is True
+    assert widget.update_frame() is False
+    widget.hide()
+    assert not widget.scheduler.is_active()
+    calls = cam.calls
+    time.sleep(0.1)
+    qtbot.wait(50)
+    assert cam.calls == calls
+
+
+def test_hidden_widget_pauses_the_camera(qtbot):
+    class PausingCamera(CountingCamera):
+        paused = None
+
+        def pause_liveview(self):
+            self.paused = True
+
+        def resume_liveview(self):
+            self.paused = False
+
+    cam = PausingCamera()
+    widget = LiveViewWidget(cam)
+    qtbot.addWidget(widget)
+    assert cam.paused is True
+    widget.show()
+    qtbot.waitExposed(widget)
+    assert cam.paused is False
+    widget.pause("busy")
+    assert cam.paused is True
+    widget.resume("busy")
+    assert cam.paused is False
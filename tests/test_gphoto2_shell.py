@@ -0,0 +1,176 @@
+"""Tests for the persistent gphoto2 shell session using a fake shell."""
+
+import io
+import os
+import sys
+import textwrap
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PIL import Image
+
+from app.core.camera import CameraError, CameraTimeout, GPhoto2Camera
+from app.core.camera.gphoto2_shell import GPhoto2Shell, SessionError
+
+from tests.test_gphoto2_stream import fake_stream_script, jpeg_bytes
+
+
+def fake_shell(tmp_path, crash_after=None):
+    """Write a stand-in for ``gphoto2 --shell`` and return its command."""
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 24), (0, 0, 255)).save(buf, "JPEG")
+    (tmp_path / "frame.jpg").write_bytes(buf.getvalue())
+    starts = tmp_path / "starts.txt"
+    script = tmp_path / "fake_shell.py"
+    script.write_text(textwrap.dedent(f"""
+        import os, sys, time
+        with open({str(starts)!r}, 'a') as fh:
+            fh.write('x')
+        frame = open({str(tmp_path / 'frame.jpg')!r}, 'rb').read()
+        count = 0
+        for line in sys.stdin:
+            cmd = line.strip()
+            if cmd.startswith('lcd '):
+                os.chdir(cmd[4:])
+                print(f"Local directory now '{{cmd[4:]}}'.", flush=True)
+            elif cmd == 'capture-image-and-download':
+                count += 1
+                if {crash_after!r} is not None and count > {crash_after!r}:
+                    sys.exit(1)
+                name = f'capt{{count:04d}}.jpg'
+                open(name, 'wb').write(frame)
+                print('New file is in location /capt0000.JPG on the camera')
+                print(f'Saving file as {{name}}', flush=True)
+            elif cmd == 'capture-preview':
+                open('capture_preview.jpg', 'wb').write(frame)
+                print('Saving file as capture_preview.jpg', flush=True)
+            elif cmd == 'hang-once':
+                marker = {str(tmp_path / 'hung')!r}
+                if not os.path.exists(marker):
+                    open(marker, 'w').close()
+                    time.sleep(60)
+            elif cmd == 'broken':
+                print('*** Error (-7: I/O problem) ***', flush=True)
+            elif cmd == 'exit':
+                break
+    """))
+    return [sys.executable, "-u", str(script)], starts
+
+
+def test_shell_captures_reuse_one_session(tmp_path):
+    cmd, starts = fake_shell(tmp_path)
+    shell = GPhoto2Shell(cmd, timeout=5)
+    try:
+        for i in range(3):
+            dest = tmp_path / f"shot{i}.jpg"
+            shell.capture(dest)
+            assert dest.read_bytes()[:2] == b"\xff\xd8"
+        assert shell.capture_preview()[:2] == b"\xff\xd8"
+        workdir = shell.workdir
+        assert list(workdir.iterdir()) == []
+    finally:
+        shell.close()
+    assert starts.read_text() == "x"
+    assert not workdir.exists()
+
+
+def test_shell_reports_camera_errors(tmp_path):
+    cmd, _ = fake_shell(tmp_path)
+    shell = GPhoto2Shell(cmd, timeout=5)
+    try:
+        with pytest.raises(CameraError, match="I/O problem"):
+            shell.run("broken")
+    finally:
+        shell.close()
+
+
+def test_crashed_capture_is_not_resent(tmp_path):
+    cmd, starts = fake_shell(tmp_path, crash_after=1)
+    shell = GPhoto2Shell(cmd, timeout=5)
+    try:
+        shell.capture(tmp_path / "a.jpg")
+        with pytest.raises(SessionError):
+            shell.capture(tmp_path / "b.jpg")
+        # Der naechste Befehl startet eine neue Sitzung
+        assert shell.capture_preview()[:2] == b"\xff\xd8"
+    finally:
+        shell.close()
+    assert not (tmp_path / "b.jpg").exists()
+    assert shell.restarts == 0
+    assert starts.read_text() == "xx"
+
+
+def test_camera_keeps_one_shell_for_live_view_and_captures(tmp_path, qtbot):
+    cmd, starts = fake_shell(tmp_path)
+    frames = [jpeg_bytes((32, 24), (255, 0, 0))]
+    cam = GPhoto2Camera(liveview_cmd=fake_stream_script(tmp_path, frames), shell_cmd=cmd, timeout=5)
+    cam.start_liveview()
+    try:
+        qtbot.waitUntil(lambda: not cam.get_preview_qimage().isNull(), timeout=5000)
+        # Blau kommt aus der Shell, der rote Stream laeuft nicht
+        assert cam.get_preview_qimage().pixelColor(0, 0).blue() > 200
+        # Wie MainWindow: LiveView um jede Aufnahme herum anhalten
+        for i in range(2):
+            cam.pause_liveview()
+            cam.capture(tmp_path / f"shot{i}.jpg")
+            seq = cam.grabber.latest().seq
+            cam.resume_liveview()
+            qtbot.waitUntil(lambda: cam.grabber.latest().seq > seq, timeout=5000)
+        # Auch bei laufendem LiveView zwischen zwei Vorschaubildern
+        assert cam.capture_frame()[:2] == b"\xff\xd8"
+        assert not cam.stream.is_running()
+    finally:
+        cam.stop_liveview()
+    assert (tmp_path / "shot1.jpg").exists()
+    assert starts.read_text() == "x"
+
+
+def test_camera_does_not_repeat_a_failed_capture(tmp_path):
+    cmd, starts = fake_shell(tmp_path, crash_after=0)
+    cam = GPhoto2Camera(shell_cmd=cmd, timeout=5)
+    with pytest.raises(SessionError):
+        cam.capture_frame()
+    assert cam.shell is not None
+    assert starts.read_text() == "x"
+
+
+def test_camera_falls_back_without_shell(tmp_path):
+    cam = GPhoto2Camera(
+        liveview_cmd=[sys.executable, "-c", "import time; time.sleep(5)"],
+        shell_cmd=[str(tmp_path / "missing-gphoto2")],
+    )
+    cam.start_liveview()
+    try:
+        assert cam.stream.is_running()
+        assert cam._shell() is None
+        assert cam.shell is None
+    finally:
+        cam.stop_liveview()
+
+
+def test_kill_unblocks_hung_command(tmp_path):
+    cmd, starts = fake_shell(tmp_path)
+    shell = GPhoto2Shell(cmd, timeout=30)
+    shell.start()
+    timer = threading.Timer(0.3, shell.kill)
+    timer.start()
+    try:
+        start = time.monotonic()
+        shell.run("hang-once")
+        assert time.monotonic() - start < 5
+    finally:
+        timer.cancel()
+        shell.close()
+    assert starts.read_text() == "xx"
+    assert shell.restarts == 1
+
+
+def test_one_shot_call_times_out(tmp_path):
+    cam = GPhoto2Camera(use_shell=False, timeout=0.2)
+    start = time.monotonic()
+    with pytest.raises(CameraTimeout):
+        cam._run([sys.executable, "-c", "import time; time.sleep(10)"])
+    assert time.monotonic() - start < 5
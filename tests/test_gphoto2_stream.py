@@ -0,0 +1,70 @@
+"""Tests for the streaming gphoto2 live view against a fake MJPEG source."""
+
+import io
+import os
+import sys
+import textwrap
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PIL import Image
+
+from app.core.camera import GPhoto2Camera
+from app.core.camera.mjpeg_stream import split_jpeg_frames
+
+
+def jpeg_bytes(size, color):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def fake_stream_script(tmp_path, frames, delay=0.005):
+    blob = tmp_path / "stream.mjpeg"
+    blob.write_bytes(b"".join(frames))
+    script = tmp_path / "fake_gphoto2.py"
+    script.write_text(textwrap.dedent(f"""
+        import sys, time
+        data = open({str(blob)!r}, 'rb').read()
+        out = sys.stdout.buffer
+        while True:
+            out.write(b'garbage')
+            out.write(data)
+            out.flush()
+            time.sleep({delay})
+    """))
+    return [sys.executable, str(script)]
+
+
+def test_split_jpeg_frames_keeps_incomplete_tail():
+    a = jpeg_bytes((8, 8), (255, 0, 0))
+    b = jpeg_bytes((8, 8), (0, 255, 0))
+    buf = bytearray(b"noise" + a + b[:10])
+    frames = split_jpeg_frames(buf)
+    assert frames == [a]
+    buf += b[10:]
+    assert split_jpeg_frames(buf) == [b]
+    assert buf == bytearray()
+
+
+def test_liveview_decodes_newest_frame(tmp_path, qtbot):
+    frames = [jpeg_bytes((64, 48), (i * 40, 0, 0)) for i in range(5)]
+    cam = GPhoto2Camera(
+        liveview_cmd=fake_stream_script(tmp_path, frames), use_shell=False
+    )
+    cam.start_liveview()
+    try:
+        qtbot.waitUntil(lambda: cam.stream.latest() is not None, timeout=5000)
+        img = cam.get_preview_qimage()
+        assert (img.width(), img.height()) == (64, 48)
+        cam.set_preview_size(32, 32)
+        seq = cam.stream.latest().seq
+        qtbot.waitUntil(lambda: cam.stream.latest().seq > seq + 1, timeout=5000)
+        img = cam.get_preview_qimage()
+        assert (img.width(), img.height()) == (32, 24)
+        dest = tmp_path / "preview.jpg"
+        cam.capture_preview(dest)
+        assert dest.read_bytes()[:2] == b"\xff\xd8"
+    finally:
+        cam.stop_liveview()
+    assert not cam.stream.is_running()
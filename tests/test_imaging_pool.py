@@ -0,0 +1,169 @@
+"""Tests for the imaging process pool."""
+
+import io
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from PIL import Image
+
+import app.core.controller as controller_module
+from app.core.camera import CameraManager
+from app.core.controller import MainController
+from app.core.excel.reader import Learner
+from app.core.imaging.pool import ImagingPool
+from app.core.imaging.processor import process_image
+from tests.test_stations import make_settings
+
+
+def die(src):
+    # Wie ein vom Speicher-Killer beendeter Arbeitsprozess
+    os._exit(1)
+
+
+def shape_of(src):
+    return src.shape
+
+
+def shared_blocks(monkeypatch):
+    created = []
+    original = shared_memory.SharedMemory.__init__
+
+    def init(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        if kwargs.get("create"):
+            created.append(self.name)
+
+    monkeypatch.setattr(shared_memory.SharedMemory, "__init__", init)
+    return created
+
+
+def test_worker_processes_get_frames_through_shared_memory(tmp_path, monkeypatch):
+    created = shared_blocks(monkeypatch)
+    bgr = np.zeros((400, 300, 3), np.uint8)
+    bgr[..., 2] = 255
+    buf = io.BytesIO()
+    Image.new("RGB", (300, 400), (0, 255, 0)).save(buf, "JPEG")
+    pool = ImagingPool(workers=1, max_pending=2)
+    try:
+        futures = [
+            pool.submit(process_image, bgr, tmp_path / "array.jpg", 30, 40, 90, (3, 4)),
+            pool.submit(process_image, buf.getvalue(), tmp_path / "bytes.jpg", 30, 40, 90, (3, 4)),
+        ]
+        for future in futures:
+            assert future.result(30) is None
+    finally:
+        pool.shutdown()
+    with Image.open(tmp_path / "array.jpg") as im:
+        assert im.size == (30, 40)
+        assert im.getpixel((15, 20))[0] > 200
+    with Image.open(tmp_path / "bytes.jpg") as im:
+        assert im.getpixel((15, 20))[1] > 200
+    assert len(created) == 2
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_queue_is_bounded(tmp_path):
+    release = threading.Event()
+    pool = ImagingPool(workers=0, max_pending=1)
+    first = pool.submit(lambda src: release.wait(5), None)
+    second_submitted = threading.Event()
+
+    def submit_second():
+        pool.submit(lambda src: None, None).result(5)
+        second_submitted.set()
+
+    thread = threading.Thread(target=submit_second)
+    thread.start()
+    assert not second_submitted.wait(0.2)
+    release.set()
+    assert first.result(5)
+    thread.join(5)
+    assert second_submitted.is_set()
+    pool.shutdown()
+
+
+def test_capture_returns_before_processing(tmp_path, monkeypatch):
+    class ArrayCamera:
+        def start_liveview(self):
+            pass
+
+        def stop_liveview(self):
+            pass
+
+        def capture(self, path):
+            raise AssertionError("capture_frame erwartet")
+
+        def capture_frame(self):
+            return np.zeros((80, 60, 3), np.uint8)
+
+    release = threading.Event()
+
+    def slow_process(src, dest, *args, **kwargs):
+        release.wait(5)
+        Image.fromarray(src).save(dest)
+
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: ArrayCamera())
+    monkeypatch.setattr(controller_module, "process_image", slow_process)
+    bild = {"breite": 60, "hoehe": 80, "qualitaet": 90, "verarbeitungsProzesse": 0}
+    controller = MainController(make_settings(tmp_path, bild=bild))
+    try:
+        future = controller.capture_async(Learner("1a", "Doe", "John", "7"), "Loc")
+        assert not future.done()
+        release.set()
+        path = future.result(5)
+        assert path.exists()
+    finally:
+        controller.shutdown()
+
+
+def test_pool_recovers_after_a_worker_died():
+    pool = ImagingPool(workers=1, max_pending=2)
+    frame = np.zeros((4, 3, 3), np.uint8)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(die, frame).result(30)
+        assert pool.submit(shape_of, frame).result(30) == (4, 3, 3)
+    finally:
+        pool.shutdown()
+
+
+def test_failed_processing_keeps_the_raw_frame(tmp_path, monkeypatch):
+    class ArrayCamera:
+        def start_liveview(self):
+            pass
+
+        def stop_liveview(self):
+            pass
+
+        def capture(self, path):
+            raise AssertionError("capture_frame erwartet")
+
+        def capture_frame(self):
+            return np.full((80, 60, 3), 200, np.uint8)
+
+    def failing_process(src, dest, *args, **kwargs):
+        raise MemoryError("zu gross")
+
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: ArrayCamera())
+    monkeypatch.setattr(controller_module, "process_image", failing_process)
+    bild = {"breite": 60, "hoehe": 80, "qualitaet": 90, "verarbeitungsProzesse": 0}
+    controller = MainController(make_settings(tmp_path, bild=bild))
+    try:
+        future = controller.capture_async(Learner("1a", "Doe", "John", "7"), "Loc")
+        with pytest.raises(RuntimeError, match="unbearbeitet") as info:
+            future.result(5)
+    finally:
+        controller.shutdown()
+    assert isinstance(info.value.__cause__, MemoryError)
+    raw = list(tmp_path.rglob("unbearbeitet/7.jpg"))
+    assert len(raw) == 1
+    with Image.open(raw[0]) as im:
+        assert im.size == (60, 80)
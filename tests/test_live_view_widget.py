@@ -0,0 +1,221 @@
+"""Tests for the live view widget."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PySide6 import QtCore, QtGui
+
+from app.core.camera import SimulatorCamera
+from app.ui.widgets import live_view_widget
+from app.ui.widgets.live_view_widget import LiveViewWidget
+
+
+class SizedCamera:
+    """Camera stub that renders frames in the negotiated preview size."""
+
+    def __init__(self):
+        self.preview_size = None
+        self.requests = []
+
+    def set_preview_size(self, width, height):
+        self.preview_size = (width, height)
+        self.requests.append((width, height))
+
+    def get_preview_qimage(self):
+        w, h = self.preview_size or (300, 400)
+        img = QtGui.QImage(w, h, QtGui.QImage.Format_RGB888)
+        img.fill(QtGui.QColor("red"))
+        return img
+
+
+def test_widget_negotiates_preview_size(qtbot):
+    cam = SizedCamera()
+    widget = LiveViewWidget(cam, fps=20)
+    qtbot.addWidget(widget)
+    widget.resize(300, 500)
+    widget.show()
+    qtbot.waitUntil(lambda: bool(cam.requests))
+    ratio = widget.devicePixelRatioF()
+    rect = widget._frame_rect
+    assert cam.preview_size == (round(rect.width() * ratio), round(rect.height() * ratio))
+    assert rect.width() / rect.height() == 0.75
+    widget.update_frame()
+    assert widget._image.size() == QtCore.QSize(*cam.preview_size)
+    shot = widget.grab().toImage()
+    center = rect.center()
+    assert shot.pixelColor(center.x(), center.y()) == QtGui.QColor("red")
+
+
+def test_widget_polls_a_silent_camera_now_and_then(qtbot, monkeypatch):
+    class SilentCamera(SizedCamera):
+        frame_ready = None
+
+        def get_preview_qimage(self):
+            self.requests.append("preview")
+            return super().get_preview_qimage()
+
+    monkeypatch.setattr(live_view_widget, "STALL_POLL_INTERVAL", 0.05)
+    cam = SilentCamera()
+    widget = LiveViewWidget(cam, fps=20)
+    qtbot.addWidget(widget)
+    assert widget.update_frame()
+    polls = cam.requests.count("preview")
+    assert not widget.update_frame()
+    assert cam.requests.count("preview") == polls
+    # Ohne neues Bild trotzdem nachfragen, damit ein Haenger auffaellt
+    qtbot.wait(100)
+    widget.update_frame()
+    assert cam.requests.count("preview") == polls + 1
+
+
+def test_widget_shows_camera_errors(qtbot):
+    class BrokenCamera:
+        def get_preview_qimage(self):
+            raise RuntimeError("Kamera weg")
+
+    widget = LiveViewWidget(BrokenCamera())
+    qtbot.addWidget(widget)
+    widget.update_frame()
+    assert widget._message == "Kamera weg"
+    assert widget._image.isNull()
+
+
+def test_simulator_honours_preview_size():
+    cam = SimulatorCamera()
+    cam.set_preview_size(321, 999)
+    img = cam.get_preview_qimage()
+    assert (img.width(), img.height()) == (321, 241)
+
+
+def test_connecting_state_pauses_polling_and_first_frame_is_signalled(qtbot):
+    cam = SizedCamera()
+    widget = LiveViewWidget(cam, fps=20)
+    qtbot.addWidget(widget)
+    widget.set_connecting(True)
+    assert "connecting" in widget.scheduler.pause_reasons()
+    assert widget._message == "Kamera wird verbunden …"
+    widget.set_connecting(False)
+    assert "connecting" not in widget.scheduler.pause_reasons()
+    assert widget._message == ""
+    with qtbot.waitSignal(widget.first_frame, timeout=1000):
+        widget.update_frame()
+    with qtbot.assertNotEmitted(widget.first_frame):
+        widget.update_frame()
+
+
+def test_double_click_toggles_loupe(qtbot):
+    class LoupeCamera(SizedCamera):
+        loupe = "unset"
+
+        def set_loupe(self, center):
+            self.loupe = center
+
+    cam = LoupeCamera()
+    widget = LiveViewWidget(cam, fps=20)
+    qtbot.addWidget(widget)
+    widget.resize(300, 400)
+    widget.show()
+    rect = widget._frame_rect
+    qtbot.mouseDClick(widget, QtCore.Qt.LeftButton, pos=rect.center())
+    assert cam.loupe == widget.loupe
+    assert cam.loupe[0] == pytest.approx(0.5, abs=0.01)
+    qtbot.mouseDClick(widget, QtCore.Qt.LeftButton, pos=rect.center())
+    assert cam.loupe is None and widget.loupe is None
+
+
+def test_loupe_needs_camera_support(qtbot):
+    widget = LiveViewWidget(SizedCamera())
+    qtbot.addWidget(widget)
+    assert not widget.toggle_loupe()
+    assert widget.loupe is None
+
+
+def test_loupe_refused_by_camera_stays_off(qtbot):
+    widget = LiveViewWidget(SimulatorCamera())
+    qtbot.addWidget(widget)
+    assert not widget.toggle_loupe()
+    assert widget.loupe is None
+
+
+def test_exposure_is_drawn_from_cached_histogram(qtbot):
+    from app.core.analysis import Exposure
+
+    class BlueCamera(SizedCamera):
+        def get_preview_qimage(self):
+            img = super().get_preview_qimage()
+            img.fill(QtGui.QColor("blue"))
+            return img
+
+    cam = BlueCamera()
+    widget = LiveViewWidget(cam)
+    qtbot.addWidget(widget)
+    widget.resize(300, 500)
+    widget.show()
+    qtbot.waitUntil(lambda: bool(cam.requests))
+    widget.update_frame()
+    hist = np.zeros(64, np.float32)
+    hist[0] = 1.0
+    widget.set_exposure(Exposure(hist, shadows=5.0, highlights=0.0))
+    cached = widget._histogram
+    assert not cached.isNull()
+    shot = widget.grab().toImage()
+    rect = widget._frame_rect
+    # Tiefen abgeschnitten: erster Balken rot statt Vorschaubild
+    x = rect.left() + 9
+    y = rect.bottom() - 8 - cached.height() + 20
+    color = shot.pixelColor(x, y)
+    assert color.red() > 200 and color.blue() < 50
+    # Malen erzeugt die Anzeige nicht neu
+    assert widget._histogram is cached
+    # Ohne Warnung wird der Balken hell gezeichnet
+    widget.set_exposure(Exposure(hist, shadows=0.0, highlights=0.0))
+    color = widget.grab().toImage().pixelColor(x, y)
+    assert color.red() > 200 and color.green() > 200
+    widget.set_camera(SizedCamera())
+    assert widget.exposure is None and widget._histogram.isNull()
+
+
+def test_focus_peaking_layer_covers_the_frame(qtbot):
+    from app.core.analysis import Focus
+
+    cam = SizedCamera()
+    widget = LiveViewWidget(cam)
+    qtbot.addWidget(widget)
+    widget.resize(300, 500)
+    widget.show()
+    qtbot.waitUntil(lambda: bool(cam.requests))
+    widget.update_frame()
+    mask = np.zeros((40, 30), bool)
+    mask[20:, :] = True
+    widget.set_focus(Focus(mask, 12.0))
+    shot = widget.grab().toImage()
+    rect = widget._frame_rect
+    top = shot.pixelColor(rect.center().x(), rect.top() + rect.height() // 4)
+    bottom = shot.pixelColor(rect.center().x(), rect.bottom() - rect.height() // 4)
+    assert top == QtGui.QColor("red")
+    assert bottom != QtGui.QColor("red") and bottom.blue() > 150
+    widget.set_focus(None)
+    assert widget._peaking.isNull()
+
+
+def test_small_frames_are_enlarged_to_the_overlay_rect(qtbot):
+    class SmallCamera(SizedCamera):
+        def get_preview_qimage(self):
+            img = QtGui.QImage(60, 80, QtGui.QImage.Format_RGB888)
+            img.fill(QtGui.QColor("red"))
+            return img
+
+    widget = LiveViewWidget(SmallCamera())
+    qtbot.addWidget(widget)
+    widget.resize(300, 400)
+    widget.show()
+    widget.update_frame()
+    rect = widget._frame_rect
+    assert widget.overlay.geometry() == rect
+    shot = widget.grab().toImage()
+    # Bild reicht bis an die Ecken des Overlay-Bereichs
+    for x, y in ((rect.left() + 2, rect.top() + 2), (rect.right() - 2, rect.bottom() - 2)):
+        assert shot.pixelColor(x, y).red() > 200
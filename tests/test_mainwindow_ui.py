@@ -1,16 +1,21 @@
 import os
 import copy
+import threading
+import time
 from pathlib import Path
 
 os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
 import pytest
-from PySide6 import QtCore
+from PySide6 import QtCore, QtWidgets
 
 from app.core.config.settings import Settings, DEFAULTS
 from app.core.excel.reader import Learner
+from app.core.camera import CameraError
+from app.core.camera import CameraManager
 from app.ui.main_window import MainWindow
 import app.core.controller as controller_module
+import app.ui.main_window as main_window_module
 
 
 @pytest.fixture
@@ -18,6 +23,8 @@ def settings(tmp_path):
     data = copy.deepcopy(DEFAULTS)
     data['ausgabeBasisPfad'] = tmp_path / 'out'
     data['missedPath'] = tmp_path / 'missed.xlsx'
+    # Ersetztes process_image laesst sich nicht an Arbeitsprozesse senden
+    data['bild']['verarbeitungsProzesse'] = 0
     return Settings(
         ausgabeBasisPfad=data['ausgabeBasisPfad'],
         missedPath=data['missedPath'],
@@ -57,7 +64,7 @@ def dummy_camera():
 
 @pytest.fixture
 def main_window(qtbot, settings, dummy_camera, monkeypatch, tmp_path):
-    monkeypatch.setattr(MainWindow, "_init_camera", lambda self: dummy_camera)
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: dummy_camera)
     monkeypatch.setattr(controller_module, "class_output_dir", lambda base, loc, klass: tmp_path / f"{loc}_{klass}")
     monkeypatch.setattr(controller_module, "new_learner_dir", lambda base, loc, klass: tmp_path / f"new_{loc}_{klass}")
 
@@ -67,7 +74,7 @@ def main_window(qtbot, settings, dummy_camera, monkeypatch, tmp_path):
 
     monkeypatch.setattr(controller_module, "unique_file_path", dummy_unique_file_path)
     monkeypatch.setattr(controller_module, "process_image", lambda *a, **kw: None)
-    monkeypatch.setattr(MainWindow, "_show_review", lambda self, path: True)
+    monkeypatch.setattr(MainWindow, "_show_review", lambda self, path, warning="": True)
     monkeypatch.setattr(MainWindow, "_excel_running", lambda self: False)
     monkeypatch.setattr(MainWindow, "_notify", lambda *a, **kw: None)
     win = MainWindow(settings)
@@ -110,6 +117,7 @@ def test_capture_flow(main_window, qtbot):
     assert win.btn_skip.isEnabled()
 
     qtbot.mouseClick(win.btn_capture, QtCore.Qt.LeftButton)
+    qtbot.waitUntil(lambda: not win.busy)
 
     assert win.label_current.text() == "Jane Roe (2/2)"
     assert win.label_upcoming.text() == ""
@@ -118,6 +126,7 @@ def test_capture_flow(main_window, qtbot):
     assert win.btn_capture.isEnabled()
 
     qtbot.mouseClick(win.btn_capture, QtCore.Qt.LeftButton)
+    qtbot.waitUntil(lambda: not win.busy)
 
     assert win.label_current.text() == "Klasse abgeschlossen"
     assert win.label_upcoming.text() == ""
@@ -127,6 +136,17 @@ def test_capture_flow(main_window, qtbot):
     assert len(reader.marked) == 2
 
 
+def test_review_warns_about_duplicate_face(main_window, qtbot, monkeypatch):
+    win = main_window
+    win.controller.learners = [Learner("Class1", "Roe", "Jane", "2", row=2, is_new=True)]
+    win.controller.duplicates_of = lambda learner, location: [("John Doe (Class1)", 2)]
+    warnings = []
+    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p, warning="": warnings.append(warning) or True)
+    win.capture_photo()
+    qtbot.waitUntil(lambda: not win.busy)
+    assert len(warnings) == 1 and "John Doe (Class1)" in warnings[0]
+
+
 def test_jump_to_person(main_window, qtbot):
     learner1 = Learner("Class1", "Doe", "John", "1", row=1)
     learner2 = Learner("Class1", "Roe", "Jane", "2", row=2)
@@ -157,9 +177,26 @@ def test_jump_to_person(main_window, qtbot):
     win.jump_to(1)
     assert win.label_current.text().startswith("Jane Roe")
     qtbot.mouseClick(win.btn_capture, QtCore.Qt.LeftButton)
+    qtbot.waitUntil(lambda: not win.busy)
     assert win.label_current.text().startswith("John Doe")
 
 
+def test_scanned_card_jumps_to_learner(main_window, qtbot):
+    learners = [Learner("Class1", "Doe", "John", "1", row=1), Learner("Class1", "Roe", "Jane", "2", row=2)]
+    win = main_window
+    win.controller.learners = learners
+    win.controller.find_learner = lambda location, code: {"2": learners[1]}.get(code)
+    win.set_scanning(True)
+    assert "scan" in win.analysis.names()
+    win._on_analysis("scan", "2")
+    assert win.controller.current == 1
+    assert win.label_current.text().startswith("Jane Roe")
+    win._on_analysis("scan", "7")
+    assert "keiner Person" in win.statusBar().currentMessage()
+    win.toggle_scanning()
+    assert "scan" not in win.analysis.names()
+
+
 def test_search_button_enabled_after_loading_classes(main_window, qtbot):
     learner1 = Learner("Class1", "Doe", "John", "1", row=1)
 
@@ -179,3 +216,101 @@ def test_search_button_enabled_after_loading_classes(main_window, qtbot):
     win.cmb_location.addItems(reader.locations())
     win.cmb_location.setCurrentIndex(0)
     assert win.btn_search_class.isEnabled()
+
+
+class SlowCamera(DummyCamera):
+    """Camera whose device takes a while to open."""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.opened = threading.Event()
+        self.error = error
+
+    def start_liveview(self):
+        time.sleep(0.3)
+        if self.error:
+            raise self.error
+        self.opened.set()
+
+
+@pytest.mark.parametrize("error", [None, CameraError("Kamera 1 kann nicht geoeffnet werden")])
+def test_camera_opens_in_background(qtbot, settings, monkeypatch, error):
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: SlowCamera(error))
+    start = time.perf_counter()
+    win = MainWindow(settings)
+    qtbot.addWidget(win)
+    assert time.perf_counter() - start < 0.3
+    assert win.preview._message == "Kamera wird verbunden …"
+    with qtbot.waitSignal(win.cameras.started, timeout=2000):
+        pass
+    assert "connecting" not in win.preview.scheduler.pause_reasons()
+    assert win.preview._message == (str(error) if error else "")
+
+
+def test_settings_change_replaces_camera_once(qtbot, settings, monkeypatch):
+    created = []
+
+    def create(self):
+        created.append(DummyCamera())
+        return created[-1]
+
+    monkeypatch.setattr(CameraManager, "create_camera", create)
+    win = MainWindow(settings)
+    qtbot.addWidget(win)
+    assert len(created) == 1
+    assert win.controller.camera is win.camera is win.preview.camera
+    assert not win.cameras.apply_settings()
+    old = win.camera
+    settings.kamera.backend = "simulator"
+    with qtbot.waitSignal(win.cameras.camera_changed, timeout=1000):
+        assert win.cameras.apply_settings()
+    assert len(created) == 2
+    assert win.camera is not old
+    assert win.controller.camera is win.camera is win.preview.camera
+
+
+
+def test_live_settings_keep_camera_and_reach_scheduler(qtbot, settings, monkeypatch):
+    created = []
+
+    def create(self):
+        created.append(DummyCamera())
+        return created[-1]
+
+    class Dialog:
+        def __init__(self, settings, parent=None, logger=None):
+            self.settings = settings
+
+        def exec(self):
+            self.settings.kamera.burstAnzahl = 3
+            self.settings.kamera.liveviewFpsZiel = 5
+            return QtWidgets.QDialog.Accepted
+
+    monkeypatch.setattr(CameraManager, "create_camera", create)
+    monkeypatch.setattr(main_window_module, "SettingsDialog", Dialog)
+    win = MainWindow(settings)
+    qtbot.addWidget(win)
+    camera = win.camera
+    win.open_settings()
+    assert len(created) == 1
+    assert win.camera is camera
+    assert win.preview.scheduler.target_ms == 200
+
+def test_manual_capture_and_learner_change_disarm_auto_trigger(main_window, qtbot):
+    class Trigger:
+        resets = 0
+
+        def reset(self):
+            self.resets += 1
+
+    win = main_window
+    win.auto_trigger = trigger = Trigger()
+    win.controller.learners = [Learner("Class1", "Doe", "John", "1", row=1), Learner("Class1", "Roe", "Jane", "2", row=2)]
+    win.jump_to(1)
+    assert trigger.resets >= 1
+    before = trigger.resets
+    win.capture_photo()
+    # Schon beim Ausloesen, nicht erst nach dem Speichern
+    assert trigger.resets == before + 1
+    qtbot.waitUntil(lambda: not win.busy)
+    assert trigger.resets > before + 1
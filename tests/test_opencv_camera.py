@@ -0,0 +1,245 @@
+"""Tests for the OpenCV webcam backend using a fake capture device."""
+
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+import app.core.camera.opencv_backend as opencv_backend
+from app.core.camera import OpenCVCamera
+
+
+class FakeCapture:
+    opened_with = []
+    unsupported_apis = set()
+
+    def __init__(self, index=0, api=cv2.CAP_ANY):
+        self.reads = 0
+        self.released = False
+        self.api = api
+        self.props = {cv2.CAP_PROP_FRAME_WIDTH: 64, cv2.CAP_PROP_FRAME_HEIGHT: 48}
+        self.history = []
+        FakeCapture.opened_with.append(api)
+
+    def isOpened(self):
+        return not self.released and self.api not in self.unsupported_apis
+
+    def set(self, prop, value):
+        self.props[prop] = value
+        self.history.append((prop, value))
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0)
+
+    def getBackendName(self):
+        return "FAKE"
+
+    def read(self):
+        self.reads += 1
+        threading.Event().wait(0.002)
+        w = int(self.props[cv2.CAP_PROP_FRAME_WIDTH])
+        h = int(self.props[cv2.CAP_PROP_FRAME_HEIGHT])
+        frame = np.zeros((h, w, 3), dtype=np.uint8)
+        frame[..., 2] = self.reads % 256
+        return True, frame
+
+    def grab(self):
+        self.grabs = getattr(self, "grabs", 0) + 1
+        threading.Event().wait(0.002)
+        return True
+
+    def release(self):
+        self.released = True
+
+
+def make_camera(monkeypatch):
+    monkeypatch.setattr(opencv_backend.cv2, "VideoCapture", FakeCapture)
+    cam = OpenCVCamera(0)
+    cam.start_liveview()
+    assert cam.grabber.wait_for_frame(timeout=2) is not None
+    return cam
+
+
+def test_preview_is_rotated_and_non_blocking(monkeypatch, qtbot):
+    cam = make_camera(monkeypatch)
+    try:
+        img = cam.get_preview_qimage()
+        assert (img.width(), img.height()) == (48, 64)
+    finally:
+        cam.stop_liveview()
+    assert cam.cap is None
+
+
+def test_capture_reuses_buffered_frame(monkeypatch, tmp_path):
+    cam = make_camera(monkeypatch)
+    try:
+        with cam.grabber.exclusive():
+            reads = cam.cap.reads
+            dest = tmp_path / "shot.jpg"
+            cam.capture(dest)
+            assert cam.cap.reads == reads
+    finally:
+        cam.stop_liveview()
+    assert cv2.imread(str(dest)).shape[:2] == (64, 48)
+
+
+def test_capture_frame_returns_rotated_array(monkeypatch):
+    cam = make_camera(monkeypatch)
+    try:
+        with cam.grabber.exclusive():
+            reads = cam.cap.reads
+            frame = cam.capture_frame()
+            assert cam.cap.reads == reads
+    finally:
+        cam.stop_liveview()
+    assert frame.shape[:2] == (64, 48)
+
+
+def test_preview_reuses_pooled_buffers(monkeypatch):
+    cam = make_camera(monkeypatch)
+    try:
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[0, -1] = (255, 0, 0)  # blue in BGR, top-right corner
+        img = cam._to_qimage(cam._prepare_preview(frame))
+        # After rotating counter-clockwise the top-right pixel is top-left
+        assert img.pixelColor(0, 0).getRgb()[:3] == (0, 0, 255)
+        pool = [id(buf) for buf in cam._pool.buffers()]
+        for _ in range(10):
+            cam._prepare_preview(np.zeros_like(frame))
+        assert [id(buf) for buf in cam._pool.buffers()] == pool
+        # Das angezeigte Bild liegt ohne Kopie im Pool und wird nicht
+        # ueberschrieben, solange es lebt
+        bits = np.frombuffer(img.constBits(), np.uint8).ctypes.data
+        assert bits in [buf.ctypes.data for buf in cam._pool.buffers()]
+        assert img.pixelColor(0, 0).getRgb()[:3] == (0, 0, 255)
+        del img
+        assert cam._pool.leased() == 0
+    finally:
+        cam.stop_liveview()
+
+
+def test_preview_is_downscaled_in_grabber_thread(monkeypatch):
+    monkeypatch.setattr(opencv_backend.cv2, "VideoCapture", FakeCapture)
+    cam = OpenCVCamera(0)
+    cam.set_preview_size(24, 24)
+    cam.start_liveview()
+    try:
+        frame = cam.grabber.wait_for_frame(timeout=2)
+        assert frame.preview.shape == (24, 18, 3)
+        assert frame.image.shape == (48, 64, 3)
+        img = cam.get_preview_qimage()
+        assert (img.width(), img.height()) == (18, 24)
+    finally:
+        cam.stop_liveview()
+
+
+def test_default_api_follows_platform(monkeypatch):
+    monkeypatch.setattr(opencv_backend.sys, "platform", "linux")
+    assert opencv_backend.default_api() == cv2.CAP_V4L2
+    monkeypatch.setattr(opencv_backend.sys, "platform", "win32")
+    assert opencv_backend.default_api() == cv2.CAP_DSHOW
+
+
+def test_open_negotiates_mjpg_and_falls_back_to_any(monkeypatch):
+    monkeypatch.setattr(opencv_backend.cv2, "VideoCapture", FakeCapture)
+    monkeypatch.setattr(FakeCapture, "opened_with", [])
+    monkeypatch.setattr(FakeCapture, "unsupported_apis", {cv2.CAP_V4L2})
+    cam = OpenCVCamera(0, api=cv2.CAP_V4L2, preview_resolution=(32, 24))
+    cam.start_liveview()
+    try:
+        assert FakeCapture.opened_with == [cv2.CAP_V4L2, cv2.CAP_ANY]
+        assert cam.cap.get(cv2.CAP_PROP_FOURCC) == cv2.VideoWriter_fourcc(*"MJPG")
+        frame = cam.grabber.wait_for_frame(timeout=2)
+        assert frame.image.shape == (24, 32, 3)
+    finally:
+        cam.stop_liveview()
+
+
+def test_capture_switches_to_still_resolution_and_back(monkeypatch, tmp_path):
+    monkeypatch.setattr(opencv_backend.cv2, "VideoCapture", FakeCapture)
+    cam = OpenCVCamera(0, preview_resolution=(32, 24), still_resolution=(128, 96))
+    cam.start_liveview()
+    try:
+        cam.grabber.wait_for_frame(timeout=2)
+        dest = tmp_path / "still.jpg"
+        cam.capture(dest)
+        assert cv2.imread(str(dest)).shape[:2] == (128, 96)
+        assert cam.cap.get(cv2.CAP_PROP_FRAME_WIDTH) == 32
+        seq = cam.grabber.latest().seq
+        frame = cam.grabber.wait_for_frame(seq, timeout=2)
+        assert frame.image.shape == (24, 32, 3)
+    finally:
+        cam.stop_liveview()
+
+
+def test_still_capture_restores_the_driver_default_resolution(monkeypatch, tmp_path):
+    monkeypatch.setattr(opencv_backend.cv2, "VideoCapture", FakeCapture)
+    cam = OpenCVCamera(0, still_resolution=(128, 96))
+    cam.start_liveview()
+    try:
+        cam.grabber.wait_for_frame(timeout=2)
+        cam.capture(tmp_path / "still.jpg")
+        assert cam.cap.get(cv2.CAP_PROP_FRAME_WIDTH) == 64
+        assert cam.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) == 48
+    finally:
+        cam.stop_liveview()
+
+
+def test_loupe_crops_native_pixels_around_point(monkeypatch):
+    cam = make_camera(monkeypatch)
+    try:
+        cam.set_preview_size(24, 24)
+        frame = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        cam.set_loupe((0.5, 0.5))
+        assert np.array_equal(cam._prepare_preview(frame), np.rot90(frame[12:36, 20:44]))
+        # Oben links in der Anzeige ist oben rechts im ungedrehten Bild
+        cam.set_loupe((0.0, 0.0))
+        assert np.array_equal(cam._prepare_preview(frame), np.rot90(frame[0:24, 40:64]))
+        cam.set_loupe(None)
+        assert cam._prepare_preview(frame).shape == (24, 18, 3)
+    finally:
+        cam.stop_liveview()
+
+
+def test_paused_camera_only_grabs_and_captures_a_new_frame(monkeypatch):
+    monkeypatch.setattr(opencv_backend, "MAX_FRAME_AGE", 0.01)
+    cam = make_camera(monkeypatch)
+    try:
+        cam.pause_liveview()
+        threading.Event().wait(0.05)
+        reads = cam.cap.reads
+        threading.Event().wait(0.05)
+        assert cam.cap.reads == reads
+        assert cam.cap.grabs > 0
+        seq = cam.grabber.latest().seq
+        frame = cam.capture_frame()
+        # Direkt gelesen, nicht das Bild von vor der Pause
+        assert cam.cap.reads == reads + 1
+        assert frame[0, 0, 2] == (reads + 1) % 256
+        assert cam.grabber.latest().seq == seq
+        cam.resume_liveview()
+        assert cam.grabber.wait_for_frame(after_seq=seq, timeout=2) is not None
+    finally:
+        cam.stop_liveview()
+
+
+def test_capture_right_after_pause_uses_buffered_frame(monkeypatch):
+    cam = make_camera(monkeypatch)
+    try:
+        assert cam.grabber.wait_for_frame(after_seq=1, timeout=2) is not None
+        # Wie MainWindow: erst die Vorschau anhalten, dann aufnehmen
+        cam.pause_liveview()
+        with cam.grabber.exclusive():
+            reads = cam.cap.reads
+            frame = cam.capture_frame()
+            burst = cam.capture_burst(2)
+            assert cam.cap.reads == reads
+        buffered = [cv2.rotate(f.image, cv2.ROTATE_90_COUNTERCLOCKWISE) for f in cam.grabber.frames()]
+        assert any(np.array_equal(frame, image) for image in buffered)
+        assert len(burst) == 2
+    finally:
+        cam.stop_liveview()
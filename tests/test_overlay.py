@@ -0,0 +1,65 @@
+"""Tests for the cached overlay renderer."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtGui
+
+from app.ui.widgets import overlay as overlay_module
+from app.ui.widgets.overlay import Overlay
+
+
+def make_png(path, size, color="red"):
+    img = QtGui.QImage(size[0], size[1], QtGui.QImage.Format_ARGB32)
+    img.fill(QtGui.QColor(color))
+    assert img.save(str(path))
+    return path
+
+
+def test_overlay_is_rendered_once_per_size(qtbot, tmp_path):
+    widget = Overlay()
+    qtbot.addWidget(widget)
+    widget.resize(90, 120)
+    widget.set_image(make_png(tmp_path / "o.png", (30, 40)))
+    widget.set_settings(True, True, 0.5)
+    widget.show()
+    qtbot.waitExposed(widget)
+    widget.grab()
+    cache = widget._cache
+    assert cache is not None
+    widget.grab()
+    assert widget._cache is cache
+    widget.resize(60, 80)
+    widget.grab()
+    assert widget._cache is not cache
+
+
+def test_overlay_draws_thirds_at_opacity(qtbot):
+    widget = Overlay()
+    qtbot.addWidget(widget)
+    widget.resize(90, 90)
+    widget.set_settings(True, False, 0.5)
+    widget.grab()
+    img = widget._cache.toImage()
+    ratio = widget._cache.devicePixelRatio()
+    line = img.pixelColor(int(30 * ratio), int(10 * ratio))
+    assert 100 < line.alpha() < 160
+    assert img.pixelColor(int(10 * ratio), int(10 * ratio)).alpha() == 0
+
+
+def test_settings_change_invalidates_cache(qtbot):
+    widget = Overlay()
+    qtbot.addWidget(widget)
+    widget.resize(50, 50)
+    widget.set_settings(True, False, 1.0)
+    widget.grab()
+    assert widget._cache is not None
+    widget.set_settings(False, True, 1.0)
+    assert widget._cache is None
+
+
+def test_large_png_is_decoded_reduced(tmp_path, monkeypatch):
+    monkeypatch.setattr(overlay_module, "MAX_SOURCE_SIDE", 100)
+    img = Overlay._load(make_png(tmp_path / "big.png", (400, 200)))
+    assert img.size() == QtCore.QSize(100, 50)
@@ -9,6 +9,7 @@ from PySide6 import QtCore, QtWidgets
 
 from app.core.config.settings import Settings, DEFAULTS
 from app.core.excel.reader import Learner
+from app.core.camera import CameraManager
 from app.ui.main_window import MainWindow
 import app.core.controller as controller_module
 
@@ -18,6 +19,8 @@ def settings(tmp_path):
     data = copy.deepcopy(DEFAULTS)
     data["ausgabeBasisPfad"] = tmp_path / "out"
     data["missedPath"] = tmp_path / "missed.xlsx"
+    # Ersetztes process_image laesst sich nicht an Arbeitsprozesse senden
+    data["bild"]["verarbeitungsProzesse"] = 0
     return Settings(
         ausgabeBasisPfad=data["ausgabeBasisPfad"],
         missedPath=data["missedPath"],
@@ -57,7 +60,7 @@ def dummy_camera():
 
 @pytest.fixture
 def main_window(qtbot, settings, dummy_camera, monkeypatch, tmp_path):
-    monkeypatch.setattr(MainWindow, "_init_camera", lambda self: dummy_camera)
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: dummy_camera)
     monkeypatch.setattr(controller_module, "class_output_dir", lambda base, loc, klass: tmp_path / f"{loc}_{klass}")
     monkeypatch.setattr(controller_module, "new_learner_dir", lambda base, loc, klass: tmp_path / f"new_{loc}_{klass}")
 
@@ -71,7 +74,7 @@ def main_window(qtbot, settings, dummy_camera, monkeypatch, tmp_path):
     monkeypatch.setattr(MainWindow, "_notify", lambda *a, **kw: None)
     # Automatically accept the review dialog unless a test overrides
     # this behaviour.
-    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p: True)
+    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p, warning="": True)
     win = MainWindow(settings)
     qtbot.addWidget(win)
     return win
@@ -121,15 +124,20 @@ def test_retake_photo_preserves_student_id(main_window, qtbot, monkeypatch, tmp_
     l1 = Learner("Class1", "Doe", "John", "1", row=1)
     prepare(main_window, [l1])
     seq = iter([False, True])
-    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p: next(seq))
+    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p, warning="": next(seq))
+    forgotten = []
+    monkeypatch.setattr(main_window.controller, "forget_photo", lambda *a: forgotten.append(a))
 
     qtbot.mouseClick(main_window.btn_capture, QtCore.Qt.LeftButton)
     wait_idle(qtbot, main_window)
     assert not (tmp_path / "Loc1_Class1" / "1.jpg").exists()
+    # Das verworfene Foto darf keine Doppelwarnung mehr ausloesen
+    assert forgotten == [(l1, "Loc1")]
 
     qtbot.mouseClick(main_window.btn_capture, QtCore.Qt.LeftButton)
     wait_idle(qtbot, main_window)
     assert (tmp_path / "Loc1_Class1" / "1.jpg").exists()
+    assert len(forgotten) == 1
     assert main_window.camera.captured[-1].name == "1.jpg"
 
 
@@ -197,7 +205,7 @@ def test_jump_to_person_retake_preserves_selection(main_window, qtbot, monkeypat
 
     main_window.jump_to(1)
     seq = iter([False, True, True])
-    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p: next(seq))
+    monkeypatch.setattr(MainWindow, "_show_review", lambda self, p, warning="": next(seq))
 
     qtbot.mouseClick(main_window.btn_capture, QtCore.Qt.LeftButton)
     wait_idle(qtbot, main_window)
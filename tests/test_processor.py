@@ -1,6 +1,8 @@
 """Tests for image processing helpers."""
 
 from pathlib import Path
+
+import pytest
 from PIL import Image
 
 from app.core.imaging.processor import process_image, _parse_ratio
@@ -33,3 +35,94 @@ def test_parse_ratio():
     assert _parse_ratio("bad") is None
     assert _parse_ratio((1, 2, 3)) is None
     assert _parse_ratio(None) is None
+
+
+def test_process_in_memory_input(tmp_path):
+    import io
+
+    import numpy as np
+
+    bgr = np.zeros((300, 400, 3), np.uint8)
+    bgr[..., 0] = 255  # blau in BGR
+    dest = tmp_path / 'array.jpg'
+    process_image(bgr, dest, 150, 200, 90, (3, 4))
+    with Image.open(dest) as im:
+        assert im.size == (150, 200)
+        r, g, b = im.getpixel((75, 100))
+        assert b > 200 and r < 50
+
+    buf = io.BytesIO()
+    Image.new('RGB', (400, 300), (255, 0, 0)).save(buf, 'JPEG')
+    dest = tmp_path / 'bytes.jpg'
+    process_image(buf.getvalue(), dest, 150, 200, 90, (3, 4))
+    with Image.open(dest) as im:
+        assert im.size == (150, 200)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['array.jpg', 'bytes.jpg']
+
+
+def _reference(src, width, height, aspect):
+    from app.core.imaging.processor import crop_center
+
+    with Image.open(src) as im:
+        im.load()
+        return crop_center(im, aspect).resize((width, height), Image.LANCZOS)
+
+
+def test_draft_scale_keeps_target_covered():
+    from app.core.imaging.processor import draft_scale
+
+    assert draft_scale((0, 0, 3000, 4000), 1200, 1600) == 2
+    assert draft_scale((0, 0, 6000, 8000), 750, 1000) == 8
+    assert draft_scale((0, 0, 2399, 3199), 1200, 1600) == 1
+    assert draft_scale((0, 0, 48000, 64000), 300, 400) == 8
+
+
+# DSLR-Aufnahmen kommen als Datei oder als JPEG-Bytes aus dem Speicher
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_large_jpeg_is_decoded_at_reduced_scale(tmp_path, monkeypatch, as_bytes):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 255, (30, 40, 3), np.uint8)
+    src = tmp_path / 'dslr.jpg'
+    Image.fromarray(small).resize((4000, 3000), Image.BICUBIC).save(src, quality=95)
+    from PIL import JpegImagePlugin
+
+    drafts = []
+    original = JpegImagePlugin.JpegImageFile.draft
+
+    def draft(self, mode, size):
+        result = original(self, mode, size)
+        drafts.append(self.size)
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, 'draft', draft)
+    dest = tmp_path / 'out.jpg'
+    process_image(src.read_bytes() if as_bytes else src, dest, 300, 400, 95, (3, 4))
+    assert drafts == [(1000, 750)]
+    with Image.open(dest) as im:
+        out = np.asarray(im, dtype=np.int16)
+    ref = np.asarray(_reference(src, 300, 400, (3, 4)), dtype=np.int16)
+    assert out.shape == ref.shape
+    assert np.abs(out - ref).mean() < 3
+
+
+def test_face_is_searched_on_a_small_draft(tmp_path, monkeypatch):
+    from app.core.imaging import face_crop
+    from app.core.imaging.face_crop import FaceRules
+
+    shapes = []
+
+    def detector(image):
+        shapes.append(image.shape)
+        h, w = image.shape[:2]
+        return [(w * 0.1, h * 0.1, w * 0.1, w * 0.1, h * 0.14)]
+
+    monkeypatch.setattr(face_crop, 'load_detector', lambda model=None: detector)
+    src = tmp_path / 'dslr.jpg'
+    Image.new('RGB', (4000, 3000), (0, 0, 255)).save(src)
+    dest = tmp_path / 'out.jpg'
+    process_image(src, dest, 150, 200, 90, (3, 4), face=FaceRules(0.5, 0.4))
+    assert max(shapes[0][:2]) <= face_crop.DETECT_SIZE
+    with Image.open(dest) as im:
+        assert im.size == (150, 200)
@@ -51,3 +51,29 @@ def test_overlay_path_validation(tmp_path):
     cfg.write_text(json.dumps(data), encoding="utf-8")
     with pytest.raises(ValidationError):
         Settings.load(cfg)
+
+
+def test_simulator_resolution_roundtrip(tmp_path):
+    cfg = tmp_path / "settings.json"
+    s = Settings.model_validate(DEFAULTS)
+    s.kamera.simulator.aufloesung = (6000, 4000)
+    s.kamera.simulator.fps = 30
+    s.save(cfg)
+    assert json.loads(cfg.read_text())["kamera"]["simulator"]["aufloesung"] == "6000x4000"
+    loaded = Settings.load(cfg)
+    assert loaded.kamera.simulator.aufloesung == (6000, 4000)
+    assert loaded.kamera.simulator.fps == 30
+
+
+def test_camera_resolutions_roundtrip(tmp_path):
+    cfg = tmp_path / "settings.json"
+    s = Settings.model_validate(DEFAULTS)
+    assert s.kamera.vorschauAufloesung is None
+    assert s.kamera.fotoAufloesung is None
+    s.kamera.vorschauAufloesung = (1280, 720)
+    s.kamera.fotoAufloesung = (3840, 2160)
+    s.save(cfg)
+    assert json.loads(cfg.read_text())["kamera"]["fotoAufloesung"] == "3840x2160"
+    loaded = Settings.load(cfg)
+    assert loaded.kamera.vorschauAufloesung == (1280, 720)
+    assert loaded.kamera.fotoAufloesung == (3840, 2160)
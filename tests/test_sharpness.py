@@ -0,0 +1,96 @@
+"""Tests for the burst frame scoring."""
+
+import copy
+import time
+
+import cv2
+import numpy as np
+
+from app.core.config.settings import DEFAULTS, Settings
+from app.core.controller import MainController
+from app.core.imaging.sharpness import best_frame, eye_contrast, score_frames, _gray_stack
+
+
+def portrait(eyes_open=True, size=(1080, 1440)):
+    """Draw a synthetic head with eyes inside the scored eye region."""
+    w, h = size
+    img = np.full((h, w, 3), 120, np.uint8)
+    rng = np.random.default_rng(1)
+    img += rng.integers(0, 40, (h, w, 1), dtype=np.uint8)
+    cv2.ellipse(img, (w // 2, int(h * 0.4)), (w // 5, h // 5), 0, 0, 360, (150, 170, 200), -1)
+    for x in (int(w * 0.42), int(w * 0.58)):
+        if eyes_open:
+            cv2.circle(img, (x, int(h * 0.35)), w // 40, (255, 255, 255), -1)
+            cv2.circle(img, (x, int(h * 0.35)), w // 90, (20, 20, 20), -1)
+        else:
+            cv2.line(img, (x - w // 40, int(h * 0.35)), (x + w // 40, int(h * 0.35)), (110, 120, 140), 2)
+    return img
+
+
+def test_sharp_frame_beats_blurred_ones():
+    sharp = portrait()
+    frames = [cv2.GaussianBlur(sharp, (0, 0), s) for s in (4, 2)] + [sharp]
+    frames.append(cv2.blur(sharp, (25, 1)))  # Bewegungsunschaerfe
+    assert best_frame(frames) == 2
+
+
+def test_open_eyes_beat_closed_eyes():
+    closed, opened = portrait(eyes_open=False), portrait()
+    contrast = eye_contrast(_gray_stack([closed, opened]))
+    assert contrast[1] > contrast[0]
+    assert best_frame([closed, opened]) == 1
+
+
+def test_scoring_a_burst_is_fast():
+    frames = [portrait(size=(1920, 2560)) for _ in range(5)]
+    score_frames(frames)
+    start = time.perf_counter()
+    scores = score_frames(frames)
+    assert len(scores) == 5
+    assert (time.perf_counter() - start) < 0.1
+
+
+class BurstCamera:
+    def __init__(self, frames):
+        self.frames = frames
+        self.counts = []
+
+    def start_liveview(self):
+        pass
+
+    def stop_liveview(self):
+        pass
+
+    def capture(self, path):
+        raise AssertionError("capture_burst erwartet")
+
+    def capture_burst(self, count):
+        self.counts.append(count)
+        return self.frames[:count]
+
+
+def test_controller_keeps_only_the_best_burst_frame(tmp_path, monkeypatch):
+    import app.core.controller as controller_module
+    from app.core.camera import CameraManager
+    from app.core.excel.reader import Learner
+
+    data = copy.deepcopy(DEFAULTS)
+    data["ausgabeBasisPfad"] = str(tmp_path / "out")
+    data["kamera"]["burstAnzahl"] = 3
+    # Ersetztes process_image laesst sich nicht an Arbeitsprozesse senden
+    data["bild"]["verarbeitungsProzesse"] = 0
+    settings = Settings.model_validate(data)
+    sharp = portrait(size=(300, 400))
+    cam = BurstCamera([cv2.GaussianBlur(sharp, (0, 0), 3), sharp, cv2.GaussianBlur(sharp, (0, 0), 2)])
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: cam)
+    processed = []
+    monkeypatch.setattr(controller_module, "process_image", lambda src, *a, **kw: processed.append(src))
+    controller = MainController(settings)
+    try:
+        path = controller.capture(Learner("1a", "Doe", "John", "7"), "Loc")
+    finally:
+        controller.shutdown()
+    assert cam.counts == [3]
+    # Das beste Bild geht ohne Zwischendatei in die Verarbeitung
+    assert processed[0] is cam.frames[1]
+    assert not path.exists()
@@ -0,0 +1,139 @@
+"""Tests for the simulator camera and its benchmark load generator."""
+
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.core.camera import CameraError, SimulatorCamera
+from app.core.camera.simulator import render_pool
+from app.core.config.settings import SimulatorSettings
+
+
+def test_default_simulator_draws_fixed_size_frames(tmp_path):
+    cam = SimulatorCamera()
+    assert not cam.benchmark
+    assert not hasattr(cam, "frame_ready")
+    img = cam.get_preview_qimage()
+    assert (img.width(), img.height()) == (640, 480)
+    cam.capture(tmp_path / "a.jpg")
+    assert Image.open(tmp_path / "a.jpg").size == (1920, 1080)
+
+
+def test_pool_is_deterministic_and_frames_differ():
+    a = render_pool((320, 240), 4, seed=7)
+    b = render_pool((320, 240), 4, seed=7)
+    assert all(np.array_equal(x, y) for x, y in zip(a, b))
+    assert a[0].shape == (240, 320, 3)
+    assert not np.array_equal(a[0], a[1])
+    assert not np.array_equal(a[0], render_pool((320, 240), 4, seed=8)[0])
+
+
+def test_load_generator_serves_pool_at_target_rate(qtbot):
+    cam = SimulatorCamera(resolution=(320, 240), fps=50, pool_size=4)
+    cam.set_preview_size(160, 160)
+    cam.start_liveview()
+    try:
+        first = cam.grabber.wait_for_frame(timeout=2)
+        time.sleep(0.5)
+        last = cam.grabber.latest()
+    finally:
+        cam.stop_liveview()
+    # 50 fps ueber 0,5 s, mit Luft fuer langsame CI-Maschinen
+    assert 5 <= last.seq - first.seq <= 30
+    assert any(last.image is frame for frame in cam.pool)
+    assert last.preview.shape == (120, 160, 3)
+
+
+def test_loupe_copies_only_the_region_at_full_resolution():
+    cam = SimulatorCamera(resolution=(320, 240), pool_size=1)
+    cam.set_preview_size(40, 30)
+    cam.set_loupe((0.25, 0.5))
+    frame = cam.pool[0]
+    assert np.array_equal(cam._prepare_preview(frame), frame[105:135, 60:100])
+    cam.set_loupe(None)
+    assert cam._prepare_preview(frame).shape == (30, 40, 3)
+
+
+def test_plain_simulator_refuses_the_loupe():
+    cam = SimulatorCamera()
+    assert cam.set_loupe((0.5, 0.5)) is False
+    assert cam.set_loupe(None) is True
+
+
+def test_capture_writes_full_resolution_jpeg(tmp_path):
+    cam = SimulatorCamera(resolution=(320, 240))
+    try:
+        cam.capture(tmp_path / "a.jpg")
+        cam.capture(tmp_path / "b.jpg")
+    finally:
+        cam.stop_liveview()
+    assert Image.open(tmp_path / "a.jpg").size == (320, 240)
+    assert len(cam._jpegs) >= 1
+
+
+def test_capture_frame_stays_in_memory(tmp_path):
+    cam = SimulatorCamera(resolution=(320, 240))
+    try:
+        data = cam.capture_frame()
+    finally:
+        cam.stop_liveview()
+    assert data[:2] == b"\xff\xd8"
+    assert data in cam._jpegs.values()
+    frame = SimulatorCamera().capture_frame()
+    assert frame.shape == (1080, 1920, 3)
+
+
+def test_failure_injection(tmp_path, qtbot):
+    cam = SimulatorCamera(resolution=(64, 48), failure_rate=1.0)
+    with pytest.raises(CameraError):
+        cam.capture(tmp_path / "a.jpg")
+    try:
+        qtbot.waitUntil(lambda: cam.grabber.failures >= 10, timeout=3000)
+        with pytest.raises(CameraError):
+            cam.get_preview_qimage()
+    finally:
+        cam.stop_liveview()
+
+
+def test_latency_is_injected(tmp_path):
+    cam = SimulatorCamera(resolution=(64, 48), latency_ms=100, jitter_ms=10)
+    try:
+        cam.grabber.start()
+        cam.grabber.wait_for_frame(timeout=2)
+        start = time.perf_counter()
+        cam.capture(tmp_path / "a.jpg")
+        assert time.perf_counter() - start >= 0.085
+    finally:
+        cam.stop_liveview()
+
+
+def test_from_settings():
+    settings = SimulatorSettings(aufloesung="640x480", fps=25, fehlerquote=0.1, seed=3)
+    cam = SimulatorCamera.from_settings(settings)
+    assert cam.resolution == (640, 480)
+    assert cam.fps == 25
+    assert cam.failure_rate == 0.1
+    assert not SimulatorCamera.from_settings(SimulatorSettings()).benchmark
+
+
+def test_paused_load_generator_stops_serving_but_captures():
+    cam = SimulatorCamera(resolution=(64, 48), fps=100, pool_size=4)
+    cam.start_liveview()
+    try:
+        cam.grabber.wait_for_frame(timeout=2)
+        cam.pause_liveview()
+        time.sleep(0.05)
+        seq = cam.grabber.latest().seq
+        time.sleep(0.1)
+        assert cam.grabber.latest().seq == seq
+        assert cam.capture_frame()[:2] == b"\xff\xd8"
+        assert len(cam.capture_burst(2)) == 2
+        cam.resume_liveview()
+        assert cam.grabber.wait_for_frame(after_seq=seq, timeout=2) is not None
+    finally:
+        cam.stop_liveview()
@@ -0,0 +1,152 @@
+import os
+import copy
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import openpyxl
+
+from app.core.config.settings import Settings, DEFAULTS
+from app.core.camera import CameraManager
+from app.core.controller import MainController
+from app.core.excel.missed_writer import MissedEntry
+from app.core.excel.write_queue import ExcelWriteQueue
+from app.core.stations import StationHub, station_settings
+from tests.test_excel_reader import create_sample
+
+
+def make_settings(tmp_path, **extra):
+    data = copy.deepcopy(DEFAULTS)
+    data["ausgabeBasisPfad"] = str(tmp_path / "out")
+    data["missedPath"] = str(tmp_path / "missed.xlsx")
+    data.update(extra)
+    return Settings.model_validate(data)
+
+
+class BlockingTarget:
+    """Workbook stand-in whose first save waits for a release."""
+
+    def __init__(self):
+        self.rows = []
+        self.saved = []
+        self.saving = threading.Event()
+        self.release = threading.Event()
+
+    def save(self):
+        self.saving.set()
+        self.release.wait(2)
+        self.saved.append(list(self.rows))
+
+
+def test_write_queue_saves_waiting_changes_once():
+    writes = ExcelWriteQueue()
+    target = BlockingTarget()
+    first = writes.submit(target, lambda: target.rows.append(0))
+    assert target.saving.wait(2)
+    rest = [writes.submit(target, lambda i=i: target.rows.append(i)) for i in range(1, 6)]
+    target.release.set()
+    for future in [first] + rest:
+        future.result(2)
+    writes.close()
+    assert writes.saves == 2
+    assert target.saved == [[0], [0, 1, 2, 3, 4, 5]]
+
+
+def test_write_queue_reports_failed_change():
+    writes = ExcelWriteQueue()
+    target = BlockingTarget()
+    target.release.set()
+
+    def fail():
+        raise KeyError("Standort")
+
+    bad = writes.submit(target, fail)
+    good = writes.submit(target, lambda: target.rows.append(1))
+    assert isinstance(bad.exception(2), KeyError)
+    assert good.result(2) is None
+    writes.close()
+
+
+def test_stations_share_roster_and_write_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: None)
+    xl = tmp_path / "klassen.xlsx"
+    create_sample(xl)
+    settings = make_settings(
+        tmp_path, stationen=[{"name": "A", "kameraId": 0}, {"name": "B", "kameraId": 2}]
+    )
+    hub = StationHub(settings)
+    a, b = (MainController(settings, hub=hub, station=s) for s in station_settings(settings))
+    assert a.cameras is not b.cameras
+    assert b.cameras.current_cam_id == 2
+    a.load_excel(xl)
+    b.load_excel(xl)
+    assert a.reader is b.reader
+
+    a.classes_for_location("Standort1")
+    a.learners_for_class("Standort1", "INF")
+    b.learners_for_class("Standort1", "INF")
+    b.advance()
+    assert a.learners is not b.learners
+
+    a.mark_photographed(a.current_learner(), "Standort1")
+    b.skip(b.current_learner(), "Standort1", "Krank")
+    ws = openpyxl.load_workbook(xl)["Standort1"]
+    assert ws["E2"].value == "Ja"
+    assert ws["E3"].value == "Nein"
+    assert ws["G3"].value == "Krank"
+    missed = list(openpyxl.load_workbook(settings.missedPath).active.values)
+    assert missed[1][:3] == ("Standort1", "INF", "Muster")
+
+    a.shutdown()
+    b.shutdown()
+    hub.close()
+
+
+def test_load_excel_picks_up_external_edits(tmp_path, monkeypatch):
+    monkeypatch.setattr(CameraManager, "create_camera", lambda self: None)
+    xl = tmp_path / "klassen.xlsx"
+    create_sample(xl)
+    settings = make_settings(tmp_path)
+    hub = StationHub(settings)
+    controller = MainController(settings, hub=hub)
+    controller.load_excel(xl)
+    roster = controller.reader
+    workbook = roster.reader
+    controller.learners_for_class("Standort1", "INF")
+    controller.mark_photographed(controller.current_learner(), "Standort1")
+    # Das eigene Speichern loest kein Neueinlesen aus
+    controller.load_excel(xl)
+    assert roster.reader is workbook
+
+    wb = openpyxl.load_workbook(xl)
+    wb["Standort1"].append(["INF", "Neu", "Nora", "003", "", "", ""])
+    wb["Standort1"]["G3"] = "Nachtermin"
+    wb.save(xl)
+    mtime = xl.stat().st_mtime_ns + 1_000_000
+    os.utime(xl, ns=(mtime, mtime))
+    controller.load_excel(xl)
+    assert controller.reader is roster
+    learners = controller.learners_for_class("Standort1", "INF")
+    assert [learner.vorname for learner in learners] == ["Hans", "Eva", "Nora"]
+    controller.mark_photographed(learners[2], "Standort1")
+    ws = openpyxl.load_workbook(xl)["Standort1"]
+    assert ws["E2"].value == "Ja"
+    assert ws["G3"].value == "Nachtermin"
+    assert ws["E4"].value == "Ja"
+
+    controller.shutdown()
+    hub.close()
+
+
+def test_default_is_one_station(tmp_path):
+    settings = make_settings(tmp_path)
+    assert len(station_settings(settings)) == 1
+
+
+def test_hub_appends_missed_entries(tmp_path):
+    hub = StationHub(make_settings(tmp_path))
+    for i in range(3):
+        hub.append_missed(MissedEntry("Loc", "K", "N", "V", str(i), "2024-01-01", "Krank"))
+    hub.close()
+    rows = list(openpyxl.load_workbook(tmp_path / "missed.xlsx").active.values)
+    assert [r[4] for r in rows[1:]] == ["0", "1", "2"]